@@ -0,0 +1,148 @@
+"""Local checkpoint file for resumable evaluation runs.
+
+A checkpoint is a JSONL file: a header line naming the dataset, the LangSmith
+experiment and the repetition count, then one line per completed example run
+with its feedback scores. run_langsmith_evaluation appends a line as each
+example finishes, so an interrupted run can be restarted with the same
+--checkpoint and only the missing runs are sent, into the same experiment.
+Runs that raised are not recorded and are retried on resume.
+"""
+
+import json
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from evaluate.results_display import ScenarioResult
+
+
+@dataclass
+class CheckpointRow:
+    example_id: str
+    query: str
+    scores: Dict[str, float]
+    scenario_id: int = 0
+
+
+@dataclass
+class EvalCheckpoint:
+    path: Path
+    dataset_name: str
+    num_repetitions: int
+    experiment_name: Optional[str] = None
+    rows: List[CheckpointRow] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def open(
+        cls, path: Path, dataset_name: str, num_repetitions: int
+    ) -> "EvalCheckpoint":
+        """Load `path` if it exists, otherwise start a new checkpoint there.
+
+        Raises ValueError if an existing checkpoint belongs to another
+        dataset or repetition count.
+        """
+        if not path.exists():
+            return cls(path, dataset_name, num_repetitions)
+
+        with path.open(encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines:
+            return cls(path, dataset_name, num_repetitions)
+        header, entries = lines[0], lines[1:]
+        if (header["dataset_name"], header["num_repetitions"]) != (
+            dataset_name,
+            num_repetitions,
+        ):
+            raise ValueError(
+                f"Checkpoint {path} is for dataset {header['dataset_name']!r} with "
+                f"{header['num_repetitions']} repetition(s); use another path or "
+                "delete it to start over."
+            )
+        return cls(
+            path,
+            dataset_name,
+            num_repetitions,
+            experiment_name=header.get("experiment_name"),
+            rows=[CheckpointRow(**entry) for entry in entries],
+        )
+
+    def start(self, experiment_name: str) -> None:
+        """Record the experiment for a new checkpoint (no-op when resuming)."""
+        if self.experiment_name is not None:
+            return
+        self.experiment_name = experiment_name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "dataset_name": self.dataset_name,
+            "num_repetitions": self.num_repetitions,
+            "experiment_name": experiment_name,
+        }
+        self.path.write_text(json.dumps(header) + "\n", encoding="utf-8")
+
+    def remaining(self, example_ids: List[str]) -> Dict[str, int]:
+        """Runs still needed per example to reach `num_repetitions`."""
+        done = Counter(row.example_id for row in self.rows)
+        return {
+            ex_id: self.num_repetitions - done[ex_id]
+            for ex_id in example_ids
+            if done[ex_id] < self.num_repetitions
+        }
+
+    def record(self, row: CheckpointRow) -> None:
+        with self._lock:
+            self.rows.append(row)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(row.__dict__) + "\n")
+
+    def scenario_results(self) -> List[ScenarioResult]:
+        """Group recorded scores per example, ordered by scenario_id."""
+        by_example: Dict[str, List[CheckpointRow]] = {}
+        for row in self.rows:
+            by_example.setdefault(row.example_id, []).append(row)
+
+        scenarios = []
+        for rows in sorted(by_example.values(), key=lambda r: r[0].scenario_id):
+            q = rows[0].query
+            scores: Dict[str, List[float]] = {}
+            for row in rows:
+                for name, score in row.scores.items():
+                    scores.setdefault(name, []).append(score)
+            scenarios.append(
+                ScenarioResult(
+                    label=f'"{q[:68]}{"..." if len(q) > 68 else ""}"',
+                    scenario_id=rows[0].scenario_id,
+                    scores=scores,
+                )
+            )
+        return scenarios
+
+    def mean_scores(self) -> Dict[str, float]:
+        totals: Dict[str, List[float]] = {}
+        for row in self.rows:
+            for name, score in row.scores.items():
+                totals.setdefault(name, []).append(score)
+        return {name: sum(v) / len(v) for name, v in sorted(totals.items())}
+
+
+def row_from_result(result: Any) -> Optional[CheckpointRow]:
+    """Build a checkpoint row from a LangSmith ExperimentResultRow.
+
+    Returns None for runs that raised, so they are retried on resume.
+    """
+    run, example = result["run"], result["example"]
+    if run.error:
+        return None
+    scores = {
+        r.key: float(r.score)
+        for r in result["evaluation_results"]["results"]
+        if r.score is not None
+    }
+    return CheckpointRow(
+        example_id=str(example.id),
+        query=str((example.inputs or {}).get("query", "")),
+        scores=scores,
+        scenario_id=int((example.metadata or {}).get("scenario_id", 0)),
+    )
@@ -179,7 +179,15 @@ def tool_usage_evaluator(run, example) -> Dict[str, Any]:
             tool_calls.append(step.get("name"))
 
     # Legal questions should use retrieval tools.
-    used_retrieval = any(tool in ["retrieve_city_state_laws"] for tool in tool_calls)
+    used_retrieval = any(
+        tool
+        in [
+            "retrieve_city_state_laws",
+            "retrieve_housing_law_sources",
+            "lookup_ors_section",
+        ]
+        for tool in tool_calls
+    )
 
     score = 1.0 if used_retrieval else 0.0
 
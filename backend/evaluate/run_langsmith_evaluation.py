@@ -5,11 +5,22 @@ automated quality evaluation.
 """
 
 import argparse
+import logging
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from google.api_core import exceptions as google_exceptions
+from google.genai import errors as genai_errors
 from langchain_core.messages import HumanMessage
 from langsmith import Client, evaluate
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
+from evaluate.eval_checkpoint import EvalCheckpoint, row_from_result
 from evaluate.eval_history import write_run_entry
 from evaluate.langsmith_evaluators import (
     # citation_accuracy_evaluator,
@@ -26,7 +37,48 @@ from tenantfirstaid.langchain_chat_manager import LangChainChatManager
 from tenantfirstaid.location import OregonCity, UsaState
 from tenantfirstaid.logger import configure_logging
 
+_logger = logging.getLogger(__name__)
+
+# Examples run concurrently on LangSmith's worker pool. Compiled agents are
+# shared across examples per jurisdiction by AGENT_CACHE, so concurrency only
+# costs model/search quota; rate-limited examples back off and retry.
+DEFAULT_MAX_CONCURRENCY = 4
+RATE_LIMIT_ATTEMPTS = 6
+
 
+def _is_rate_limited(e: BaseException) -> bool:
+    """True for a 429 from Gemini or Vertex AI Search, however it is wrapped.
+
+    langchain_google_genai raises ChatGoogleGenerativeAIError from the
+    google.genai ClientError, so the cause chain is searched.
+    """
+    chain: List[BaseException] = []
+    cur: Optional[BaseException] = e
+    while cur is not None and cur not in chain:
+        chain.append(cur)
+        cur = cur.__cause__ or cur.__context__
+    return any(
+        (isinstance(exc, genai_errors.APIError) and exc.code == 429)
+        or isinstance(
+            exc,
+            (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests),
+        )
+        for exc in chain
+    )
+
+
+@retry(
+    retry=retry_if_exception(_is_rate_limited),
+    stop=stop_after_attempt(RATE_LIMIT_ATTEMPTS),
+    # Jittered so concurrent workers that hit the limit together spread out.
+    wait=wait_random_exponential(multiplier=2, max=60),
+    reraise=True,
+    before_sleep=lambda rs: _logger.warning(
+        "Rate limited, retrying example (attempt %d): %s",
+        rs.attempt_number,
+        rs.outcome.exception() if rs.outcome else None,
+    ),
+)
 def agent_wrapper(inputs) -> Dict[str, str]:
     """Wrapper function that runs the LangChain agent on a single test case.
 
@@ -121,12 +173,74 @@ def _df_to_scenario_results(
     return scenarios
 
 
+def _print_summary(mean_scores: Dict[str, float]) -> None:
+    print("\n=== Evaluation Results ===")
+
+    # Print aggregate summary.
+    print("\n=== Aggregate Summary ===")
+    if mean_scores:
+        for name, mean in mean_scores.items():
+            print(f"{name}  {mean * 100:.1f}%")
+    else:
+        print("No feedback columns found.")
+
+
+def _run_with_checkpoint(
+    ls_client: Client,
+    dataset_name: str,
+    checkpoint: EvalCheckpoint,
+    **evaluate_kwargs: Any,
+) -> None:
+    """Run only the example repetitions the checkpoint is missing.
+
+    Each finished run is appended to the checkpoint as it completes. The
+    first invocation creates the experiment; later ones extend it.
+    """
+    examples = list(ls_client.list_examples(dataset_name=dataset_name))
+    remaining = checkpoint.remaining([str(ex.id) for ex in examples])
+    todo = [ex for ex in examples for _ in range(remaining.get(str(ex.id), 0))]
+    if checkpoint.experiment_name is not None:
+        print(
+            f"Resuming experiment {checkpoint.experiment_name}: "
+            f"{len(todo)} run(s) remaining"
+        )
+        # evaluate() accepts either an existing experiment or a prefix for a
+        # new one, not both.
+        evaluate_kwargs.pop("experiment_prefix", None)
+        evaluate_kwargs["experiment"] = checkpoint.experiment_name
+    if not todo:
+        return
+
+    results = evaluate(
+        agent_wrapper,
+        client=ls_client,
+        data=todo,
+        num_repetitions=1,
+        blocking=False,
+        **evaluate_kwargs,
+    )
+    checkpoint.start(results.experiment_name)
+    failed = 0
+    for result in results:
+        row = row_from_result(result)
+        if row is None:
+            failed += 1
+        else:
+            checkpoint.record(row)
+    if failed:
+        print(
+            f"{failed} run(s) failed and were not checkpointed; "
+            "rerun with the same --checkpoint to retry them."
+        )
+
+
 # TODO: https://docs.langchain.com/langsmith/multi-turn-simulation
 def run_evaluation(
     dataset_name="tenant-legal-qa-scenarios",
     experiment_prefix="tfa-",
     num_repetitions: int = 1,
-    max_concurrency: Optional[int] = 1,
+    max_concurrency: Optional[int] = DEFAULT_MAX_CONCURRENCY,
+    checkpoint_path: Optional[Path] = None,
 ):
     """Run automated evaluation on LangSmith dataset.
 
@@ -134,9 +248,13 @@ def run_evaluation(
         dataset_name: Name of LangSmith dataset to evaluate
         experiment_prefix: Name for this evaluation run
         num_repetitions: Number of repetitions per example
+        max_concurrency: Number of examples run in parallel
+        checkpoint_path: Local JSONL file recording completed runs. If it
+            already exists, the run resumes: only missing repetitions are
+            executed, into the same experiment.
 
     Returns:
-        Evaluation results object
+        Evaluation results object, or None in checkpoint mode
     """
     ls_client = Client(api_key=LANGSMITH_API_KEY)
 
@@ -159,15 +277,9 @@ def run_evaluation(
         # performance_evaluator,
     ]  # noqa
 
-    # Run evaluation with all evaluators.
-    results = evaluate(
-        agent_wrapper,
-        client=ls_client,
-        data=dataset_name,
+    evaluate_kwargs: Dict[str, Any] = dict(
         evaluators=evaluators,
         experiment_prefix=experiment_prefix,
-        # max_concurrency=5,  # Run 5 evaluations in parallel.
-        num_repetitions=num_repetitions,
         metadata={
             "LLM model name": SINGLETON.MODEL_NAME,
             "LLM model temperature": SINGLETON.MODEL_TEMPERATURE,
@@ -176,30 +288,40 @@ def run_evaluation(
         max_concurrency=max_concurrency,
     )
 
-    # Print summary.
-    print("\n=== Evaluation Results ===")
-
-    # Print aggregate summary.
-    print("\n=== Aggregate Summary ===")
-    df = results.to_pandas()
-    score_cols = [c for c in df.columns if c.startswith("feedback.")]
-    if score_cols:
-        scores = df[score_cols].mean() * 100
-        scores.index = scores.index.str.removeprefix("feedback.")
-        print(scores.to_string(float_format=lambda x: f"{x:.1f}%"))
+    results = None
+    if checkpoint_path is not None:
+        checkpoint = EvalCheckpoint.open(checkpoint_path, dataset_name, num_repetitions)
+        _run_with_checkpoint(ls_client, dataset_name, checkpoint, **evaluate_kwargs)
+        if checkpoint.experiment_name is None:
+            print("Nothing to evaluate.")
+            return None
+        experiment_name = checkpoint.experiment_name
+        _print_summary(checkpoint.mean_scores())
+        scenario_results = checkpoint.scenario_results()
     else:
-        print("No feedback columns found.")
+        # Run evaluation with all evaluators.
+        results = evaluate(
+            agent_wrapper,
+            client=ls_client,
+            data=dataset_name,
+            num_repetitions=num_repetitions,
+            **evaluate_kwargs,
+        )
+        experiment_name = results.experiment_name
+        df = results.to_pandas()
+        score_cols = [c for c in df.columns if c.startswith("feedback.")]
+        _print_summary({c.removeprefix("feedback."): df[c].mean() for c in score_cols})
+        scenario_results = _df_to_scenario_results(df, client=ls_client)
 
-    scenario_results = _df_to_scenario_results(df, client=ls_client)
     print_consistency_stats(scenario_results)
 
-    print(f"\nExperiment: {results.experiment_name}")
+    print(f"\nExperiment: {experiment_name}")
 
     dataset_version = (
         dataset.modified_at.isoformat() if dataset.modified_at else "unknown"
     )
     write_run_entry(
-        experiment_name=results.experiment_name,
+        experiment_name=experiment_name,
         scenarios=scenario_results,
         dataset_name=dataset_name,
         dataset_version=dataset_version,
@@ -210,8 +332,6 @@ def run_evaluation(
 
 
 def main() -> None:
-    import logging
-
     # Configure logging after constants was imported above so ENV from .env is honored.
     configure_logging()
 
@@ -239,9 +359,16 @@ def main() -> None:
     parser.add_argument(
         "--max-concurrency",
         type=int,
-        default=1,
+        default=DEFAULT_MAX_CONCURRENCY,
         help="Maximum number of concurrent runs",
     )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="JSONL file recording completed runs; rerun with the same path to "
+        "resume an interrupted evaluation",
+    )
 
     args = parser.parse_args()
 
@@ -250,6 +377,7 @@ def main() -> None:
         experiment_prefix=args.experiment,
         num_repetitions=args.num_repetitions,
         max_concurrency=args.max_concurrency,
+        checkpoint_path=args.checkpoint,
     )
 
 
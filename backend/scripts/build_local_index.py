@@ -0,0 +1,107 @@
+"""Build the bundled BM25 index used for local statute retrieval.
+
+Chunks every .txt under backend/scripts/documents/or/ into passages, tags each
+with the same city/state metadata generate_metadata_jsonl assigns for Vertex
+AI Search, and writes the inverted index to tenantfirstaid/local_index.json.gz
+(see tenantfirstaid/local_retrieval.py). The output is deterministic; rebuild
+and commit it whenever the documents change.
+
+To run:
+  make build-local-index
+"""
+
+import argparse
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+from scripts.enforce_ascii import validate_and_rewrite_tree
+from scripts.generate_metadata_jsonl import DOCUMENTS_DIR, infer_city
+from tenantfirstaid.constants import LOCAL_INDEX_PATH
+from tenantfirstaid.local_retrieval import BM25Index, Passage
+
+# Start of a section: ORS/city code numbers ("90.100 Definitions.",
+# "30.01.030 Definitions.", "8.425 Rental Housing") or OAR rule numbers
+# ("411-054-0005").
+SECTION_HEADING = re.compile(r"^(?:\d+[A-Z]?\.\d+(?:\.\d+)*|\d{3}-\d{3}-\d{4})\s")
+
+# A heading only starts a new passage once the current one has MIN_WORDS, so
+# runs of short lines (tables of contents, one-line sections) are grouped.
+# Passages are cut at MAX_WORDS regardless of headings.
+MIN_WORDS = 60
+MAX_WORDS = 300
+
+
+def chunk_text(text: str) -> Iterator[str]:
+    """Split a document into passages at section boundaries."""
+    lines: list[str] = []
+    words = 0
+
+    def flush() -> Iterator[str]:
+        nonlocal lines, words
+        if lines:
+            yield "\n".join(lines)
+        lines, words = [], 0
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        line_words = line.split()
+        if SECTION_HEADING.match(line) and words >= MIN_WORDS:
+            yield from flush()
+        # Long paragraphs are cut into MAX_WORDS windows of their own.
+        while len(line_words) > MAX_WORDS:
+            yield from flush()
+            yield " ".join(line_words[:MAX_WORDS])
+            line_words = line_words[MAX_WORDS:]
+        if words + len(line_words) > MAX_WORDS:
+            yield from flush()
+        lines.append(" ".join(line_words))
+        words += len(line_words)
+    yield from flush()
+
+
+def iter_passages(documents_dir: Path) -> Iterator[Passage]:
+    for txt_file in sorted(documents_dir.rglob("*.txt")):
+        city = infer_city(txt_file.relative_to(documents_dir))
+        for chunk in chunk_text(txt_file.read_text(encoding="utf-8")):
+            yield Passage(text=chunk, source=txt_file.stem, state="or", city=city)
+
+
+def build_index(documents_dir: Path) -> BM25Index:
+    validate_and_rewrite_tree(documents_dir, check_only=True)
+    return BM25Index.build(iter_passages(documents_dir))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--documents-dir",
+        type=Path,
+        default=DOCUMENTS_DIR,
+        help=f"Root of documents tree (default: {DOCUMENTS_DIR}).",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=LOCAL_INDEX_PATH,
+        help=f"Where to write the index (default: {LOCAL_INDEX_PATH}).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    index = build_index(args.documents_dir)
+    index.save(args.output)
+    print(
+        f"Wrote {len(index)} passages ({len(index.postings)} terms) "
+        f"to {args.output} ({args.output.stat().st_size // 1024} KiB)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,22 +4,37 @@ Companion to scripts.upload_to_gcs. Creates an unstructured, search-only
 datastore configured for GCS ingestion and triggers an import from
 gs://<bucket>/metadata.jsonl. Polls until the import finishes unless
 --no-wait is passed. Run via `make create-datastore-gcs`.
+
+With --incremental, no datastore is created: the documents queued in
+pending_import.json by generate-metadata are upserted into the existing
+datastore (content is read from the bucket, so upload with --sync first) and
+queued deletions are removed, instead of re-importing the whole corpus. Once
+the import finishes, retrieval results cached for the datastore in the shared
+RETRIEVAL_CACHE_PATH file are dropped.
 """
 
 import argparse
+import json
 import sys
+from pathlib import Path
 from typing import cast
 
 from google.api_core import exceptions as gcp_exceptions
 from google.cloud import discoveryengine_v1 as discoveryengine
 from google.cloud import storage
 
+from scripts.ingest_manifest import (
+    DOCUMENTS_DIR,
+    PENDING_IMPORT_NAME,
+    load_pending_import,
+)
 from scripts.shared import collection_path, datastore_path, validate_resource_name
 from tenantfirstaid.constants import DEFAULT_VERTEX_AI_SEARCH_LOCATION, SINGLETON
 from tenantfirstaid.google_auth import (
     discoveryengine_client_options,
     load_gcp_credentials,
 )
+from tenantfirstaid.retrieval_cache import RETRIEVAL_CACHE
 
 METADATA_OBJECT_NAME = "metadata.jsonl"
 # Upper bound for the rollback delete-datastore LRO. If the same conditions
@@ -30,6 +45,8 @@ ROLLBACK_TIMEOUT_SECONDS = 120
 # Document protos (produced by generate_metadata_jsonl.py). Other valid values
 # are "content" and "custom", but those require different metadata formats.
 GCS_DATA_SCHEMA = "document"
+# Discovery Engine recommends at most 100 documents per inline import request.
+INLINE_IMPORT_BATCH_SIZE = 100
 
 
 class DatastoreError(RuntimeError):
@@ -153,6 +170,138 @@ def import_documents(
             print(f"  - {err.message}")
 
 
+def load_pending_documents(
+    documents_dir: Path, bucket: str
+) -> tuple[list[discoveryengine.Document], list[str]]:
+    """Return (documents to upsert, document ids to delete) from pending_import.json.
+
+    Upserted documents are read from metadata.jsonl in `documents_dir`.
+    """
+    pending = load_pending_import(documents_dir / PENDING_IMPORT_NAME)
+    wanted = set(pending["upsert"])
+    documents: list[discoveryengine.Document] = []
+    metadata_path = documents_dir / METADATA_OBJECT_NAME
+    if wanted:
+        with metadata_path.open() as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                doc = cast(
+                    discoveryengine.Document, discoveryengine.Document.from_json(line)
+                )
+                if doc.id in wanted:
+                    documents.append(doc)
+    missing = wanted - {doc.id for doc in documents}
+    if missing:
+        raise DatastoreError(
+            f"{metadata_path} has no entries for pending document(s) "
+            f"{', '.join(sorted(missing))}. Re-run generate-metadata without "
+            "LOC_OPTIONS, or with --full."
+        )
+    wrong_bucket = [
+        doc.id for doc in documents if not doc.content.uri.startswith(f"gs://{bucket}/")
+    ]
+    if wrong_bucket:
+        raise DatastoreError(
+            f"Pending document(s) {', '.join(sorted(wrong_bucket))} do not point at "
+            f"bucket {bucket!r}. Re-run generate-metadata with this bucket name."
+        )
+    return documents, pending["delete"]
+
+
+def import_documents_incremental(
+    client: discoveryengine.DocumentServiceClient,
+    project: str,
+    location: str,
+    datastore_id: str,
+    documents: list[discoveryengine.Document],
+    wait: bool,
+) -> None:
+    """Upsert `documents` into an existing datastore, leaving all others alone."""
+    parent = _branch_path(project, location, datastore_id)
+    operations = []
+    for start in range(0, len(documents), INLINE_IMPORT_BATCH_SIZE):
+        request = discoveryengine.ImportDocumentsRequest(
+            parent=parent,
+            inline_source=discoveryengine.ImportDocumentsRequest.InlineSource(
+                documents=documents[start : start + INLINE_IMPORT_BATCH_SIZE]
+            ),
+            reconciliation_mode=discoveryengine.ImportDocumentsRequest.ReconciliationMode.INCREMENTAL,
+        )
+        operation = client.import_documents(request=request)
+        print(f"Started import: {operation.operation.name}")
+        operations.append(operation)
+
+    if not wait:
+        return
+    for operation in operations:
+        response = operation.result()
+        metadata = cast(discoveryengine.ImportDocumentsMetadata, operation.metadata)
+        print(
+            "Import finished. "
+            f"success={metadata.success_count} failure={metadata.failure_count}"
+        )
+        if metadata.failure_count:
+            raise DatastoreError(
+                f"{metadata.failure_count} document(s) failed to import: "
+                + "; ".join(err.message for err in response.error_samples)
+            )
+
+
+def delete_documents(
+    client: discoveryengine.DocumentServiceClient,
+    project: str,
+    location: str,
+    datastore_id: str,
+    doc_ids: list[str],
+) -> None:
+    parent = _branch_path(project, location, datastore_id)
+    for doc_id in doc_ids:
+        try:
+            client.delete_document(name=f"{parent}/documents/{doc_id}")
+        except gcp_exceptions.NotFound:
+            pass
+        print(f"Deleted document {doc_id}")
+
+
+def run_incremental_import(
+    document_client: discoveryengine.DocumentServiceClient,
+    project: str,
+    location: str,
+    datastore_id: str,
+    bucket: str,
+    documents_dir: Path,
+    wait: bool,
+) -> None:
+    documents, to_delete = load_pending_documents(documents_dir, bucket)
+    if not documents and not to_delete:
+        print("Nothing pending; the datastore is up to date.")
+        return
+
+    import_documents_incremental(
+        document_client, project, location, datastore_id, documents, wait=wait
+    )
+    delete_documents(document_client, project, location, datastore_id, to_delete)
+
+    if not wait:
+        print(
+            f"Skipping wait (--no-wait); {PENDING_IMPORT_NAME} is kept. "
+            "Check the operation status in the console, then delete it."
+        )
+        return
+    pending_path = documents_dir / PENDING_IMPORT_NAME
+    pending_path.write_text(
+        json.dumps({"upsert": [], "delete": []}, indent=1) + "\n", encoding="utf-8"
+    )
+    # Cached passages for this datastore may quote replaced or deleted
+    # documents. Only reaches a cache shared through RETRIEVAL_CACHE_PATH.
+    RETRIEVAL_CACHE.invalidate_datastore(datastore_id)
+    print(
+        f"Done. Upserted {len(documents)} and deleted {len(to_delete)} document(s) "
+        f"in {datastore_id}."
+    )
+
+
 def delete_datastore(
     client: discoveryengine.DataStoreServiceClient,
     datastore_name: str,
@@ -208,6 +357,19 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Print the resolved plan but do not call the Discovery Engine API.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Apply {PENDING_IMPORT_NAME} to an existing datastore instead of "
+        "creating one. Only for datastores not yet deployed to any environment.",
+    )
+    parser.add_argument(
+        "--documents-dir",
+        type=Path,
+        default=DOCUMENTS_DIR,
+        help=f"Directory holding metadata.jsonl and {PENDING_IMPORT_NAME} "
+        f"(default: {DOCUMENTS_DIR}).",
+    )
     return parser.parse_args()
 
 
@@ -216,6 +378,32 @@ def main() -> None:
     project = SINGLETON.GOOGLE_CLOUD_PROJECT
     display_name = args.display_name or args.datastore_id
 
+    if args.incremental:
+        pending = load_pending_import(args.documents_dir / PENDING_IMPORT_NAME)
+        print(
+            f"Plan: apply {len(pending['upsert'])} upsert(s) and "
+            f"{len(pending['delete'])} deletion(s) to existing datastore "
+            f"{datastore_path(project, args.location, args.datastore_id)!r}."
+        )
+        if args.dry_run:
+            print("[dry-run] no Discovery Engine API calls made.")
+            return
+        credentials = load_gcp_credentials(SINGLETON.GOOGLE_APPLICATION_CREDENTIALS)
+        document_client = discoveryengine.DocumentServiceClient(
+            credentials=credentials,
+            client_options=discoveryengine_client_options(args.location),
+        )
+        run_incremental_import(
+            document_client,
+            project,
+            args.location,
+            args.datastore_id,
+            args.bucket,
+            args.documents_dir,
+            wait=args.wait,
+        )
+        return
+
     print(
         f"Plan: create datastore {datastore_path(project, args.location, args.datastore_id)!r} "
         f"(display_name={display_name!r}) and import from "
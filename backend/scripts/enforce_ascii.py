@@ -3,16 +3,28 @@
 Vertex AI RAG ingestion has produced mojibake when UTF-8 is present, so every
 .txt under backend/scripts/documents/ must be pure ASCII before upload. Run
 via `make enforce-ascii` (pass `ASCII_OPTIONS=--check` for CI validation).
+
+Files are checked in parallel across processes, and files larger than
+STREAM_THRESHOLD_BYTES are normalized chunk by chunk rather than read whole.
 """
 
 import argparse
 import re
 import sys
 import unicodedata
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
 from pathlib import Path
 
+from scripts.ingest_manifest import MANIFEST_NAME, IngestManifest
+
 DOCUMENTS_DIR = Path(__file__).parent / "documents" / "or"
+STREAM_THRESHOLD_BYTES = 4 * 1024 * 1024
+_STREAM_CHUNK_CHARS = 1024 * 1024
+# Below this many files, a process pool costs more than it saves.
+_MIN_FILES_FOR_POOL = 8
 
 
 class InvalidUtf8Error(RuntimeError):
@@ -63,20 +75,49 @@ ASCII_REPLACEMENTS = [
 ]
 
 
+_SECTION_SIGN_RE = re.compile(r"§(§?)\s*")
+# A trailing run like "§ " may continue into the next chunk ("§\n\n90.100").
+_SECTION_SIGN_TAIL_RE = re.compile(r"§+\s*\Z")
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+
+def _section_replacement(match: re.Match[str]) -> str:
+    return "Sections " if match.group(1) else "Section "
+
+
 def _apply_ascii_replacements(text: str) -> str:
-    section_sign = "§"
-    text = re.sub(section_sign * 2 + r"\s*", "Sections ", text)
-    text = re.sub(section_sign + r"\s*", "Section ", text)
+    text = _SECTION_SIGN_RE.sub(_section_replacement, text)
+    # One str.replace per entry is faster than a single str.translate here:
+    # each replace is a C-level scan, while translate falls back to a slow
+    # per-character path for non-ASCII input.
     for orig, repl in ASCII_REPLACEMENTS:
         text = text.replace(orig, repl)
     return text
 
 
-def _collect_unrecognized(text: str) -> dict[str, int]:
-    result: dict[str, int] = {}
-    for i, c in enumerate(text):
-        if ord(c) > 127 and c not in result:
-            result[c] = i
+def _iter_ascii_replacements(chunks: Iterable[str]) -> Iterator[str]:
+    """Apply _apply_ascii_replacements to a text split across chunks.
+
+    Holds back a trailing section sign (and any whitespace after it) until
+    the next chunk, so the result matches replacing the joined text.
+    """
+    pending = ""
+    for chunk in chunks:
+        text = pending + chunk
+        tail = _SECTION_SIGN_TAIL_RE.search(text)
+        cut = tail.start() if tail else len(text)
+        pending = text[cut:]
+        yield _apply_ascii_replacements(text[:cut])
+    if pending:
+        yield _apply_ascii_replacements(pending)
+
+
+def _collect_unrecognized(
+    text: str, offset: int = 0, result: dict[str, int] | None = None
+) -> dict[str, int]:
+    result = {} if result is None else result
+    for m in _NON_ASCII_RE.finditer(text):
+        result.setdefault(m.group(), m.start() + offset)
     return result
 
 
@@ -108,23 +149,8 @@ def enforce_ascii(path: Path) -> str | None:
 
     unrecognized = _collect_unrecognized(text)
     if unrecognized:
-        lines = []
-        for char, pos in unrecognized.items():
-            suggestion = _suggest_ascii(char)
-            if suggestion:
-                lines.append(
-                    f'    consider adding ("{char}", "{suggestion}") '
-                    "to ASCII_REPLACEMENTS in scripts/enforce_ascii.py"
-                )
-            else:
-                lines.append(
-                    f"    {repr(char)} ({unicodedata.name(char, repr(char))}, pos {pos})"
-                    " -- no obvious replacement, fix the source file"
-                )
-        n = len(unrecognized)
         raise UnrecognizedAsciiError(
-            f"{path.name}: {n} unrecognized non-ASCII character{'s' if n > 1 else ''}:\n"
-            + "\n".join(lines),
+            _unrecognized_message(path, unrecognized),
             partial_text=text,
             unrecognized=unrecognized,
         )
@@ -132,6 +158,98 @@ def enforce_ascii(path: Path) -> str | None:
     return text
 
 
+def _unrecognized_message(path: Path, unrecognized: dict[str, int]) -> str:
+    lines = []
+    for char, pos in unrecognized.items():
+        suggestion = _suggest_ascii(char)
+        if suggestion:
+            lines.append(
+                f'    consider adding ("{char}", "{suggestion}") '
+                "to ASCII_REPLACEMENTS in scripts/enforce_ascii.py"
+            )
+        else:
+            lines.append(
+                f"    {repr(char)} ({unicodedata.name(char, repr(char))}, pos {pos})"
+                " -- no obvious replacement, fix the source file"
+            )
+    n = len(unrecognized)
+    return (
+        f"{path.name}: {n} unrecognized non-ASCII character{'s' if n > 1 else ''}:\n"
+        + "\n".join(lines)
+    )
+
+
+@dataclass
+class _FileResult:
+    name: str
+    # Rewritten (or, in check_only mode, would be).
+    rewritten: bool = False
+    invalid_utf8: bool = False
+    unrecognized: dict[str, int] = field(default_factory=dict)
+
+
+def _stream_file(path: Path, *, check_only: bool) -> _FileResult:
+    """Chunked equivalent of enforce_ascii plus the write, for large files.
+
+    Writes to a sibling temporary file and swaps it in, so memory use stays
+    bounded by the chunk size.
+    """
+    result = _FileResult(path.name)
+    tmp = path.with_name(path.name + ".ascii-tmp")
+    offset = 0
+    try:
+        with path.open(encoding="utf-8") as src:
+            chunks = iter(lambda: src.read(_STREAM_CHUNK_CHARS), "")
+
+            def track_non_ascii(chunks: Iterator[str]) -> Iterator[str]:
+                for chunk in chunks:
+                    if not chunk.isascii():
+                        result.rewritten = True
+                    yield chunk
+
+            dst = None if check_only else tmp.open("w", encoding="utf-8")
+            try:
+                for out in _iter_ascii_replacements(track_non_ascii(chunks)):
+                    _collect_unrecognized(out, offset, result.unrecognized)
+                    offset += len(out)
+                    if dst is not None:
+                        dst.write(out)
+            finally:
+                if dst is not None:
+                    dst.close()
+    except UnicodeDecodeError:
+        tmp.unlink(missing_ok=True)
+        return _FileResult(path.name, invalid_utf8=True)
+
+    if result.rewritten and not check_only:
+        tmp.replace(path)
+    else:
+        tmp.unlink(missing_ok=True)
+    return result
+
+
+def _process_file(path: Path, check_only: bool) -> _FileResult:
+    """Validate one file and, unless check_only, write its rewrite.
+
+    Runs in a worker process, so only the small result crosses back.
+    """
+    if path.stat().st_size > STREAM_THRESHOLD_BYTES:
+        return _stream_file(path, check_only=check_only)
+    try:
+        rewritten = enforce_ascii(path)
+    except InvalidUtf8Error:
+        return _FileResult(path.name, invalid_utf8=True)
+    except UnrecognizedAsciiError as e:
+        if not check_only:
+            path.write_text(e.partial_text, encoding="utf-8")
+        return _FileResult(path.name, rewritten=True, unrecognized=e.unrecognized)
+    if rewritten is None:
+        return _FileResult(path.name)
+    if not check_only:
+        path.write_text(rewritten, encoding="ascii")
+    return _FileResult(path.name, rewritten=True)
+
+
 def print_warning_table(
     file_issues: list[tuple[str, dict[str, int] | None]],
 ) -> None:
@@ -184,48 +302,45 @@ def validate_and_rewrite_tree(
     *,
     file_filter: Callable[[Path], bool] | None = None,
     check_only: bool = False,
+    workers: int | None = None,
 ) -> None:
     """Walk root for .txt files, apply ASCII replacements in place, and validate.
 
     In check_only mode, raises without writing if any rewrites would be needed.
     Otherwise applies partial rewrites even when some files fail, so the next
-    run sees progress.
+    run sees progress. Files are processed in up to `workers` processes
+    (default: one per CPU).
     """
+    files = [
+        txt_file
+        for txt_file in sorted(root.rglob("*.txt"))
+        if file_filter is None or file_filter(txt_file)
+    ]
+    if workers == 1 or len(files) < _MIN_FILES_FOR_POOL:
+        results = [_process_file(f, check_only) for f in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_process_file, files, repeat(check_only)))
+
     file_issues: list[tuple[str, dict[str, int] | None]] = []
-    pending_rewrites: list[tuple[Path, str, str]] = []  # (path, text, encoding)
-
-    for txt_file in sorted(root.rglob("*.txt")):
-        if file_filter is not None and not file_filter(txt_file):
-            continue
-        try:
-            rewritten = enforce_ascii(txt_file)
-            if rewritten is not None:
-                pending_rewrites.append((txt_file, rewritten, "ascii"))
-        except InvalidUtf8Error:
-            file_issues.append((txt_file.name, None))
-        except UnrecognizedAsciiError as e:
-            pending_rewrites.append((txt_file, e.partial_text, "utf-8"))
-            file_issues.append((txt_file.name, e.unrecognized))
+    for r in results:
+        if r.invalid_utf8:
+            file_issues.append((r.name, None))
+        elif r.unrecognized:
+            file_issues.append((r.name, r.unrecognized))
 
+    if file_issues:
+        print_warning_table(file_issues)
     if check_only:
-        if pending_rewrites or file_issues:
-            print_warning_table(file_issues)
-            # Partial rewrites appear in both lists; subtract them out to count
-            # only files that would be cleanly rewritten.
-            n_rewrites = len(pending_rewrites) - len(
-                [f for f in file_issues if f[1] is not None]
-            )
+        n_rewrites = sum(1 for r in results if r.rewritten and not r.unrecognized)
+        if n_rewrites or file_issues:
             raise RuntimeError(
                 f"ASCII validation failed: {len(file_issues)} file(s) with issues, "
                 f"{n_rewrites} file(s) would be rewritten."
             )
         return
 
-    for path, text, encoding in pending_rewrites:
-        path.write_text(text, encoding=encoding)
-
     if file_issues:
-        print_warning_table(file_issues)
         raise RuntimeError(
             f"{len(file_issues)} file(s) failed ASCII validation -- see warnings above."
         )
@@ -247,12 +362,33 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Validate only; do not rewrite files. Exit nonzero if any rewrites would occur.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Skip files unchanged since they were recorded in {MANIFEST_NAME} "
+        "by generate-metadata.",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    validate_and_rewrite_tree(args.root, check_only=args.check)
+    file_filter = None
+    if args.incremental:
+        manifest = IngestManifest.load(args.root / MANIFEST_NAME, args.root)
+        file_filter = manifest.has_changed
+    validate_and_rewrite_tree(
+        args.root,
+        file_filter=file_filter,
+        check_only=args.check,
+        workers=args.workers,
+    )
     if args.check:
         print(f"OK: {args.root} is pure ASCII.")
     else:
@@ -7,6 +7,11 @@ GCS URIs point to the bucket root (files are uploaded flat, not mirrored).
 ASCII enforcement runs first via scripts.enforce_ascii so that any non-ASCII
 content is rewritten in place (or fails loudly with a suggestion table).
 
+Each run records what it emitted in manifest.json (see scripts.ingest_manifest):
+only files changed since the last run are re-validated (pass --full to check
+every file), and the added, changed and removed document ids are reported and
+queued in pending_import.json for an incremental datastore import.
+
 To run:
   make generate-metadata GCS_BUCKET_NAME=<bucket>                                    # all documents
   make generate-metadata GCS_BUCKET_NAME=<bucket> LOC_OPTIONS="--oregon"             # Oregon state only
@@ -22,6 +27,13 @@ from google.cloud.discoveryengine_v1.types import Document
 from google.protobuf.json_format import MessageToDict
 
 from scripts.enforce_ascii import validate_and_rewrite_tree
+from scripts.ingest_manifest import (
+    MANIFEST_NAME,
+    PENDING_IMPORT_NAME,
+    IngestDiff,
+    IngestManifest,
+    merge_pending_import,
+)
 
 DOCUMENTS_DIR = Path(__file__).parent / "documents" / "or"
 OUTPUT_FILE = DOCUMENTS_DIR / "metadata.jsonl"
@@ -44,13 +56,10 @@ def _in_scope(city: str | None, scopes: set[str]) -> bool:
     return scope in scopes
 
 
-def build_entries(documents_dir: Path, bucket: str, scopes: set[str]) -> list[Document]:
-    def in_scope(path: Path) -> bool:
-        return _in_scope(infer_city(path.relative_to(documents_dir)), scopes)
-
-    validate_and_rewrite_tree(documents_dir, file_filter=in_scope)
-
-    entries: list[Document] = []
+def _collect_entries(
+    documents_dir: Path, bucket: str, scopes: set[str]
+) -> list[tuple[Path, Document]]:
+    entries: list[tuple[Path, Document]] = []
     seen_ids: set[str] = set()
 
     for txt_file in sorted(documents_dir.rglob("*.txt")):
@@ -66,12 +75,15 @@ def build_entries(documents_dir: Path, bucket: str, scopes: set[str]) -> list[Do
         seen_ids.add(txt_file.stem)
 
         entries.append(
-            Document(
-                id=txt_file.stem,
-                struct_data={"city": city, "state": "or"},
-                content=Document.Content(
-                    mime_type="text/plain",
-                    uri=f"gs://{bucket}/{txt_file.name}",
+            (
+                txt_file,
+                Document(
+                    id=txt_file.stem,
+                    struct_data={"city": city, "state": "or"},
+                    content=Document.Content(
+                        mime_type="text/plain",
+                        uri=f"gs://{bucket}/{txt_file.name}",
+                    ),
                 ),
             )
         )
@@ -79,6 +91,46 @@ def build_entries(documents_dir: Path, bucket: str, scopes: set[str]) -> list[Do
     return entries
 
 
+def build_entries(documents_dir: Path, bucket: str, scopes: set[str]) -> list[Document]:
+    def in_scope(path: Path) -> bool:
+        return _in_scope(infer_city(path.relative_to(documents_dir)), scopes)
+
+    validate_and_rewrite_tree(documents_dir, file_filter=in_scope)
+    return [doc for _, doc in _collect_entries(documents_dir, bucket, scopes)]
+
+
+def build_entries_incremental(
+    documents_dir: Path,
+    bucket: str,
+    scopes: set[str],
+    manifest: IngestManifest,
+    *,
+    full: bool = False,
+) -> tuple[list[Document], IngestDiff]:
+    """Like build_entries, but only validates files changed since `manifest`
+    (every in-scope file when `full`).
+
+    Updates `manifest` in memory and returns the entries plus what changed.
+    """
+
+    def in_scope(path: Path) -> bool:
+        return _in_scope(infer_city(path.relative_to(documents_dir)), scopes)
+
+    validate_and_rewrite_tree(
+        documents_dir,
+        file_filter=lambda p: in_scope(p) and (full or manifest.has_changed(p)),
+    )
+    collected = _collect_entries(documents_dir, bucket, scopes)
+    diff = manifest.record(
+        {
+            path: (doc.id, dict(doc.struct_data), doc.content.uri)
+            for path, doc in collected
+        },
+        in_scope=lambda rel: _in_scope(infer_city(rel), scopes),
+    )
+    return [doc for _, doc in collected], diff
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
@@ -106,6 +158,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Include Eugene documents.",
     )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help=f"Re-validate every file, not just those changed since {MANIFEST_NAME}.",
+    )
     return parser.parse_args()
 
 
@@ -120,7 +177,11 @@ def main() -> None:
     if args.include_eugene:
         scopes.add("eugene")
 
-    entries = build_entries(DOCUMENTS_DIR, bucket, scopes)
+    manifest_path = DOCUMENTS_DIR / MANIFEST_NAME
+    manifest = IngestManifest.load(manifest_path, DOCUMENTS_DIR)
+    entries, diff = build_entries_incremental(
+        DOCUMENTS_DIR, bucket, scopes, manifest, full=args.full
+    )
 
     with OUTPUT_FILE.open("w") as f:
         for entry in entries:
@@ -129,6 +190,15 @@ def main() -> None:
 
     print(f"Wrote {len(entries)} entries to {OUTPUT_FILE}")
 
+    manifest.save(manifest_path)
+    pending_path = DOCUMENTS_DIR / PENDING_IMPORT_NAME
+    pending = merge_pending_import(pending_path, diff)
+    print(f"Changes since the last run: {diff.report()}")
+    print(
+        f"Pending incremental import ({pending_path.name}): "
+        f"{len(pending['upsert'])} to upsert, {len(pending['delete'])} to delete"
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,190 @@
+"""Cold import-time benchmark for the backend app.
+
+Imports `tenantfirstaid.app` in fresh interpreters with `python -X importtime`
+and reports the median time to import it and the packages that take longest.
+Every gunicorn worker (or, with preloading, the master) pays this on start.
+
+It fails (exit status 1) when the median exceeds --budget seconds, or when
+importing the app loads a dependency that should only load on first use:
+the Gemini client (first model call), the Vertex AI Search retriever (first
+RAG call) and xhtml2pdf (first feedback transcript). Run via
+`make import-time`.
+
+One untimed import runs first so that bytecode compilation is not measured.
+Placeholder values are used for environment variables the app requires but
+that are not set.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TARGET = "tenantfirstaid.app"
+
+# Generous for a laptop or CI runner; importing the deferred dependencies
+# eagerly again adds well over a second.
+DEFAULT_BUDGET_SECONDS = 2.5
+
+# Imported on first use of the feature that needs them, never with the app.
+DEFERRED_MODULES = (
+    "langchain_google_genai",
+    "google.genai",
+    "langchain_google_community",
+    "xhtml2pdf",
+)
+
+# tenantfirstaid.constants refuses to import without these.
+_PLACEHOLDER_ENV = {
+    "MODEL_NAME": "import-time",
+    "GOOGLE_CLOUD_PROJECT": "import-time",
+    "GOOGLE_CLOUD_LOCATION": "global",
+    "GOOGLE_APPLICATION_CREDENTIALS": "/dev/null",
+    "VERTEX_AI_DATASTORE_LAWS": "import-time-laws",
+}
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """Map each imported module to its (self, cumulative) time in microseconds."""
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            # The header line.
+            continue
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+@dataclass
+class ImportTimeResult:
+    target: str
+    # Cumulative import time of the target per run, in seconds.
+    seconds: List[float] = field(default_factory=list)
+    # Self time per top-level package in the last run, in seconds.
+    packages: Dict[str, float] = field(default_factory=dict)
+    deferred_loaded: List[str] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.seconds)
+
+    def problems(self, budget: float) -> List[str]:
+        found = [
+            f"{name} is imported with {self.target}" for name in self.deferred_loaded
+        ]
+        if self.median > budget:
+            found.append(
+                f"median import time {self.median:.2f}s exceeds the "
+                f"{budget:.2f}s budget"
+            )
+        return found
+
+    def summary(self, budget: float, top: int = 10) -> dict:
+        heaviest = sorted(self.packages.items(), key=lambda kv: kv[1], reverse=True)
+        return {
+            "target": self.target,
+            "runs": len(self.seconds),
+            "median_s": round(self.median, 3),
+            "min_s": round(min(self.seconds), 3),
+            "max_s": round(max(self.seconds), 3),
+            "budget_s": budget,
+            "heaviest": {name: round(s, 3) for name, s in heaviest[:top]},
+            "problems": self.problems(budget),
+        }
+
+
+def _import_once(target: str, env: Dict[str, str]) -> Dict[str, Tuple[int, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def measure(target: str = TARGET, runs: int = 5) -> ImportTimeResult:
+    """Import `target` in `runs` fresh interpreters, after one untimed import."""
+    if runs < 1:
+        raise ValueError(f"runs must be at least 1, got {runs}")
+    env = {**_PLACEHOLDER_ENV, **os.environ}
+    _import_once(target, env)
+    result = ImportTimeResult(target)
+    modules: Dict[str, Tuple[int, int]] = {}
+    for _ in range(runs):
+        modules = _import_once(target, env)
+        result.seconds.append(modules[target][1] / 1e6)
+
+    packages: Dict[str, float] = defaultdict(float)
+    for name, (self_us, _) in modules.items():
+        packages[name.split(".")[0]] += self_us / 1e6
+    result.packages = dict(packages)
+    result.deferred_loaded = [
+        name
+        for name in DEFERRED_MODULES
+        if any(m == name or m.startswith(name + ".") for m in modules)
+    ]
+    return result
+
+
+def _print_summary(summary: dict) -> None:
+    print(f"import {summary['target']} ({summary['runs']} runs)")
+    print(
+        f"  median: {summary['median_s']:.3f}s  "
+        f"(min {summary['min_s']:.3f}s, max {summary['max_s']:.3f}s, "
+        f"budget {summary['budget_s']:.2f}s)"
+    )
+    print("  heaviest packages (self time):")
+    for name, seconds in summary["heaviest"].items():
+        print(f"    {seconds:7.3f}s  {name}")
+    for problem in summary["problems"]:
+        print(f"  FAIL: {problem}")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Timed imports (default: 5)."
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_SECONDS,
+        help=f"Median seconds allowed (default: {DEFAULT_BUDGET_SECONDS}).",
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Packages to list (default: 10)."
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the summary as JSON."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    summary = measure(runs=args.runs).summary(args.budget, args.top)
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        _print_summary(summary)
+    return 1 if summary["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Manifest of the last-emitted state of each law document, for incremental ingestion.
+
+generate_metadata_jsonl records every document it emits (size, mtime, content
+hash, Document id, struct_data and URI) in manifest.json next to
+metadata.jsonl. On the next run, files whose content hash is unchanged are
+not re-validated, and the differences are merged into pending_import.json:
+the document ids to upsert and to delete. `make create-datastore-gcs` with
+DATASTORE_OPTIONS=--incremental imports just those documents into an existing
+datastore and clears the pending file.
+
+Size and mtime are only a shortcut: when both match, the recorded hash is
+trusted without reading the file.
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+DOCUMENTS_DIR = Path(__file__).parent / "documents" / "or"
+# Both files live in the documents directory they describe.
+MANIFEST_NAME = "manifest.json"
+PENDING_IMPORT_NAME = "pending_import.json"
+MANIFEST_VERSION = 1
+
+
+class ManifestError(RuntimeError):
+    """Raised when a manifest or pending-import file cannot be used."""
+
+
+def file_sha256(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    sha256: str
+    doc_id: str
+    struct_data: dict[str, Any]
+    uri: str
+
+
+@dataclass
+class IngestDiff:
+    """Document ids added, changed and removed relative to the manifest."""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def report(self) -> str:
+        lines = [
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {self.unchanged} unchanged"
+        ]
+        for label, ids in (
+            ("+", self.added),
+            ("~", self.changed),
+            ("-", self.removed),
+        ):
+            lines.extend(f"  {label} {doc_id}" for doc_id in ids)
+        return "\n".join(lines)
+
+
+@dataclass
+class IngestManifest:
+    """Per-file record keyed by path relative to the documents directory."""
+
+    root: Path
+    entries: dict[str, ManifestEntry] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, root: Path) -> "IngestManifest":
+        if not path.exists():
+            return cls(root)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != MANIFEST_VERSION:
+            raise ManifestError(
+                f"{path} has manifest version {data.get('version')!r}, "
+                f"expected {MANIFEST_VERSION}. Delete it to rebuild from scratch."
+            )
+        return cls(
+            root,
+            {rel: ManifestEntry(**entry) for rel, entry in data["entries"].items()},
+        )
+
+    def save(self, path: Path) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "entries": {rel: asdict(self.entries[rel]) for rel in sorted(self.entries)},
+        }
+        path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+
+    def _rel(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def has_changed(self, path: Path) -> bool:
+        """True if path is new or its content differs from what was recorded."""
+        entry = self.entries.get(self._rel(path))
+        if entry is None:
+            return True
+        st = path.stat()
+        if (st.st_size, st.st_mtime_ns) == (entry.size, entry.mtime_ns):
+            return False
+        return st.st_size != entry.size or file_sha256(path) != entry.sha256
+
+    def record(
+        self,
+        emitted: dict[Path, tuple[str, dict[str, Any], str]],
+        in_scope: Callable[[Path], bool] | None = None,
+    ) -> IngestDiff:
+        """Replace entries with `emitted` (path -> (doc id, struct_data, uri)).
+
+        Entries for which `in_scope(relative path)` is False are kept as they
+        are and never reported as removed, so a scoped run does not forget
+        the rest of the corpus. Returns what changed.
+        """
+        diff = IngestDiff()
+        new_entries: dict[str, ManifestEntry] = {}
+        for path, (doc_id, struct_data, uri) in sorted(emitted.items()):
+            rel = self._rel(path)
+            old = self.entries.get(rel)
+            st = path.stat()
+            if old is not None and (st.st_size, st.st_mtime_ns) == (
+                old.size,
+                old.mtime_ns,
+            ):
+                sha = old.sha256
+            else:
+                sha = file_sha256(path)
+            entry = ManifestEntry(
+                st.st_size, st.st_mtime_ns, sha, doc_id, struct_data, uri
+            )
+            new_entries[rel] = entry
+            if old is None:
+                diff.added.append(doc_id)
+            elif (old.sha256, old.struct_data, old.uri) != (sha, struct_data, uri):
+                diff.changed.append(doc_id)
+            else:
+                diff.unchanged += 1
+
+        for rel, old in self.entries.items():
+            if rel in new_entries:
+                continue
+            if in_scope is not None and not in_scope(Path(rel)):
+                new_entries[rel] = old
+                continue
+            diff.removed.append(old.doc_id)
+
+        # A moved file keeps its doc id: report it as added, not removed.
+        emitted_ids = {e.doc_id for e in new_entries.values()}
+        diff.removed = sorted(set(diff.removed) - emitted_ids)
+        self.entries = new_entries
+        return diff
+
+
+def merge_pending_import(path: Path, diff: IngestDiff) -> dict[str, list[str]]:
+    """Fold `diff` into the pending-import file and return its new contents.
+
+    Changes accumulate across generate-metadata runs until an incremental
+    import consumes them; a later run's removal cancels an earlier upsert and
+    vice versa.
+    """
+    pending = load_pending_import(path)
+    upsert = set(pending["upsert"])
+    delete = set(pending["delete"])
+    new_upsert = set(diff.added) | set(diff.changed)
+    new_delete = set(diff.removed)
+    pending = {
+        "upsert": sorted((upsert - new_delete) | new_upsert),
+        "delete": sorted((delete - new_upsert) | new_delete),
+    }
+    path.write_text(json.dumps(pending, indent=1) + "\n", encoding="utf-8")
+    return pending
+
+
+def load_pending_import(path: Path) -> dict[str, list[str]]:
+    if not path.exists():
+        return {"upsert": [], "delete": []}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {"upsert": list(data["upsert"]), "delete": list(data["delete"])}
@@ -0,0 +1,643 @@
+"""Offline load test for the /api/query streaming endpoint.
+
+Boots `tenantfirstaid.app:app` with a deterministic fake chat model and a
+fake Vertex AI Search retriever, then drives N concurrent streaming clients
+and reports requests/sec, time to first byte, full-stream latency, and the
+server's peak RSS and thread count. No GCP credentials or network access are
+needed, so worker/thread configurations can be compared locally. Run via
+`make load-test`.
+
+The fake model makes one retrieval tool call per question, then streams its
+reply word by word: it waits --first-token-delay before its first output and
+then emits --token-rate words per second. The fake retriever sleeps
+--retrieval-delay per search.
+
+--server inprocess runs the app on a threaded Werkzeug server inside this
+process. That is quick, but RSS and thread counts then include the load
+generator. --server gunicorn runs a real gunicorn master with --workers and
+--threads, and measures only that process tree. With --preload it uses
+tenantfirstaid.gunicorn_config, so the app is imported once in the master and
+each worker is warmed up before serving. The time until the server answers
+is reported as startup. RSS and thread counts are read from /proc, so they
+are only reported on Linux.
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence
+from unittest.mock import patch
+
+import httpx
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_core.messages import AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CONFIG_ENV_VAR = "LOAD_TEST_FAKE_CONFIG"
+LOG_LEVEL_ENV_VAR = "LOAD_TEST_LOG_LEVEL"
+
+# tenantfirstaid.constants refuses to import without these; the values are
+# never used because the model and retriever are replaced.
+_PLACEHOLDER_ENV = {
+    "MODEL_NAME": "fake-model",
+    "GOOGLE_CLOUD_PROJECT": "load-test",
+    "GOOGLE_CLOUD_LOCATION": "global",
+    "GOOGLE_APPLICATION_CREDENTIALS": "/dev/null",
+    "VERTEX_AI_DATASTORE_LAWS": "load-test-laws",
+}
+
+_REPLY_WORD = "tenant"
+
+
+@dataclass(frozen=True)
+class FakeConfig:
+    """Timing knobs shared by the fake model and the fake retriever."""
+
+    first_token_delay: float = 0.5
+    token_rate: float = 50.0
+    reply_words: int = 120
+    retrieval_delay: float = 0.2
+    use_retrieval: bool = True
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """Deterministic stand-in for ChatGoogleGenerativeAI.
+
+    When the last message is from the user it asks for a retrieval tool call.
+    Otherwise it streams `reply_words` words at `token_rate` words/second.
+    """
+
+    config: FakeConfig = FakeConfig()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def bind_tools(
+        self, tools: Sequence[Any], **kwargs: Any
+    ) -> "FakeStreamingChatModel":
+        return self
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.config.first_token_delay)
+
+        if self.config.use_retrieval and isinstance(messages[-1], HumanMessage):
+            args = {"query": messages[-1].text, "state": "or"}
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": "retrieve_city_state_laws",
+                            "args": json.dumps(args),
+                            "id": f"call_{len(messages)}",
+                            "index": 0,
+                        }
+                    ],
+                )
+            )
+            return
+
+        for i in range(self.config.reply_words):
+            if i > 0:
+                time.sleep(1 / self.config.token_rate)
+            token = _REPLY_WORD if i == 0 else f" {_REPLY_WORD}"
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+
+
+def make_fake_rag_builder(config: FakeConfig) -> type:
+    """Return a RagBuilder replacement that sleeps instead of calling Vertex AI."""
+
+    class FakeRagBuilder:
+        def __init__(
+            self,
+            data_store_id: str,
+            name: str,
+            filter: Optional[str] = None,
+            max_documents: int = 3,
+        ) -> None:
+            self.max_documents = max_documents
+
+        def search_passages(self, query: str) -> list[str]:
+            time.sleep(config.retrieval_delay)
+            return [
+                f"ORS 90.{300 + i}: passage {i} for {query!r}"
+                for i in range(self.max_documents)
+            ]
+
+        def search(self, query: str) -> str:
+            return "\n".join(self.search_passages(query))
+
+    return FakeRagBuilder
+
+
+_active_patches: list[Any] = []
+_saved_log_level: Optional[int] = None
+
+
+def _clear_process_caches() -> None:
+    from tenantfirstaid.langchain_chat_manager import AGENT_CACHE
+    from tenantfirstaid.retrieval_cache import RETRIEVAL_CACHE
+
+    AGENT_CACHE.clear()
+    RETRIEVAL_CACHE.clear()
+
+
+def install_fakes(config: FakeConfig, log_level: str = "WARNING") -> Any:
+    """Replace the LLM and retriever in this process and return the Flask app.
+
+    The patches stay active until uninstall_fakes(). The app logs at
+    `log_level` so per-request DEBUG/INFO output does not swamp the report.
+    """
+    for name, value in _PLACEHOLDER_ENV.items():
+        os.environ.setdefault(name, value)
+
+    model = FakeStreamingChatModel(config=config)
+    for patcher in (
+        patch("tenantfirstaid.graph._get_llm", return_value=model),
+        patch(
+            "tenantfirstaid.langchain_tools.RagBuilder", make_fake_rag_builder(config)
+        ),
+    ):
+        patcher.start()
+        _active_patches.append(patcher)
+    # Drop graphs compiled against the real model and real search results.
+    _clear_process_caches()
+
+    from tenantfirstaid.app import app
+
+    global _saved_log_level
+    root = logging.getLogger()
+    if _saved_log_level is None:
+        _saved_log_level = root.level
+    root.setLevel(log_level)
+    return app
+
+
+def uninstall_fakes() -> None:
+    """Undo install_fakes() and drop anything cached while it was active."""
+    global _saved_log_level
+    while _active_patches:
+        _active_patches.pop().stop()
+    _clear_process_caches()
+    if _saved_log_level is not None:
+        logging.getLogger().setLevel(_saved_log_level)
+        _saved_log_level = None
+
+
+def create_fake_app() -> Any:
+    """Gunicorn app factory: `gunicorn 'scripts.load_test:create_fake_app()'`."""
+    raw = os.environ.get(CONFIG_ENV_VAR)
+    config = FakeConfig(**json.loads(raw)) if raw else FakeConfig()
+    return install_fakes(config, os.environ.get(LOG_LEVEL_ENV_VAR, "WARNING"))
+
+
+# ── server ─────────────────────────────────────────────────────────────────────
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_serving(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/api/metrics", timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+class InProcessServer:
+    """Threaded Werkzeug server running the faked app inside this process."""
+
+    def __init__(self, config: FakeConfig, log_level: str) -> None:
+        from werkzeug.serving import make_server
+
+        start = time.perf_counter()
+        app = install_fakes(config, log_level)
+        self._server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.startup_seconds: Optional[float] = time.perf_counter() - start
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        self.pid = os.getpid()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "InProcessServer":
+        self._thread.start()
+        _wait_until_serving(self.base_url)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
+        uninstall_fakes()
+
+
+class GunicornServer:
+    """gunicorn master + workers serving the faked app in a subprocess."""
+
+    def __init__(
+        self,
+        config: FakeConfig,
+        log_level: str,
+        workers: int,
+        threads: int,
+        preload: bool = False,
+    ) -> None:
+        port = _free_port()
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.startup_seconds: Optional[float] = None
+        self._cmd = [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            *(["-c", "python:tenantfirstaid.gunicorn_config"] if preload else []),
+            "--workers",
+            str(workers),
+            "--threads",
+            str(threads),
+            "--timeout",
+            "300",
+            "--graceful-timeout",
+            "5",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "scripts.load_test:create_fake_app()",
+        ]
+        self._env = {
+            **os.environ,
+            CONFIG_ENV_VAR: json.dumps(asdict(config)),
+            LOG_LEVEL_ENV_VAR: log_level,
+        }
+        self._proc: Optional[subprocess.Popen[bytes]] = None
+
+    @property
+    def pid(self) -> int:
+        assert self._proc is not None
+        return self._proc.pid
+
+    def __enter__(self) -> "GunicornServer":
+        start = time.perf_counter()
+        self._proc = subprocess.Popen(self._cmd, cwd=BACKEND_DIR, env=self._env)
+        _wait_until_serving(self.base_url)
+        self.startup_seconds = time.perf_counter() - start
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        assert self._proc is not None
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+
+# ── process sampling ───────────────────────────────────────────────────────────
+
+
+def _process_tree(pid: int) -> list[int]:
+    pids = [pid]
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        children = (task / "children").read_text().split()
+        for child in children:
+            pids.extend(_process_tree(int(child)))
+    return pids
+
+
+def process_stats(pid: int) -> Optional[tuple[int, int]]:
+    """Return (RSS bytes, thread count) summed over `pid` and its descendants.
+
+    Returns None where /proc is unavailable (e.g. macOS) or the process exited.
+    """
+    rss_kb = threads = 0
+    try:
+        for p in _process_tree(pid):
+            for line in Path(f"/proc/{p}/status").read_text().splitlines():
+                key, _, value = line.partition(":")
+                if key == "VmRSS":
+                    rss_kb += int(value.split()[0])
+                elif key == "Threads":
+                    threads += int(value)
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    return rss_kb * 1024, threads
+
+
+class _PeakSampler(threading.Thread):
+    def __init__(self, pid: int, interval: float = 0.1) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss: Optional[int] = None
+        self.peak_threads: Optional[int] = None
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            stats = process_stats(self.pid)
+            if stats is not None:
+                self.peak_rss = max(stats[0], self.peak_rss or 0)
+                self.peak_threads = max(stats[1], self.peak_threads or 0)
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+# ── load generator ─────────────────────────────────────────────────────────────
+
+
+@dataclass
+class RequestTiming:
+    ttfb: float
+    latency: float
+    ok: bool
+
+
+@dataclass
+class LoadTestResult:
+    concurrency: int
+    requests: int
+    errors: int
+    duration: float
+    ttfb: List[float] = field(default_factory=list)
+    latency: List[float] = field(default_factory=list)
+    peak_rss_bytes: Optional[int] = None
+    peak_threads: Optional[int] = None
+    startup_seconds: Optional[float] = None
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "requests_per_second": round(self.requests / self.duration, 2),
+            "ttfb_ms": _percentiles(self.ttfb),
+            "latency_ms": _percentiles(self.latency),
+            "peak_rss_mb": (
+                round(self.peak_rss_bytes / 2**20, 1)
+                if self.peak_rss_bytes is not None
+                else None
+            ),
+            "peak_threads": self.peak_threads,
+            "startup_s": (
+                round(self.startup_seconds, 2)
+                if self.startup_seconds is not None
+                else None
+            ),
+        }
+
+
+def _percentiles(values: List[float]) -> dict[str, Optional[float]]:
+    ordered = sorted(values)
+    result: dict[str, Optional[float]] = {}
+    for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        if not ordered:
+            result[label] = None
+            continue
+        idx = min(len(ordered) - 1, max(0, round(q * len(ordered) + 0.5) - 1))
+        result[label] = round(ordered[idx] * 1000, 1)
+    return result
+
+
+def _one_request(
+    client: httpx.Client, url: str, index: int, stream_deltas: bool
+) -> RequestTiming:
+    body: dict[str, Any] = {
+        "messages": [{"role": "human", "content": f"Question {index} about rent"}],
+        "city": None,
+        "state": "or",
+    }
+    if stream_deltas:
+        body["stream_deltas"] = True
+
+    start = time.perf_counter()
+    ttfb: Optional[float] = None
+    last_line = b""
+    try:
+        with client.stream("POST", url, json=body) as response:
+            for data in response.iter_bytes():
+                if ttfb is None and data:
+                    ttfb = time.perf_counter() - start
+                if data.strip():
+                    last_line = data.rstrip(b"\n").rsplit(b"\n", 1)[-1]
+            ok = (
+                response.status_code == 200
+                and json.loads(last_line).get("type") == "end_of_stream"
+            )
+    except (httpx.HTTPError, ValueError):
+        ok = False
+    latency = time.perf_counter() - start
+    return RequestTiming(
+        ttfb=ttfb if ttfb is not None else latency, latency=latency, ok=ok
+    )
+
+
+def run_load(
+    base_url: str,
+    concurrency: int,
+    requests: int,
+    server_pid: Optional[int] = None,
+    stream_deltas: bool = False,
+) -> LoadTestResult:
+    """Send `requests` chat requests from `concurrency` parallel clients."""
+    url = f"{base_url}/api/query"
+    sampler = _PeakSampler(server_pid) if server_pid is not None else None
+    local = threading.local()
+    clients: list[httpx.Client] = []
+
+    def _worker(index: int) -> RequestTiming:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = httpx.Client(timeout=300.0)
+            clients.append(client)
+        return _one_request(client, url, index, stream_deltas)
+
+    if sampler is not None:
+        sampler.start()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = list(pool.map(_worker, range(requests)))
+    finally:
+        duration = time.perf_counter() - start
+        if sampler is not None:
+            sampler.stop()
+        # Idle keep-alive connections would otherwise hold server threads.
+        for client in clients:
+            client.close()
+
+    ok = [t for t in timings if t.ok]
+    return LoadTestResult(
+        concurrency=concurrency,
+        requests=requests,
+        errors=len(timings) - len(ok),
+        duration=duration,
+        ttfb=[t.ttfb for t in ok],
+        latency=[t.latency for t in ok],
+        peak_rss_bytes=sampler.peak_rss if sampler else None,
+        peak_threads=sampler.peak_threads if sampler else None,
+    )
+
+
+def _print_summary(summary: dict[str, Any]) -> None:
+    print(
+        f"{summary['requests']} requests, concurrency {summary['concurrency']}, "
+        f"{summary['errors']} error(s)"
+    )
+    print(f"  throughput:   {summary['requests_per_second']} req/s")
+    for key, label in (("ttfb_ms", "TTFB"), ("latency_ms", "full stream")):
+        p = summary[key]
+        print(
+            f"  {label + ':':<13} p50 {p['p50']} ms, p95 {p['p95']} ms, p99 {p['p99']} ms"
+        )
+    print(f"  peak RSS:     {summary['peak_rss_mb'] or 'n/a'} MB")
+    print(f"  peak threads: {summary['peak_threads'] or 'n/a'}")
+    print(f"  startup:      {summary['startup_s'] or 'n/a'} s")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Parallel clients (default: 8)."
+    )
+    parser.add_argument(
+        "--requests", type=int, default=64, help="Total requests (default: 64)."
+    )
+    parser.add_argument(
+        "--server",
+        choices=("inprocess", "gunicorn"),
+        default="inprocess",
+        help="Where to run the app (default: inprocess).",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=2, help="gunicorn workers (default: 2)."
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=8,
+        help="gunicorn threads per worker (default: 8).",
+    )
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="Preload the app in the gunicorn master and warm up each worker.",
+    )
+    parser.add_argument(
+        "--first-token-delay",
+        type=float,
+        default=FakeConfig.first_token_delay,
+        help="Seconds before each fake model call produces output.",
+    )
+    parser.add_argument(
+        "--token-rate",
+        type=float,
+        default=FakeConfig.token_rate,
+        help="Fake model words per second.",
+    )
+    parser.add_argument(
+        "--reply-words",
+        type=int,
+        default=FakeConfig.reply_words,
+        help="Words in each fake reply.",
+    )
+    parser.add_argument(
+        "--retrieval-delay",
+        type=float,
+        default=FakeConfig.retrieval_delay,
+        help="Seconds per fake retrieval.",
+    )
+    parser.add_argument(
+        "--no-retrieval",
+        action="store_true",
+        help="Answer directly without a retrieval tool call.",
+    )
+    parser.add_argument(
+        "--stream-deltas",
+        action="store_true",
+        help="Request token-level deltas (stream_deltas: true).",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="Log level for the app under test (default: WARNING).",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the summary as JSON."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    config = FakeConfig(
+        first_token_delay=args.first_token_delay,
+        token_rate=args.token_rate,
+        reply_words=args.reply_words,
+        retrieval_delay=args.retrieval_delay,
+        use_retrieval=not args.no_retrieval,
+    )
+    server = (
+        GunicornServer(config, args.log_level, args.workers, args.threads, args.preload)
+        if args.server == "gunicorn"
+        else InProcessServer(config, args.log_level)
+    )
+    with server:
+        result = run_load(
+            server.base_url,
+            args.concurrency,
+            args.requests,
+            server_pid=server.pid,
+            stream_deltas=args.stream_deltas,
+        )
+    result.startup_seconds = server.startup_seconds
+
+    summary = result.summary()
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        _print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
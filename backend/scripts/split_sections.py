@@ -0,0 +1,195 @@
+"""Split law documents into one file per section for Vertex AI Search ingestion.
+
+Without this stage each law file (ORS090.txt is ~525 KB) is imported as a
+single Document and chunked opaquely by Vertex, so a neighbouring subsection
+is easily missed. This walks backend/scripts/documents/or/, splits every file
+at section headings (ORS "90.394", city code "30.01.085" / "8.425", OAR
+"411-054-0005"), and writes each section as its own .txt file plus a
+metadata.jsonl whose struct_data carries section, chapter, city and state.
+
+The output directory has the same layout upload_to_gcs expects, so the rest of
+the pipeline is unchanged:
+
+  make split-sections GCS_BUCKET_NAME=<bucket>
+  make upload-to-gcs GCS_BUCKET_NAME=<bucket> \\
+      UPLOAD_OPTIONS="--documents-dir scripts/documents/sections --metadata scripts/documents/sections/metadata.jsonl"
+  make create-datastore-gcs GCS_BUCKET_NAME=<bucket> DATASTORE_ID=<id>
+"""
+
+import argparse
+import json
+import re
+import shutil
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from google.cloud.discoveryengine_v1.types import Document
+from google.protobuf.json_format import MessageToDict
+
+from scripts.enforce_ascii import validate_and_rewrite_tree
+from scripts.generate_metadata_jsonl import DOCUMENTS_DIR, infer_city
+
+OUTPUT_DIR = Path(__file__).parent / "documents" / "sections"
+
+# A section heading: the section number at the start of a line (indented in
+# ORS105.txt), followed by its title ("90.100 Definitions.", "8.425\tRental
+# Housing"), a history note ("90.240 [Formerly 91.740; ...]") or nothing (OAR
+# rule numbers and the annotation files put the number on its own line).
+# Requiring a capital or "[" keeps in-text lines such as "90.100 to 90.465
+# apply..." from matching.
+SECTION_HEADING = re.compile(
+    r"^[ \t]*(\d+[A-Z]?(?:\.\d+)+|\d{3}-\d{3}-\d{4})(?:[ \t]+[A-Z\[]|[ \t]*$)"
+)
+# Text before the first heading is kept as its own document only when it is
+# more than a title block or table of contents.
+MIN_PREAMBLE_WORDS = 30
+# A single heading line this short ("30.01.010 Policy.") is a table-of-contents
+# entry, dropped in favour of the section's full occurrence.
+TOC_ENTRY_MAX_WORDS = 12
+
+
+@dataclass
+class Section:
+    number: str
+    text: str
+
+    @property
+    def chapter(self) -> str:
+        """The number without its last part: 90.394 -> 90, 411-054-0005 -> 411-054."""
+        sep = "-" if "-" in self.number else "."
+        return self.number.rsplit(sep, 1)[0]
+
+
+def _is_toc_entry(body: str) -> bool:
+    return "\n" not in body and len(body.split()) <= TOC_ENTRY_MAX_WORDS
+
+
+def split_sections(text: str) -> tuple[str, list[Section]]:
+    """Split a document into (preamble, sections in order of first appearance).
+
+    Table-of-contents entries are dropped when the same section also appears
+    with a body; other repeats of a section number are joined.
+    """
+    preamble: list[str] = []
+    occurrences: list[tuple[str, list[str]]] = []
+    for line in text.splitlines():
+        m = SECTION_HEADING.match(line)
+        if m:
+            occurrences.append((m.group(1), [line]))
+        elif occurrences:
+            occurrences[-1][1].append(line)
+        else:
+            preamble.append(line)
+
+    bodies: dict[str, list[str]] = {}
+    for number, lines in occurrences:
+        bodies.setdefault(number, []).append("\n".join(lines).strip())
+
+    sections = []
+    for number, parts in bodies.items():
+        full = [p for p in parts if not _is_toc_entry(p)] or parts[:1]
+        sections.append(Section(number, "\n\n".join(full)))
+    return "\n".join(preamble).strip(), sections
+
+
+def _doc_id(stem: str, suffix: str) -> str:
+    # Discovery Engine ids are RFC-1034 style; dots would be ambiguous anyway.
+    return f"{stem}-{suffix}".replace(".", "-")
+
+
+def iter_section_documents(
+    documents_dir: Path, bucket: str
+) -> Iterator[tuple[Document, str]]:
+    """Yield (Document, text) for every section of every file under documents_dir."""
+    for txt_file in sorted(documents_dir.rglob("*.txt")):
+        city = infer_city(txt_file.relative_to(documents_dir))
+        preamble, sections = split_sections(txt_file.read_text(encoding="utf-8"))
+
+        parts: list[tuple[str, dict[str, str | None], str]] = []
+        # With no recognisable headings the preamble is the whole file.
+        if len(preamble.split()) >= MIN_PREAMBLE_WORDS or not sections:
+            parts.append(("preamble", {"section": None, "chapter": None}, preamble))
+        for section in sections:
+            parts.append(
+                (
+                    section.number,
+                    {"section": section.number, "chapter": section.chapter},
+                    section.text,
+                )
+            )
+
+        for suffix, fields, text in parts:
+            doc_id = _doc_id(txt_file.stem, suffix)
+            yield (
+                Document(
+                    id=doc_id,
+                    struct_data={
+                        **fields,
+                        "source": txt_file.stem,
+                        "city": city,
+                        "state": "or",
+                    },
+                    content=Document.Content(
+                        mime_type="text/plain",
+                        uri=f"gs://{bucket}/{doc_id}.txt",
+                    ),
+                ),
+                text,
+            )
+
+
+def write_sections(documents_dir: Path, output_dir: Path, bucket: str) -> int:
+    """Replace output_dir with one .txt per section plus metadata.jsonl."""
+    validate_and_rewrite_tree(documents_dir, check_only=True)
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    seen: set[str] = set()
+    with (output_dir / "metadata.jsonl").open("w") as f:
+        for doc, text in iter_section_documents(documents_dir, bucket):
+            if doc.id in seen:
+                raise RuntimeError(
+                    f"Duplicate section document id {doc.id!r}; two source files "
+                    "share a basename."
+                )
+            seen.add(doc.id)
+            (output_dir / f"{doc.id}.txt").write_text(text + "\n", encoding="ascii")
+            f.write(json.dumps(MessageToDict(Document.pb(doc))) + "\n")
+    return len(seen)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--bucket",
+        required=True,
+        help="GCS bucket name to use in metadata URIs (e.g. my-rag-bucket).",
+    )
+    parser.add_argument(
+        "--documents-dir",
+        type=Path,
+        default=DOCUMENTS_DIR,
+        help=f"Root of documents tree (default: {DOCUMENTS_DIR}).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=OUTPUT_DIR,
+        help=f"Directory to (re)create with section files (default: {OUTPUT_DIR}).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    n = write_sections(args.documents_dir, args.output_dir, args.bucket)
+    print(f"Wrote {n} section documents and metadata.jsonl to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
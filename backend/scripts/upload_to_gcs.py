@@ -2,11 +2,18 @@
 
 Refuses to reuse an existing bucket so each RAG ingestion has a clean,
 dedicated bucket. Run via `make upload-to-gcs`.
+
+With --sync, uploads into an existing (still mutable) bucket instead, skipping
+files whose checksum already matches the object in the bucket, so re-ingesting
+after a small document edit only sends the changed files.
 """
 
 import argparse
+import base64
+import hashlib
 import sys
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import cast
 from urllib.parse import urlparse
@@ -26,6 +33,12 @@ DEFAULT_METADATA_FILE = DOCUMENTS_DIR / "metadata.jsonl"
 # AI Search multi-regions (us, eu, global). This US bucket pairs with a "us"
 # datastore; see check_bucket_location_compat in create_datastore_gcs.py.
 DEFAULT_BUCKET_LOCATION = "US"
+DEFAULT_UPLOAD_WORKERS = 8
+# Files above this size use a chunked resumable upload, so a dropped connection
+# retries the failed chunk instead of the whole file. GCS requires chunk sizes
+# to be a multiple of 256 KiB.
+RESUMABLE_THRESHOLD_BYTES = 256 * 1024
+RESUMABLE_CHUNK_SIZE = 256 * 1024
 
 
 class UploadError(RuntimeError):
@@ -121,22 +134,119 @@ def create_bucket(client: storage.Client, name: str, location: str) -> storage.B
         ) from e
 
 
+def get_existing_bucket(client: storage.Client, name: str) -> storage.Bucket:
+    try:
+        return client.get_bucket(name)
+    except gcp_exceptions.NotFound as e:
+        raise UploadError(
+            f"Bucket {name!r} does not exist. Omit --sync to create it."
+        ) from e
+
+
+def _b64_digest(digest: bytes) -> str:
+    # GCS reports object checksums as base64 of the raw digest.
+    return base64.b64encode(digest).decode("ascii")
+
+
+def local_md5(path: Path) -> str:
+    with path.open("rb") as f:
+        return _b64_digest(hashlib.file_digest(f, "md5").digest())
+
+
+def local_crc32c(path: Path) -> str:
+    # Transitive dependency of google-cloud-storage; only needed for composite
+    # objects, which have no MD5.
+    import google_crc32c
+
+    checksum = google_crc32c.Checksum()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            checksum.update(chunk)
+    return _b64_digest(checksum.digest())
+
+
+def _is_unchanged(local_path: Path, remote: storage.Blob) -> bool:
+    if remote.size is not None and remote.size != local_path.stat().st_size:
+        return False
+    if remote.md5_hash:
+        return remote.md5_hash == local_md5(local_path)
+    if remote.crc32c:
+        return remote.crc32c == local_crc32c(local_path)
+    return False
+
+
+def _upload_one(
+    bucket_obj: storage.Bucket, object_name: str, local_path: Path, content_type: str
+) -> None:
+    if local_path.stat().st_size > RESUMABLE_THRESHOLD_BYTES:
+        blob = bucket_obj.blob(object_name, chunk_size=RESUMABLE_CHUNK_SIZE)
+    else:
+        blob = bucket_obj.blob(object_name)
+    blob.upload_from_filename(str(local_path), content_type=content_type)
+
+
 def upload_files(
     bucket_obj: storage.Bucket,
     name_to_path: dict[str, Path],
     metadata_path: Path,
-) -> None:
-    for object_name in sorted(name_to_path):
-        local_path = name_to_path[object_name]
-        blob = bucket_obj.blob(object_name)
-        blob.upload_from_filename(str(local_path), content_type="text/plain")
-        print(f"  uploaded {object_name} ({local_path})")
-
-    metadata_blob = bucket_obj.blob(metadata_path.name)
-    metadata_blob.upload_from_filename(
-        str(metadata_path), content_type="application/jsonl"
-    )
+    *,
+    workers: int = DEFAULT_UPLOAD_WORKERS,
+    skip_unchanged: bool = False,
+) -> int:
+    """Upload documents with up to `workers` in flight, then metadata.jsonl.
+
+    metadata.jsonl is uploaded only after every document has been, so an
+    import never reads metadata that references a missing document. With
+    `skip_unchanged`, objects already in the bucket with a matching checksum
+    are left alone. Returns the number of objects uploaded. Every document
+    upload is attempted before failures are reported, so a re-run with
+    `skip_unchanged` picks up where this one stopped.
+    """
+    documents = dict(name_to_path)
+    upload_metadata = True
+    if skip_unchanged:
+        existing = {blob.name: blob for blob in bucket_obj.list_blobs()}
+        unchanged = {
+            name
+            for name, path in documents.items()
+            if name in existing and _is_unchanged(path, existing[name])
+        }
+        if metadata_path.name in existing and _is_unchanged(
+            metadata_path, existing[metadata_path.name]
+        ):
+            unchanged.add(metadata_path.name)
+            upload_metadata = False
+        for name in sorted(unchanged):
+            print(f"  unchanged {name}")
+        documents = {k: v for k, v in documents.items() if k not in unchanged}
+
+    failures: list[str] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_upload_one, bucket_obj, name, path, "text/plain"): name
+            for name, path in sorted(documents.items())
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"  FAILED {name}: {e}", file=sys.stderr)
+                failures.append(name)
+            else:
+                print(f"  uploaded {name} ({documents[name]})")
+
+    if failures:
+        raise UploadError(
+            f"{len(failures)} upload(s) failed: {', '.join(sorted(failures))}. "
+            f"{metadata_path.name} was not uploaded. "
+            "Re-run with --sync to retry only the missing files."
+        )
+    if not upload_metadata:
+        return len(documents)
+    _upload_one(bucket_obj, metadata_path.name, metadata_path, "application/jsonl")
     print(f"  uploaded {metadata_path.name} ({metadata_path})")
+    return len(documents) + 1
 
 
 def parse_args() -> argparse.Namespace:
@@ -146,7 +256,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--bucket",
         required=True,
-        help="GCS bucket name to create. Must not already exist.",
+        help="GCS bucket name to create. Must not already exist unless --sync.",
     )
     parser.add_argument(
         "--location",
@@ -171,6 +281,18 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Resolve files and validate, but do not call GCS or create the bucket.",
     )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Upload into an existing bucket, skipping files whose checksum "
+        "matches the object already there.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_UPLOAD_WORKERS,
+        help=f"Concurrent uploads (default: {DEFAULT_UPLOAD_WORKERS}).",
+    )
     return parser.parse_args()
 
 
@@ -198,11 +320,21 @@ def main() -> None:
     client = storage.Client(
         credentials=credentials, project=SINGLETON.GOOGLE_CLOUD_PROJECT
     )
-    bucket_obj = create_bucket(client, args.bucket, args.location)
-    print(f"Created bucket gs://{args.bucket} in {args.location}.")
-
-    upload_files(bucket_obj, name_to_path, metadata_path)
-    print(f"Done. {len(name_to_path) + 1} object(s) uploaded to gs://{args.bucket}.")
+    if args.sync:
+        bucket_obj = get_existing_bucket(client, args.bucket)
+        print(f"Syncing into existing bucket gs://{args.bucket}.")
+    else:
+        bucket_obj = create_bucket(client, args.bucket, args.location)
+        print(f"Created bucket gs://{args.bucket} in {args.location}.")
+
+    uploaded = upload_files(
+        bucket_obj,
+        name_to_path,
+        metadata_path,
+        workers=args.workers,
+        skip_unchanged=args.sync,
+    )
+    print(f"Done. {uploaded} object(s) uploaded to gs://{args.bucket}.")
 
 
 if __name__ == "__main__":
@@ -1,15 +1,17 @@
 import os
 
-from flask import Flask
+from flask import Flask, Response, abort
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_mailman import Mail
 
 # .chat → constants loads .env via an absolute path; do not re-load here.
-from .chat import ChatView
+from .chat import SESSION_TOKEN_HEADER, ChatView
+from .constants import METRICS_ENABLED
 from .feedback import send_feedback
 from .logger import configure_logging
+from .metrics import METRICS
 
 # Configure logging after .chat (→ constants → .env load) so ENV from .env is honored.
 configure_logging()
@@ -39,7 +41,12 @@ if os.getenv("ENV", "dev") == "dev":
         ]
     )
 
-CORS(app, origins=ALLOWED_ORIGINS, supports_credentials=True)
+CORS(
+    app,
+    origins=ALLOWED_ORIGINS,
+    supports_credentials=True,
+    expose_headers=[SESSION_TOKEN_HEADER],
+)
 
 # Configure Flask Mail
 app.config["MAIL_SERVER"] = os.getenv("MAIL_SERVER")
@@ -67,5 +74,14 @@ app.add_url_rule(
     methods=["POST"],
 )
 
+
+@app.get("/api/metrics")
+def metrics_route():
+    """Per-stage latency summaries in Prometheus text format (this worker only)."""
+    if not METRICS_ENABLED:
+        abort(404)
+    return Response(METRICS.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001)
@@ -0,0 +1,276 @@
+"""ASGI entry point with an async /api/query endpoint.
+
+Under gunicorn's sync workers each streaming chat holds an OS thread for the
+full multi-second LLM generation. This module serves POST /api/query on the
+event loop via LangChainChatManager.agenerate_streaming_response (built on
+CompiledStateGraph.astream), so one worker can multiplex many concurrent
+conversations. Server-side sessions use an async checkpointer on the same
+SQLite file as the Flask app (sessions.get_async_session_store). Request
+parsing, which may look up and sweep sessions, runs in a worker thread, and
+the stream is cancelled as soon as the client disconnects. Every other
+request, including CORS preflights and /api/feedback, is bridged to the
+existing Flask app in a worker thread.
+
+Serve with any ASGI server, for example:
+
+    uvicorn tenantfirstaid.asgi:app --port 5001
+    gunicorn -k uvicorn.workers.UvicornWorker tenantfirstaid.asgi:app
+
+The module is framework-free on purpose: it only depends on the ASGI
+protocol, so it adds no runtime dependencies beyond the chosen server.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import sys
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
+
+from langchain_core.messages import ContentBlock
+
+from .app import ALLOWED_ORIGINS
+from .app import app as flask_app
+from .chat import (
+    SESSION_EXPIRED_MESSAGE,
+    SESSION_TOKEN_HEADER,
+    SessionExpiredError,
+    parse_chat_request,
+)
+from .langchain_chat_manager import LangChainChatManager
+from .metrics import RequestTimings, server_timing, start_request_timings, timed
+from .sessions import get_async_session_store
+from .stream_encoding import encode_block, encode_end_of_stream
+
+logger = logging.getLogger(__name__)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+Headers = List[Tuple[bytes, bytes]]
+
+_CHAT_PATH = "/api/query"
+
+
+async def _read_body(receive: Receive) -> bytes:
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body.extend(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return bytes(body)
+
+
+async def _wait_for_disconnect(receive: Receive) -> None:
+    """Return once the client has gone away; call after the body is read."""
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _cors_headers(scope: Scope) -> Headers:
+    """Mirror the Flask-CORS policy from app.py for responses sent from here."""
+    origin = _header(scope, b"origin")
+    if origin is None or origin not in ALLOWED_ORIGINS:
+        return []
+    return [
+        (b"access-control-allow-origin", origin.encode("latin-1")),
+        (b"access-control-allow-credentials", b"true"),
+        (b"access-control-expose-headers", SESSION_TOKEN_HEADER.encode("latin-1")),
+        (b"vary", b"Origin"),
+    ]
+
+
+async def _send_plain(send: Send, status: int, text: str, headers: Headers) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8"), *headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": text.encode("utf-8")})
+
+
+async def _chat(scope: Scope, receive: Receive, send: Send) -> None:
+    """Async equivalent of chat.ChatView.dispatch_request."""
+    cors = _cors_headers(scope)
+    timings = start_request_timings()
+    try:
+        data = json.loads(await _read_body(receive))
+        with timed("parse"):
+            # agent.astream needs the async checkpointer; its synchronous
+            # session lookups must run off the loop.
+            store = await get_async_session_store() if "session" in data else None
+            chat_request = await asyncio.to_thread(parse_chat_request, data, store)
+    except SessionExpiredError:
+        await _send_plain(send, 410, SESSION_EXPIRED_MESSAGE, cors)
+        return
+    except (ValueError, KeyError, TypeError) as e:
+        await _send_plain(send, 400, f"Invalid request: {e}", cors)
+        return
+
+    chat_manager = LangChainChatManager(checkpointer=chat_request.checkpointer)
+    headers: Headers = [
+        (b"content-type", b"text/plain; charset=utf-8"),
+        *cors,
+        *(
+            (k.lower().encode("latin-1"), v.encode("latin-1"))
+            for k, v in chat_request.headers.items()
+        ),
+    ]
+    # text/plain rather than application/x-ndjson: client only reads raw bytes
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+
+    response_stream = chat_manager.agenerate_streaming_response(
+        messages=chat_request.messages,
+        city=chat_request.city,
+        state=chat_request.state,
+        thread_id=chat_request.thread_id,
+        stream_deltas=chat_request.stream_deltas,
+    )
+    streaming = asyncio.create_task(_send_stream(send, response_stream, timings))
+    disconnected = asyncio.create_task(_wait_for_disconnect(receive))
+    try:
+        await asyncio.wait(
+            {streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        client_left = disconnected.done()
+        disconnected.cancel()
+        if not streaming.done():
+            # Stops the agent, and its model call, rather than finishing an
+            # answer nobody will read.
+            if client_left:
+                logger.info("Client disconnected; cancelling chat stream")
+            streaming.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await streaming
+    if not streaming.cancelled():
+        streaming.result()
+
+
+async def _send_stream(
+    send: Send,
+    response_stream: AsyncIterator[ContentBlock],
+    timings: Optional[RequestTimings],
+) -> None:
+    debug = logger.isEnabledFor(logging.DEBUG)
+    async for content_block in response_stream:
+        with timed("serialize"):
+            body = encode_block(content_block)
+        if body is None:
+            continue
+        if debug:
+            logger.debug("Sending content_block: %r", body)
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+    done_body = encode_end_of_stream(server_timing(timings))
+    if debug:
+        logger.debug("Sending done chunk: %r", done_body)
+    await send({"type": "http.response.body", "body": done_body})
+
+
+def _wsgi_environ(scope: Scope, body: bytes) -> Dict[str, Any]:
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ: Dict[str, Any] = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"],
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for key, value in scope.get("headers", []):
+        name = key.decode("latin-1").upper().replace("-", "_")
+        decoded = value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = decoded
+        elif name != "CONTENT_LENGTH":
+            http_name = f"HTTP_{name}"
+            environ[http_name] = (
+                f"{environ[http_name]},{decoded}" if http_name in environ else decoded
+            )
+    return environ
+
+
+def _call_wsgi(environ: Dict[str, Any]) -> Tuple[int, Headers, bytes]:
+    """Run the Flask app to completion; responses on this path are small."""
+    started: Dict[str, Any] = {}
+
+    def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [
+            (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers
+        ]
+
+    result: Iterable[bytes] = flask_app(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+    return started["status"], started["headers"], body
+
+
+async def _wsgi(scope: Scope, receive: Receive, send: Send) -> None:
+    body = await _read_body(receive)
+    status, headers, payload = await asyncio.to_thread(
+        _call_wsgi, _wsgi_environ(scope, body)
+    )
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def _lifespan(receive: Receive, send: Send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope: Scope, receive: Receive, send: Send) -> None:
+    """ASGI application: async chat endpoint, everything else via Flask."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    elif scope["type"] != "http":
+        raise NotImplementedError(f"Unsupported ASGI scope type: {scope['type']}")
+    elif scope["path"] == _CHAT_PATH and scope["method"] == "POST":
+        await _chat(scope, receive, send)
+    else:
+        await _wsgi(scope, receive, send)
@@ -0,0 +1,142 @@
+"""Per-request budgets that bound how long the agent loop can run.
+
+Nothing in the agent itself limits how often the model searches again: the
+retrieval tool schema invites retries with larger max_documents, each search
+retries transient errors with backoff, and the whole stream is retried after a
+connection reset. A RequestBudget caps one chat request's model calls, tool
+calls, cumulative retrieval time and wall-clock time.
+
+LangChainChatManager starts a budget for each request in the current context
+(like metrics.start_request_timings), and graph._BudgetGuard enforces it.
+Once any limit is reached, remaining tool calls are answered with a note
+instead of running, and the next model call may not call tools, so the agent
+answers with what it has already retrieved rather than failing.
+"""
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Final, Optional
+
+from .constants import (
+    REQUEST_BUDGET_DEADLINE_SECONDS,
+    REQUEST_BUDGET_ENABLED,
+    REQUEST_BUDGET_MAX_MODEL_CALLS,
+    REQUEST_BUDGET_MAX_RETRIEVAL_SECONDS,
+    REQUEST_BUDGET_MAX_TOOL_CALLS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Sent to the model in place of a blocked tool result, and after the
+# conversation on the final model call, once the budget is used up.
+BUDGET_EXHAUSTED_NOTE: Final = (
+    "No more searches or tool calls are available for this question. Answer now "
+    "using only the information already retrieved, and say so if it is not "
+    "enough to answer fully."
+)
+
+_request_budget: ContextVar[Optional["RequestBudget"]] = ContextVar(
+    "request_budget", default=None
+)
+
+
+@dataclass
+class RequestBudget:
+    """Limits and consumption for one chat request."""
+
+    max_model_calls: int = REQUEST_BUDGET_MAX_MODEL_CALLS
+    max_tool_calls: int = REQUEST_BUDGET_MAX_TOOL_CALLS
+    max_retrieval_seconds: float = REQUEST_BUDGET_MAX_RETRIEVAL_SECONDS
+    deadline_seconds: float = REQUEST_BUDGET_DEADLINE_SECONDS
+    started: float = field(default_factory=time.monotonic)
+    model_calls: int = 0
+    tool_calls: int = 0
+    retrieval_seconds: float = 0.0
+    # The first limit reached, kept for the log line.
+    exhausted_by: Optional[str] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def remaining_seconds(self) -> float:
+        return self.deadline_seconds - (time.monotonic() - self.started)
+
+    def _exhaust(self, reason: str) -> None:
+        # Caller holds self._lock.
+        self.exhausted_by = reason
+        logger.warning("Request budget exhausted: %s", self.summary())
+
+    def _check(self) -> Optional[str]:
+        # Caller holds self._lock.
+        if self.exhausted_by is None:
+            if self.remaining_seconds() <= 0:
+                self._exhaust("deadline")
+            elif self.tool_calls >= self.max_tool_calls:
+                self._exhaust("tool_calls")
+            elif self.retrieval_seconds >= self.max_retrieval_seconds:
+                self._exhaust("retrieval_time")
+        return self.exhausted_by
+
+    def exhausted(self) -> bool:
+        """True once any limit has been reached; stays True for the request."""
+        with self._lock:
+            return self._check() is not None
+
+    def start_model_call(self) -> bool:
+        """Count a model call; returns True if it must answer without tools."""
+        with self._lock:
+            self.model_calls += 1
+            if self._check() is None and self.model_calls >= self.max_model_calls:
+                # The last allowed model call has to produce the answer.
+                self._exhaust("model_calls")
+            return self.exhausted_by is not None
+
+    def start_tool_call(self) -> bool:
+        """Count a tool call; returns False if the budget does not allow it."""
+        with self._lock:
+            if self._check() is not None:
+                return False
+            self.tool_calls += 1
+            return True
+
+    def add_retrieval_time(self, seconds: float) -> None:
+        with self._lock:
+            self.retrieval_seconds += seconds
+
+    def summary(self) -> str:
+        return (
+            f"model_calls={self.model_calls}/{self.max_model_calls} "
+            f"tool_calls={self.tool_calls}/{self.max_tool_calls} "
+            f"retrieval={self.retrieval_seconds:.1f}/{self.max_retrieval_seconds:.0f}s "
+            f"elapsed={time.monotonic() - self.started:.1f}/"
+            f"{self.deadline_seconds:.0f}s "
+            f"exhausted_by={self.exhausted_by or '-'}"
+        )
+
+
+def start_request_budget(
+    budget: Optional[RequestBudget] = None,
+) -> Optional[RequestBudget]:
+    """Enforce `budget` (or a default one) for the current request in this context.
+
+    Returns None, and clears any budget left in this context, when budgets
+    are disabled.
+    """
+    if not REQUEST_BUDGET_ENABLED:
+        _request_budget.set(None)
+        return None
+    if budget is None:
+        budget = RequestBudget()
+    _request_budget.set(budget)
+    return budget
+
+
+def current_budget() -> Optional[RequestBudget]:
+    return _request_budget.get()
+
+
+def past_request_deadline() -> bool:
+    """True if the current request's wall-clock budget has run out."""
+    budget = _request_budget.get()
+    return budget is not None and budget.remaining_seconds() <= 0
@@ -2,52 +2,95 @@
 Module for Flask Chat View
 """
 
-from typing import Any, Dict, Generator, List
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generator, List, Optional
 
 from flask import Response, current_app, request, stream_with_context
 from flask.views import View
 from langchain_core.messages import AnyMessage, ContentBlock
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
 from .langchain_chat_manager import LangChainChatManager
 from .location import OregonCity, UsaState
-from .schema import (
-    EndOfStreamChunk,
-    LetterChunk,
-    ReasoningChunk,
-    ResponseChunk,
-    TextChunk,
-)
-
-
-def _classify_blocks(
-    stream: Generator[ContentBlock, Any, None],
-) -> Generator[ResponseChunk, Any, None]:
-    """Convert raw LangChain content blocks into typed ResponseChunk objects."""
-    for content_block in stream:
-        match content_block["type"]:
-            case "reasoning":
-                yield ReasoningChunk(content=content_block["reasoning"])
-            case "text":
-                yield TextChunk(content=content_block["text"])
-            case "non_standard":
-                # Tool-emitted chunks are wrapped in NonStandardContentBlock.
-                # Add a case here for each tool chunk type (e.g. letter, citation).
-                inner: Dict[str, Any] = content_block["value"]
-                match inner.get("type"):
-                    case "letter":
-                        current_app.logger.debug(
-                            "Routing non_standard block to letter."
-                        )
-                        yield LetterChunk(content=inner["content"])
-                    case _:
-                        current_app.logger.warning(
-                            f"Unhandled non_standard block type: {inner.get('type')}"
-                        )
-            case _:
-                # Unknown LLM block types are intentionally dropped.
-                current_app.logger.warning(
-                    f"Unhandled block type: {content_block['type']}"
-                )
+from .metrics import server_timing, start_request_timings, timed
+from .sessions import ChatSessionStore, get_session_store
+from .stream_encoding import encode_block, encode_end_of_stream
+
+logger = logging.getLogger(__name__)
+
+SESSION_TOKEN_HEADER = "X-Session-Token"
+SESSION_EXPIRED_MESSAGE = "Session expired or unknown"
+
+
+class SessionExpiredError(Exception):
+    """The request named a server-side session that is unknown or expired."""
+
+
+@dataclass
+class ChatRequest:
+    """A parsed /api/query body, shared by the WSGI and ASGI endpoints."""
+
+    messages: List[AnyMessage | Dict[str, Any]]
+    city: Optional[OregonCity]
+    state: UsaState
+    thread_id: Optional[str] = None
+    checkpointer: Optional[BaseCheckpointSaver] = None
+    stream_deltas: bool = False
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def parse_chat_request(
+    data: Dict[str, Any], store: Optional[ChatSessionStore] = None
+) -> ChatRequest:
+    """Parse a /api/query JSON body.
+
+    Expects:
+    - messages: List of message dicts from the frontend ({"role": ..., "content": ..., "id": ...})
+    - city: Optional city name
+    - state: State abbreviation
+    - session: Optional; opts in to server-side session mode. Send null to
+      start a session (messages seeds the history) or the token from a
+      previous X-Session-Token response header to continue one (messages
+      holds only the new turn).
+    - stream_deltas: Optional; when true, text and reasoning arrive as
+      token-level deltas as the model generates them. Consecutive chunks of
+      the same type should be concatenated by the client.
+
+    Session mode uses `store`, or get_session_store() if it is not given.
+
+    Raises:
+        SessionExpiredError: the session token is unknown or expired; the
+            client should start over with the full history.
+    """
+    # Stateless mode: the client resends the full history every turn.
+    chat_request = ChatRequest(
+        messages=data["messages"],
+        city=OregonCity.from_maybe_str(data["city"]),
+        state=UsaState.from_maybe_str(data["state"]),
+        stream_deltas=data.get("stream_deltas") is True,
+    )
+    if "session" not in data:
+        return chat_request
+
+    if store is None:
+        store = get_session_store()
+    token = data["session"]
+    if token is None:
+        token = store.new_token()
+    elif not (store.is_valid_token(token) and store.is_active(token)):
+        raise SessionExpiredError(token)
+
+    # Stable IDs let the checkpointer's add_messages reducer dedupe the new
+    # turn if the stream is retried.
+    for m in chat_request.messages:
+        if isinstance(m, dict):
+            m.setdefault("id", str(uuid.uuid4()))
+    chat_request.thread_id = token
+    chat_request.checkpointer = store.checkpointer
+    chat_request.headers[SESSION_TOKEN_HEADER] = token
+    return chat_request
 
 
 class ChatView(View):
@@ -57,41 +100,51 @@ class ChatView(View):
     def dispatch_request(self, *args, **kwargs) -> Response:
         """
         Handle client POST request
-        Expects JSON body with:
-        - messages: List of message dicts from the frontend ({"role": ..., "content": ..., "id": ...})
-        - city: Optional city name
-        - state: State abbreviation
+        Expects a JSON body as described in parse_chat_request. Unknown or
+        expired session tokens get a 410.
         """
 
-        data: Dict[str, Any] = request.json
-
-        messages: List[AnyMessage | Dict[str, Any]] = data["messages"]
-        city: OregonCity | None = OregonCity.from_maybe_str(data["city"])
-        state: UsaState = UsaState.from_maybe_str(data["state"])
+        timings = start_request_timings()
+        try:
+            with timed("parse"):
+                chat_request = parse_chat_request(request.json)
+        except SessionExpiredError:
+            return Response(SESSION_EXPIRED_MESSAGE, status=410, mimetype="text/plain")
 
-        # Create a stable & unique thread ID based on client IP and endpoint
-        # TODO: consider using randomly-generated token stored client-side in
-        #       a secure-cookie
-        tid: str | None = None
+        chat_manager = self.chat_manager
+        if chat_request.checkpointer is not None:
+            chat_manager = LangChainChatManager(checkpointer=chat_request.checkpointer)
 
-        def generate() -> Generator[str, Any, None]:
+        def generate() -> Generator[bytes, Any, None]:
+            # Runs after dispatch_request returns; keep timing into the same dict.
+            start_request_timings(timings)
+            log = current_app.logger
+            debug = log.isEnabledFor(logging.DEBUG)
             response_stream: Generator[ContentBlock, Any, None] = (
-                self.chat_manager.generate_streaming_response(
-                    messages=messages,
-                    city=city,
-                    state=state,
-                    thread_id=tid,
+                chat_manager.generate_streaming_response(
+                    messages=chat_request.messages,
+                    city=chat_request.city,
+                    state=chat_request.state,
+                    thread_id=chat_request.thread_id,
+                    stream_deltas=chat_request.stream_deltas,
                 )
             )
-            for content_block in _classify_blocks(response_stream):
-                current_app.logger.debug(f"Sending content_block: {content_block}")
-                yield content_block.model_dump_json() + "\n"
-            done_chunk = EndOfStreamChunk()
-            current_app.logger.debug(f"Sending done chunk: {done_chunk}")
-            yield done_chunk.model_dump_json() + "\n"
+            for content_block in response_stream:
+                with timed("serialize"):
+                    line = encode_block(content_block)
+                if line is None:
+                    continue
+                if debug:
+                    log.debug("Sending content_block: %r", line)
+                yield line
+            done_line = encode_end_of_stream(server_timing(timings))
+            if debug:
+                log.debug("Sending done chunk: %r", done_line)
+            yield done_line
 
         # text/plain rather than application/x-ndjson: client only reads raw bytes
         return Response(
             stream_with_context(generate()),
             mimetype="text/plain",
+            headers=chat_request.headers,
         )
@@ -1,12 +1,12 @@
 import logging
 import os
+import tempfile
 from collections.abc import Mapping
 from enum import StrEnum, auto
 from pathlib import Path
 from typing import Final, Optional, cast
 
 from dotenv import load_dotenv
-from langchain_google_genai import HarmBlockThreshold, HarmCategory
 
 from .logger import temporary_formatted_handler
 
@@ -141,12 +141,15 @@ class _GoogEnvAndPolicy:
 
         # Assign slot attributes for hard-coded values
         # TODO: separate these from environment variables
+        # HarmCategory -> HarmBlockThreshold names. ChatGoogleGenerativeAI
+        # parses them into its enums; using names here keeps google.genai out
+        # of the import of this module.
         self.SAFETY_SETTINGS: Final = {
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.OFF,
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.OFF,
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.OFF,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.OFF,
-            HarmCategory.HARM_CATEGORY_UNSPECIFIED: HarmBlockThreshold.OFF,
+            "HARM_CATEGORY_DANGEROUS_CONTENT": "OFF",
+            "HARM_CATEGORY_HARASSMENT": "OFF",
+            "HARM_CATEGORY_HATE_SPEECH": "OFF",
+            "HARM_CATEGORY_SEXUALLY_EXPLICIT": "OFF",
+            "HARM_CATEGORY_UNSPECIFIED": "OFF",
         }
 
         # Low temperature for consistent legal citation output.
@@ -167,6 +170,115 @@ GEMINI_THINKING_BUDGET_DYNAMIC: Final = -1
 # the LLM. Typical values: global, us, eu.
 DEFAULT_VERTEX_AI_SEARCH_LOCATION: Final = "us"
 
+# Process-wide Vertex AI Search retriever pool (see langchain_tools.RetrieverPool).
+# One long-lived retriever (and its gRPC channel) is kept per datastore ID; the
+# least recently used entry is dropped beyond MAX_SIZE, and entries unused for
+# IDLE_SECONDS are evicted on the next acquire.
+RETRIEVER_POOL_MAX_SIZE: Final = 4
+RETRIEVER_POOL_IDLE_SECONDS: Final = 30 * 60
+
+# Fan-out retrieval across several datastores (see langchain_tools.py). Worker
+# threads are shared by all requests in a process; datastores that have not
+# answered within the timeout are skipped.
+RAG_FAN_OUT_MAX_WORKERS: Final = 8
+RAG_FAN_OUT_TIMEOUT_SECONDS: Final = 10.0
+
+# Bundled BM25 index over the statute corpus (see local_retrieval.py), built by
+# `make build-local-index`. retrieve_city_state_laws falls back to it when
+# Vertex AI Search raises or has not answered within FALLBACK_SECONDS.
+LOCAL_INDEX_PATH: Final = Path(__file__).parent / "local_index.json.gz"
+LOCAL_RETRIEVAL_FALLBACK_SECONDS: Final = 6.0
+LOCAL_RETRIEVAL_MODES: Final = ("off", "fallback", "primary")
+
+# ORS section number -> full text, used by the lookup_ors_section tool (see
+# ors_sections.py).
+ORS_SECTIONS_PATH: Final = Path(__file__).parent / "sections.json"
+
+# Compiled agent graphs cached per (city, state, system prompt hash); see
+# langchain_chat_manager.CompiledAgentCache. There are only a handful of
+# jurisdictions, so this comfortably holds all of them.
+AGENT_CACHE_MAX_SIZE: Final = 8
+
+# Provider-side context caching of the system prompt and tool declarations
+# (see prompt_cache.py; opt-in via PROMPT_CACHE_ENABLED). Caches live for
+# TTL_SECONDS and are replaced REFRESH_SECONDS before they expire; after a
+# failed creation, full prompts are sent for RETRY_SECONDS before trying again.
+PROMPT_CACHE_TTL_SECONDS: Final = 60 * 60
+PROMPT_CACHE_REFRESH_SECONDS: Final = 5 * 60
+PROMPT_CACHE_RETRY_SECONDS: Final = 10 * 60
+PROMPT_CACHE_MAX_SIZE: Final = 8
+
+# Token-level streaming (opt-in per request, see chat.parse_chat_request).
+# Model deltas arriving within this window of the previous emitted chunk are
+# merged, trading a little latency for far fewer NDJSON lines. 0 forwards
+# every delta as it arrives.
+STREAM_COALESCE_SECONDS: Final = 0.05
+
+# Progressive retrieval (see langchain_tools._make_rag_tool; on unless
+# PROGRESSIVE_RETRIEVAL_ENABLED is false). Every search requests this many
+# passages, the schemas' max_documents limit, and caches the whole ranked page;
+# the tool returns the top max_documents, so a retry of the same query with a
+# larger max_documents is served from the cache.
+RAG_PROGRESSIVE_PAGE_SIZE: Final = 8
+
+# RAG retrieval result cache (see retrieval_cache.py). Results are cached per
+# datastore, normalized query, filter and extraction parameters. When
+# RETRIEVAL_CACHE_PATH is set, a SQLite file at that path is shared by all
+# workers on the node; otherwise each process keeps its own in-memory LRU.
+RETRIEVAL_CACHE_TTL_SECONDS: Final = 6 * 60 * 60
+RETRIEVAL_CACHE_MAX_SIZE: Final = 1024
+
+# Per-request agent budgets (see budget.py). Once a request has made
+# MAX_MODEL_CALLS model calls or MAX_TOOL_CALLS tool calls, spent
+# MAX_RETRIEVAL_SECONDS in retrieval tools or run for DEADLINE_SECONDS, no more
+# tools run and the model answers with what it has.
+REQUEST_BUDGET_MAX_MODEL_CALLS: Final = 8
+REQUEST_BUDGET_MAX_TOOL_CALLS: Final = 6
+REQUEST_BUDGET_MAX_RETRIEVAL_SECONDS: Final = 30.0
+REQUEST_BUDGET_DEADLINE_SECONDS: Final = 90.0
+
+# First-turn response cache (see response_cache.py; opt-in via
+# RESPONSE_CACHE_ENABLED). Questions longer than MAX_QUERY_WORDS are never
+# cached; a cached answer is only reused for the same words in the same order.
+RESPONSE_CACHE_TTL_SECONDS: Final = 12 * 60 * 60
+RESPONSE_CACHE_MAX_SIZE: Final = 512
+RESPONSE_CACHE_MAX_QUERY_WORDS: Final = 40
+
+# Compaction of earlier conversation turns (see history.py). Earlier tool
+# results over STALE_TOOL_OUTPUT_MAX_CHARS are replaced with a stub, and the
+# oldest turns are dropped while the estimated history (CHARS_PER_TOKEN
+# characters per token) exceeds TOKEN_BUDGET. At most COMPACTION_CACHE_SIZE
+# compacted turns are cached.
+HISTORY_TOKEN_BUDGET: Final = 32_000
+HISTORY_CHARS_PER_TOKEN: Final = 4
+HISTORY_COMPACTION_CACHE_SIZE: Final = 1024
+STALE_TOOL_OUTPUT_MAX_CHARS: Final = 400
+
+# Background delivery of /api/feedback (see feedback.FeedbackQueue). WORKERS
+# threads each handle one job at a time, so at most that many transcripts are
+# rendered at once, each in its own process, killed after RENDER_TIMEOUT_SECONDS.
+# Beyond QUEUE_SIZE waiting jobs the endpoint answers 503. A failed send is
+# tried SEND_ATTEMPTS times with exponential backoff from SEND_RETRY_SECONDS.
+FEEDBACK_WORKERS: Final = 2
+FEEDBACK_QUEUE_SIZE: Final = 32
+FEEDBACK_RENDER_TIMEOUT_SECONDS: Final = 30.0
+FEEDBACK_SEND_ATTEMPTS: Final = 3
+FEEDBACK_SEND_RETRY_SECONDS: Final = 2.0
+
+# Opt-in server-side chat sessions (see sessions.py). Sessions idle for longer
+# than the TTL are deleted from the checkpointer; a sweep of all sessions runs
+# at most once per SWEEP_SECONDS.
+CHAT_SESSION_TTL_SECONDS: Final = 2 * 60 * 60
+CHAT_SESSION_SWEEP_SECONDS: Final = 10 * 60
+
+# Question sent through /api/query by each gunicorn worker before it accepts
+# traffic when WARM_START_REQUEST_ENABLED (see warm_start.py).
+WARM_START_QUERY: Final = "What notice does my landlord have to give before entering?"
+
+# Latency quantiles in metrics.py are computed over this many recent samples
+# per stage.
+METRICS_SAMPLE_WINDOW: Final = 1024
+
 # Module singleton
 # TODO: rename to VERTEX_CONFIG?
 # Use the project log format for the "no .env" warning emitted during __init__,
@@ -176,6 +288,44 @@ with temporary_formatted_handler(logger):
 
 LANGSMITH_API_KEY: Final = os.getenv("LANGSMITH_API_KEY")
 
+RETRIEVAL_CACHE_PATH: Final = os.getenv("RETRIEVAL_CACHE_PATH") or None
+# Server-side chat sessions (see sessions.py) live in this SQLite file, which
+# every gunicorn worker on the node opens, so a session can be continued by
+# whichever worker receives the next turn.
+CHAT_SESSION_DB_PATH: Final = os.getenv("CHAT_SESSION_DB_PATH") or str(
+    Path(tempfile.gettempdir()) / "tenantfirstaid-sessions.sqlite3"
+)
+# Cache the system prompt prefix as Gemini cached content (see prompt_cache.py).
+PROMPT_CACHE_ENABLED: Final = _strtobool(os.getenv("PROMPT_CACHE_ENABLED", "false"))
+# Enforce per-request agent budgets (see budget.py); on unless set to false.
+REQUEST_BUDGET_ENABLED: Final = _strtobool(os.getenv("REQUEST_BUDGET_ENABLED", "true"))
+# Fetch and cache a full page of passages per search; on unless set to false.
+PROGRESSIVE_RETRIEVAL_ENABLED: Final = _strtobool(
+    os.getenv("PROGRESSIVE_RETRIEVAL_ENABLED", "true")
+)
+# Compact earlier turns before model calls (see history.py); on unless false.
+HISTORY_COMPACTION_ENABLED: Final = _strtobool(
+    os.getenv("HISTORY_COMPACTION_ENABLED", "true")
+)
+# Replay cached answers to first-turn questions (see response_cache.py).
+RESPONSE_CACHE_ENABLED: Final = _strtobool(os.getenv("RESPONSE_CACHE_ENABLED", "false"))
+# Send WARM_START_QUERY through each new gunicorn worker (see warm_start.py).
+# Off by default: it costs one real model call per worker start.
+WARM_START_REQUEST_ENABLED: Final = _strtobool(
+    os.getenv("WARM_START_REQUEST_ENABLED", "false")
+)
+# Per-stage latency metrics (see metrics.py) and the /api/metrics endpoint.
+METRICS_ENABLED: Final = _strtobool(os.getenv("METRICS_ENABLED", "false"))
+# How retrieve_city_state_laws uses the bundled local index: "fallback" (when
+# Vertex AI Search fails or is slow), "primary" (answer from it and skip Vertex
+# AI Search) or "off".
+LOCAL_RETRIEVAL_MODE: Final = os.getenv("LOCAL_RETRIEVAL_MODE", "fallback").lower()
+if LOCAL_RETRIEVAL_MODE not in LOCAL_RETRIEVAL_MODES:
+    raise ValueError(
+        f"[LOCAL_RETRIEVAL_MODE] must be one of {LOCAL_RETRIEVAL_MODES}, "
+        f"got {LOCAL_RETRIEVAL_MODE!r}."
+    )
+
 OREGON_LAW_CENTER_PHONE_NUMBER: Final = "888-585-9638"
 RESPONSE_WORD_LIMIT: Final = 350
 
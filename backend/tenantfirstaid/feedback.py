@@ -1,16 +1,62 @@
+"""User feedback email, optionally with the chat transcript attached as a PDF.
+
+send_feedback only validates the form and queues a job; it answers 202 with
+the job ID, which the job's log lines carry. Jobs run on FEEDBACK_WORKERS
+background threads (see FeedbackQueue):
+
+- A transcript is rendered to PDF in a child process. xhtml2pdf is pure
+  Python and CPU-bound, so rendering in the worker process would hold the GIL
+  and slow every streaming chat it serves. A render that runs past
+  FEEDBACK_RENDER_TIMEOUT_SECONDS is killed.
+- The email is sent over SMTP, retried with backoff up to
+  FEEDBACK_SEND_ATTEMPTS times.
+
+Transcripts over MAX_TRANSCRIPT_HTML_SIZE are refused with 413 before they
+are queued. Jobs are kept in this worker's memory only, so queued jobs are
+lost if the worker restarts. Their status is not served back: with several
+gunicorn workers a status request would rarely reach the worker that holds
+the job.
+"""
+
+import contextlib
+import logging
+import multiprocessing
 import os
+import queue
+import threading
+import uuid
+from dataclasses import dataclass, field
 from io import BytesIO
-from typing import Optional, Tuple
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
-from flask import request
+from flask import Flask, current_app, request
 from flask_mailman import EmailMessage
-from xhtml2pdf import pisa
-from xhtml2pdf.context import pisaContext
+from tenacity import Retrying, stop_after_attempt, wait_exponential
+from werkzeug.local import LocalProxy
+
+from .constants import (
+    FEEDBACK_QUEUE_SIZE,
+    FEEDBACK_RENDER_TIMEOUT_SECONDS,
+    FEEDBACK_SEND_ATTEMPTS,
+    FEEDBACK_SEND_RETRY_SECONDS,
+    FEEDBACK_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
 
 MAX_ATTACHMENT_SIZE: int = 2 * 1024 * 1024
+# A transcript's PDF is about a tenth the size of its HTML, so anything under
+# this renders well within MAX_ATTACHMENT_SIZE (and in about ten seconds).
+MAX_TRANSCRIPT_HTML_SIZE: int = MAX_ATTACHMENT_SIZE // 2
 
 
 def convert_html_to_pdf(html_content: str) -> Optional[bytes]:
+    # xhtml2pdf (with ReportLab) takes ~0.5s to import; only load it once a
+    # transcript actually needs rendering.
+    from xhtml2pdf import pisa
+    from xhtml2pdf.context import pisaContext
+
     pdf_buffer = BytesIO()
 
     pisa_status = pisa.CreatePDF(html_content, dest=pdf_buffer)
@@ -20,7 +66,143 @@ def convert_html_to_pdf(html_content: str) -> Optional[bytes]:
     return pdf_buffer.getvalue()
 
 
-def send_feedback() -> Tuple[str, int]:
+def _render_in_child(html_content: str, conn: Connection) -> None:
+    conn.send(convert_html_to_pdf(html_content))
+    conn.close()
+
+
+def render_pdf(
+    html_content: str, timeout: float = FEEDBACK_RENDER_TIMEOUT_SECONDS
+) -> Optional[bytes]:
+    """Run convert_html_to_pdf in a child process; None on failure or timeout."""
+    # A fresh interpreter rather than a fork of this threaded process.
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_render_in_child, args=(html_content, sender))
+    proc.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            logger.warning("Transcript PDF rendering timed out after %.0fs", timeout)
+            return None
+        return receiver.recv()
+    except EOFError:
+        logger.warning("Transcript PDF rendering exited with %s", proc.exitcode)
+        return None
+    finally:
+        receiver.close()
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+
+
+@dataclass
+class FeedbackJob:
+    email_params: Dict[str, Any]
+    transcript_html: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    # queued -> rendering (transcripts only) -> sending -> sent, or failed.
+    status: str = "queued"
+    error: Optional[str] = None
+    attempts: int = 0
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+    # The app whose mail settings are used to send.
+    app: Optional[Flask] = field(default=None, repr=False)
+
+
+class FeedbackQueue:
+    """Runs feedback jobs on background threads.
+
+    Thread-safe. Threads are started on the first submit, so none exist in a
+    gunicorn master that imported the app before forking workers.
+    """
+
+    def __init__(
+        self,
+        workers: int = FEEDBACK_WORKERS,
+        max_queued: int = FEEDBACK_QUEUE_SIZE,
+    ) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        self._queue: queue.Queue[FeedbackJob] = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, job: FeedbackJob) -> FeedbackJob:
+        """Queue `job`; raises queue.Full if max_queued jobs are already waiting."""
+        self._start()
+        self._queue.put_nowait(job)
+        return job
+
+    def join(self) -> None:
+        """Block until every queued job has finished."""
+        self._queue.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                t = threading.Thread(target=self._run, name="feedback", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                self._process(job)
+            except Exception as e:
+                logger.exception("Feedback job %s failed", job.id)
+                job.status, job.error = "failed", f"Send failed: {e}"
+            finally:
+                job.transcript_html = None
+                job.done.set()
+                self._queue.task_done()
+
+    def _process(self, job: FeedbackJob) -> None:
+        pdf_content: Optional[bytes] = None
+        if job.transcript_html is not None:
+            job.status = "rendering"
+            pdf_content = render_pdf(job.transcript_html)
+            if pdf_content is None:
+                job.status, job.error = "failed", "PDF conversion failed"
+                logger.warning("Feedback job %s failed: %s", job.id, job.error)
+                return
+            if len(pdf_content) > MAX_ATTACHMENT_SIZE:
+                job.status, job.error = "failed", "Attachment too large"
+                logger.warning("Feedback job %s failed: %s", job.id, job.error)
+                return
+
+        job.status = "sending"
+        for attempt in Retrying(
+            stop=stop_after_attempt(FEEDBACK_SEND_ATTEMPTS),
+            wait=wait_exponential(multiplier=FEEDBACK_SEND_RETRY_SECONDS, max=30),
+            reraise=True,
+            before_sleep=lambda rs: logger.warning(
+                "Feedback email retry #%d after %s",
+                rs.attempt_number,
+                rs.outcome.exception() if rs.outcome else "unknown",
+            ),
+        ):
+            with attempt:
+                job.attempts += 1
+                _send_email(job, pdf_content)
+        job.status = "sent"
+
+
+def _send_email(job: FeedbackJob, pdf_content: Optional[bytes]) -> None:
+    with job.app.app_context() if job.app else contextlib.nullcontext():
+        msg = EmailMessage(**job.email_params)
+        if pdf_content is not None:
+            msg.attach("transcript.pdf", pdf_content, "application/pdf")
+        msg.send()
+
+
+FEEDBACK_QUEUE = FeedbackQueue()
+
+
+def send_feedback() -> Tuple[Union[str, Dict[str, Any]], int]:
     feedback = request.form.get("feedback")
     file = request.files.get("transcript")
 
@@ -36,43 +218,35 @@ def send_feedback() -> Tuple[str, int]:
     if not file:
         name = request.form.get("name")
         subject = request.form.get("subject")
-        email_params = {
-            "subject": subject or "Homepage Feedback",
-            "from_email": os.getenv("SENDER_EMAIL"),
-            "to": [os.getenv("RECIPIENT_EMAIL")],
-            "body": f"From: {name}\n\n{feedback}",
-        }
-        try:
-            EmailMessage(**email_params).send()
-            return "Message sent", 200
-        except Exception as e:
-            return f"Send failed: {str(e)}", 500
-
-    html_content: str = file.read().decode("utf-8")
-    pdf_content: Optional[bytes] = convert_html_to_pdf(html_content)
-    if pdf_content is None:
-        return "PDF conversion failed", 500
-
-    if len(pdf_content) > MAX_ATTACHMENT_SIZE:
-        return "Attachment too large", 413
-
-    email_params = {
-        "subject": "Feedback with Transcript",
-        "from_email": os.getenv("SENDER_EMAIL"),
-        "to": [os.getenv("RECIPIENT_EMAIL")],
-        "body": f"User feedback:\n\n{feedback}\n\nTranscript is attached below",
-        "cc": cc_list,
-    }
-
-    try:
-        msg = EmailMessage(**email_params)
-        msg.attach(
-            "transcript.pdf",
-            pdf_content,
-            "application/pdf",
+        job = FeedbackJob(
+            email_params={
+                "subject": subject or "Homepage Feedback",
+                "from_email": os.getenv("SENDER_EMAIL"),
+                "to": [os.getenv("RECIPIENT_EMAIL")],
+                "body": f"From: {name}\n\n{feedback}",
+            }
+        )
+    else:
+        html_bytes = file.read(MAX_TRANSCRIPT_HTML_SIZE + 1)
+        if len(html_bytes) > MAX_TRANSCRIPT_HTML_SIZE:
+            return "Attachment too large", 413
+        job = FeedbackJob(
+            email_params={
+                "subject": "Feedback with Transcript",
+                "from_email": os.getenv("SENDER_EMAIL"),
+                "to": [os.getenv("RECIPIENT_EMAIL")],
+                "body": (
+                    f"User feedback:\n\n{feedback}\n\nTranscript is attached below"
+                ),
+                "cc": cc_list,
+            },
+            transcript_html=html_bytes.decode("utf-8"),
         )
 
-        msg.send()
-        return "Message sent", 200
-    except Exception as e:
-        return f"Send failed: {str(e)}", 500
+    # The worker thread has no app context of its own; hand it the real app.
+    job.app = cast("LocalProxy[Flask]", current_app)._get_current_object()
+    try:
+        FEEDBACK_QUEUE.submit(job)
+    except queue.Full:
+        return "Feedback queue is full, try again later", 503
+    return {"job_id": job.id}, 202
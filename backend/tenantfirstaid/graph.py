@@ -4,44 +4,75 @@ Provides the LLM, tools, and graph factory used by both LangChainChatManager
 (web app) and `langgraph dev` / LangSmith Cloud deployment.
 """
 
+import logging
 import threading
+import time
 from collections.abc import Awaitable
 from dataclasses import dataclass, field
-from typing import Any, Callable, List, NotRequired, Optional, TypedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    List,
+    NotRequired,
+    Optional,
+    TypedDict,
+)
 
 from langchain.agents import create_agent
 from langchain.agents.middleware.types import (
     AgentMiddleware,
     ModelRequest,
     ModelResponse,
+    ToolCallRequest,
 )
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 from langchain_core.tools import BaseTool
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
-
-from .constants import DEFAULT_INSTRUCTIONS, SINGLETON
+from langgraph.types import Command
+
+from .budget import BUDGET_EXHAUSTED_NOTE, RequestBudget, current_budget
+from .constants import (
+    DEFAULT_INSTRUCTIONS,
+    HISTORY_COMPACTION_ENABLED,
+    PROMPT_CACHE_ENABLED,
+    SINGLETON,
+)
 from .google_auth import load_gcp_credentials
+from .history import compact_history
 from .langchain_tools import (
     generate_letter,
-    get_active_rag_tools,
+    get_agent_rag_tools,
     get_letter_template,
+    lookup_ors_section,
 )
 from .location import OregonCity, TFAAgentStateSchema, UsaState
+from .metrics import timed, timed_fn
+from .prompt_cache import PROMPT_CACHE
+
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+logger = logging.getLogger(__name__)
 
 # Deferred LLM — built on first use so the module can be imported without
-# valid GCP credentials (e.g. fork CI that only runs unit tests).
-_llm: Optional[ChatGoogleGenerativeAI] = None
+# valid GCP credentials (e.g. fork CI that only runs unit tests). The Gemini
+# client library is imported here too, not with the app, since it adds
+# ~0.8s to every cold start.
+_llm: Optional["ChatGoogleGenerativeAI"] = None
 _llm_lock = threading.Lock()
 
 
-def _get_llm() -> ChatGoogleGenerativeAI:
+def _get_llm() -> "ChatGoogleGenerativeAI":
     """Return the shared LLM instance, creating it on first call."""
     global _llm
     with _llm_lock:
         if _llm is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
             assert SINGLETON.GOOGLE_APPLICATION_CREDENTIALS is not None, (
                 "GOOGLE_APPLICATION_CREDENTIALS is not set"
             )
@@ -62,7 +93,19 @@ def _get_llm() -> ChatGoogleGenerativeAI:
         return _llm
 
 
-tools: List[BaseTool] = [*get_active_rag_tools(), get_letter_template, generate_letter]
+def reset_llm() -> None:
+    """Forget the shared LLM so the next call builds a new client (e.g. after fork)."""
+    global _llm
+    with _llm_lock:
+        _llm = None
+
+
+tools: List[BaseTool] = [
+    *get_agent_rag_tools(),
+    lookup_ors_section,
+    get_letter_template,
+    generate_letter,
+]
 
 
 @dataclass
@@ -112,6 +155,208 @@ class _SystemPromptFromContext(AgentMiddleware[Any, TFAContext]):
         return await handler(request.override(system_message=self._build(request)))
 
 
+class _CompactHistory(AgentMiddleware):
+    """Middleware that sends the model a compacted history (see history.py).
+
+    Earlier turns' tool results and superseded letter drafts are shortened and
+    the oldest turns dropped to fit HISTORY_TOKEN_BUDGET; the agent state keeps
+    the full messages. Must run outside _BudgetGuard, whose appended note
+    would otherwise be taken for the start of a new turn.
+    """
+
+    def _compacted(self, request: ModelRequest) -> ModelRequest:
+        if not HISTORY_COMPACTION_ENABLED:
+            return request
+        return request.override(messages=compact_history(request.messages))
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        return handler(self._compacted(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        return await handler(self._compacted(request))
+
+
+class _ModelCallTimer(AgentMiddleware):
+    """Middleware that records each model call under the "model" stage."""
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        with timed("model"):
+            return handler(request)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        with timed("model"):
+            return await handler(request)
+
+
+class _BudgetGuard(AgentMiddleware):
+    """Middleware that enforces the current request's RequestBudget (budget.py).
+
+    Tool calls beyond the budget get BUDGET_EXHAUSTED_NOTE instead of running.
+    Once the budget is used up, model calls are made with tool_choice="none"
+    and the note after the conversation, so the model answers with what it
+    already has. Does nothing when no budget is active (e.g. `langgraph dev`).
+    """
+
+    def _model_request(self, request: ModelRequest) -> ModelRequest:
+        budget = current_budget()
+        if budget is None or not budget.start_model_call():
+            return request
+        return request.override(
+            messages=[*request.messages, HumanMessage(BUDGET_EXHAUSTED_NOTE)],
+            tool_choice="none",
+        )
+
+    @staticmethod
+    def _blocked(request: ToolCallRequest) -> ToolMessage:
+        return ToolMessage(
+            BUDGET_EXHAUSTED_NOTE,
+            tool_call_id=request.tool_call["id"],
+            name=request.tool_call["name"],
+            status="error",
+        )
+
+    @staticmethod
+    def _record(budget: RequestBudget, request: ToolCallRequest, start: float) -> None:
+        # Retrieval tools are the ones that leave the process.
+        if request.tool_call["name"].startswith("retrieve_"):
+            budget.add_retrieval_time(time.monotonic() - start)
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        return handler(self._model_request(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        return await handler(self._model_request(request))
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        budget = current_budget()
+        if budget is None:
+            return handler(request)
+        if not budget.start_tool_call():
+            return self._blocked(request)
+        start = time.monotonic()
+        try:
+            return handler(request)
+        finally:
+            self._record(budget, request, start)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        budget = current_budget()
+        if budget is None:
+            return await handler(request)
+        if not budget.start_tool_call():
+            return self._blocked(request)
+        start = time.monotonic()
+        try:
+            return await handler(request)
+        finally:
+            self._record(budget, request, start)
+
+
+class _CachedPromptPrefix(AgentMiddleware):
+    """Middleware that replaces the system prompt and tools with a cached context.
+
+    When PROMPT_CACHE_ENABLED and PROMPT_CACHE has a live cache for this
+    request's system message and tools, the call sends only the messages and
+    the cache name. Otherwise (cache still being created, creation failed,
+    non-Gemini model, or a call that may not use tools) the request is passed
+    through unchanged. A call the provider rejects while using a cache is
+    retried once without it.
+    Must run inside any middleware that sets the system message.
+    """
+
+    def _cached(self, request: ModelRequest) -> Optional[ModelRequest]:
+        if (
+            not PROMPT_CACHE_ENABLED
+            or request.system_message is None
+            # The tool config must be sent with the tools, which the cache holds.
+            or request.tool_choice == "none"
+        ):
+            return None
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        if not isinstance(request.model, ChatGoogleGenerativeAI):
+            return None
+        name = PROMPT_CACHE.lookup(request.model, request.system_message, request.tools)
+        if name is None:
+            return None
+        return request.override(
+            system_message=None,
+            tools=[],
+            model_settings={**request.model_settings, "cached_content": name},
+        )
+
+    def _uncache(self, cached: ModelRequest, e: Exception) -> None:
+        name = cached.model_settings["cached_content"]
+        logger.warning(
+            "Model call with prompt cache %s failed (%s); retrying without it", name, e
+        )
+        PROMPT_CACHE.invalidate(name)
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        cached = self._cached(request)
+        if cached is None:
+            return handler(request)
+        from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
+
+        try:
+            return handler(cached)
+        except ChatGoogleGenerativeAIError as e:
+            self._uncache(cached, e)
+            return handler(request)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        cached = self._cached(request)
+        if cached is None:
+            return await handler(request)
+        from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
+
+        try:
+            return await handler(cached)
+        except ChatGoogleGenerativeAIError as e:
+            self._uncache(cached, e)
+            return await handler(request)
+
+
 def _build_system_message(
     base_prompt: str, city: Optional[OregonCity], state: UsaState
 ) -> SystemMessage:
@@ -126,9 +371,10 @@ def prepare_system_prompt(city: Optional[OregonCity], state: UsaState) -> System
     return _build_system_message(DEFAULT_INSTRUCTIONS, city, state)
 
 
+@timed_fn("graph_build")
 def create_graph(
     system_prompt: Optional[SystemMessage] = None,
-    checkpointer: Optional[InMemorySaver] = None,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
 ) -> CompiledStateGraph[Any, Any, Any, Any]:
     """Create a Tenant First Aid agent graph.
 
@@ -150,6 +396,12 @@ def create_graph(
             model,
             tools,
             system_prompt=system_prompt,
+            middleware=[
+                _CompactHistory(),
+                _ModelCallTimer(),
+                _BudgetGuard(),
+                _CachedPromptPrefix(),
+            ],
             state_schema=TFAAgentStateSchema,
             checkpointer=checkpointer,
         )
@@ -163,7 +415,13 @@ def create_graph(
     return create_agent(
         model,
         tools,
-        middleware=[_SystemPromptFromContext()],
+        middleware=[
+            _SystemPromptFromContext(),
+            _CompactHistory(),
+            _ModelCallTimer(),
+            _BudgetGuard(),
+            _CachedPromptPrefix(),
+        ],
         state_schema=TFAAgentStateSchema,
         checkpointer=checkpointer,
     )
@@ -0,0 +1,61 @@
+"""gunicorn settings for preloading the app and warming each worker.
+
+    gunicorn -c python:tenantfirstaid.gunicorn_config --workers 2 --threads 4 \\
+        --bind 0.0.0.0:5001 tenantfirstaid.app:app
+
+Other settings (workers, threads, bind, timeouts) are still given on the
+command line. See warm_start.py for what runs in the master and in each
+worker. The master logs how long importing and preloading took and its RSS.
+Each worker logs the time from fork until it was ready, with each warm-up
+step, and its RSS.
+"""
+
+import time
+
+from gunicorn.arbiter import Arbiter
+from gunicorn.workers.base import Worker
+
+# Measured from here: the app is imported after gunicorn reads this file.
+_config_loaded = time.monotonic()
+_forked_at: float = 0.0
+
+preload_app = True
+
+
+# The hooks import tenantfirstaid lazily so that reading this file does not
+# import the app before gunicorn does.
+def when_ready(server: Arbiter) -> None:
+    from tenantfirstaid.warm_start import format_rss, preload, rss_bytes
+
+    preload()
+    # Set by the time gunicorn calls hooks; typed Optional on Arbiter.
+    if server.log is not None:
+        server.log.info(
+            "App imported and preloaded in %.2fs; master RSS %s",
+            time.monotonic() - _config_loaded,
+            format_rss(rss_bytes()),
+        )
+
+
+def post_fork(server: Arbiter, worker: Worker) -> None:
+    from tenantfirstaid.warm_start import reset_after_fork
+
+    global _forked_at
+    _forked_at = time.monotonic()
+    reset_after_fork()
+
+
+def post_worker_init(worker: Worker) -> None:
+    from tenantfirstaid.warm_start import format_rss, rss_bytes, warm_up
+
+    steps = warm_up(worker.wsgi)
+    worker.log.info(
+        "Worker %d ready %.2fs after fork (%s); RSS %s",
+        worker.pid,
+        time.monotonic() - _forked_at,
+        ", ".join(
+            f"{name} {'failed' if s is None else f'{s:.2f}s'}"
+            for name, s in steps.items()
+        ),
+        format_rss(rss_bytes()),
+    )
@@ -0,0 +1,236 @@
+"""Compaction of earlier conversation turns before each model call.
+
+The frontend resends every prior turn, with generated letters expanded back
+into the AI messages' text, and a session thread keeps every tool result,
+including up to 8 retrieved statute passages per search. Without compaction
+the input grows with every turn. compact_history rewrites the turns before
+the latest user message (the current turn is never changed):
+
+- tool results longer than STALE_TOOL_OUTPUT_MAX_CHARS are replaced with a
+  stub listing the statute sections they mentioned, which the model can look
+  up again if it needs the text;
+- every letter draft except the latest (a generate_letter call or a letter in
+  an AI message's text) is replaced with a placeholder;
+- if the history is still over HISTORY_TOKEN_BUDGET (estimated at
+  HISTORY_CHARS_PER_TOKEN characters per token), the oldest turns are dropped.
+
+Compacted turns are cached by a digest of the conversation up to the end of
+the turn, so each turn is rewritten once rather than on every model call of
+every later request. graph._CompactHistory applies this to model requests;
+the agent state keeps the full history.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Final, List
+
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+
+from .constants import (
+    HISTORY_CHARS_PER_TOKEN,
+    HISTORY_COMPACTION_CACHE_SIZE,
+    HISTORY_TOKEN_BUDGET,
+    STALE_TOOL_OUTPUT_MAX_CHARS,
+)
+
+logger = logging.getLogger(__name__)
+
+SUPERSEDED_LETTER_NOTE: Final = "[Earlier letter draft omitted; a later draft follows.]"
+# The most sections listed in a stale tool result's stub.
+_MAX_STUB_SECTIONS: Final = 12
+# ORS ("90.394", "105.105") and city code ("8.425") section numbers.
+_SECTION_RE: Final = re.compile(r"\b\d{1,3}[A-Z]?\.\d{3,4}\b")
+# A letter as the frontend expands it into an AI message: from the salutation
+# through the closing and the signature line after it.
+_LETTER_RE: Final = re.compile(
+    r"^Dear [^\n]*\n.*?^(?:Sincerely|Respectfully|Regards|Best regards),?[ \t]*\n"
+    r"(?:[ \t]*\n)*[^\n]*",
+    re.MULTILINE | re.DOTALL,
+)
+
+
+def _is_user(m: AnyMessage) -> bool:
+    return m.type == "human"
+
+
+def _letter_calls(m: AnyMessage) -> List[int]:
+    if not isinstance(m, AIMessage):
+        return []
+    return [i for i, c in enumerate(m.tool_calls) if c["name"] == "generate_letter"]
+
+
+def _has_letter(m: AnyMessage) -> bool:
+    if _letter_calls(m):
+        return True
+    return (
+        isinstance(m, AIMessage)
+        and isinstance(m.content, str)
+        and _LETTER_RE.search(m.content) is not None
+    )
+
+
+def _estimate_tokens(m: AnyMessage) -> int:
+    chars = len(m.text)
+    if isinstance(m, AIMessage):
+        chars += sum(len(str(c["args"])) for c in m.tool_calls)
+    return chars // HISTORY_CHARS_PER_TOKEN + 1
+
+
+def _tool_output_stub(m: ToolMessage) -> str:
+    sections = list(dict.fromkeys(_SECTION_RE.findall(m.text)))
+    stub = f"[Earlier {m.name or 'tool'} result omitted"
+    if sections:
+        stub += "; sections mentioned: " + ", ".join(sections[:_MAX_STUB_SECTIONS])
+    return stub + ".]"
+
+
+def _collapse_letters(m: AIMessage, keep_last: bool) -> AIMessage:
+    """Replace the letters in `m`, except its last one if `keep_last`."""
+    update = {}
+    calls = _letter_calls(m)
+    if calls:
+        superseded = calls[:-1] if keep_last else calls
+        update["tool_calls"] = [
+            {**c, "args": {**c["args"], "letter": SUPERSEDED_LETTER_NOTE}}
+            if i in superseded
+            else c
+            for i, c in enumerate(m.tool_calls)
+        ]
+    elif isinstance(m.content, str):
+        matches = list(_LETTER_RE.finditer(m.content))
+        if keep_last:
+            matches = matches[:-1]
+        content = m.content
+        for match in reversed(matches):
+            content = (
+                content[: match.start()]
+                + SUPERSEDED_LETTER_NOTE
+                + content[match.end() :]
+            )
+        update["content"] = content
+    return m.model_copy(update=update)
+
+
+def _compact_turn(
+    turn: Sequence[AnyMessage], later_letter: bool
+) -> tuple[AnyMessage, ...]:
+    """Compact one earlier turn; `later_letter` if a later turn has a letter."""
+    compacted: List[AnyMessage] = []
+    # Walk backwards so the turn's last letter is the first one seen.
+    keep_letter = not later_letter
+    for m in reversed(turn):
+        if isinstance(m, ToolMessage) and len(m.text) > STALE_TOOL_OUTPUT_MAX_CHARS:
+            m = m.model_copy(update={"content": _tool_output_stub(m)})
+        elif isinstance(m, AIMessage) and _has_letter(m):
+            m = _collapse_letters(m, keep_letter)
+            keep_letter = False
+        compacted.append(m)
+    compacted.reverse()
+    return tuple(compacted)
+
+
+def _turn_digest(prefix_digest: bytes, turn: Sequence[AnyMessage]) -> bytes:
+    h = hashlib.sha256(prefix_digest)
+    for m in turn:
+        h.update(f"{m.type}\0{m.content!r}\0".encode())
+        if isinstance(m, AIMessage):
+            h.update(repr(m.tool_calls).encode())
+        h.update(b"\1")
+    return h.digest()
+
+
+class HistoryCompactor:
+    """Thread-safe LRU of compacted turns keyed by conversation prefix."""
+
+    def __init__(
+        self,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        max_size: int = HISTORY_COMPACTION_CACHE_SIZE,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self.token_budget = token_budget
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._turns: OrderedDict[tuple[bytes, bool], tuple[AnyMessage, ...]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._turns)
+
+    def _turn(
+        self, digest: bytes, turn: Sequence[AnyMessage], later_letter: bool
+    ) -> tuple[AnyMessage, ...]:
+        key = (digest, later_letter)
+        with self._lock:
+            cached = self._turns.get(key)
+            if cached is not None:
+                self.hits += 1
+                self._turns.move_to_end(key)
+                return cached
+            self.misses += 1
+        compacted = _compact_turn(turn, later_letter)
+        with self._lock:
+            self._turns[key] = compacted
+            while len(self._turns) > self.max_size:
+                self._turns.popitem(last=False)
+        return compacted
+
+    def compact(self, messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+        """Return `messages` with earlier turns compacted to fit the budget."""
+        starts = [i for i, m in enumerate(messages) if _is_user(m)]
+        if len(starts) < 2:
+            return list(messages)
+        # Anything before the first user message belongs to the first turn.
+        bounds = [0, *starts[1:], len(messages)]
+        turns = [messages[a:b] for a, b in zip(bounds, bounds[1:])]
+        current, earlier = turns[-1], turns[:-1]
+
+        later_letter = any(_has_letter(m) for m in current)
+        compacted: List[tuple[AnyMessage, ...]] = []
+        digests: List[bytes] = []
+        digest = b""
+        for turn in earlier:
+            digest = _turn_digest(digest, turn)
+            digests.append(digest)
+        # Right to left, so each turn knows whether a later one has a letter.
+        for turn, digest in zip(reversed(earlier), reversed(digests)):
+            compacted.append(self._turn(digest, turn, later_letter))
+            later_letter = later_letter or any(_has_letter(m) for m in turn)
+        compacted.reverse()
+
+        tokens = sum(_estimate_tokens(m) for m in current) + sum(
+            _estimate_tokens(m) for turn in compacted for m in turn
+        )
+        dropped = 0
+        while compacted and tokens > self.token_budget:
+            tokens -= sum(_estimate_tokens(m) for m in compacted.pop(0))
+            dropped += 1
+        if dropped:
+            logger.info(
+                "Dropped %d of %d earlier turns to fit the history token budget",
+                dropped,
+                len(earlier),
+            )
+        return [m for turn in compacted for m in turn] + list(current)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._turns.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+HISTORY_COMPACTOR: Final = HistoryCompactor()
+
+
+def compact_history(messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+    return HISTORY_COMPACTOR.compact(messages)
@@ -4,25 +4,197 @@ This module provides the web application's chat interface, wrapping the shared
 agent graph with per-session location context and streaming support.
 """
 
+import asyncio
+import hashlib
 import logging
+import threading
 import time
-from typing import Any, Dict, Generator, List, Optional, cast
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Final,
+    Generator,
+    List,
+    Optional,
+    cast,
+)
 
 import httpcore
 import httpx
 from langchain_core.messages import (
     AIMessage,
+    AIMessageChunk,
     AnyMessage,
     ContentBlock,
     NonStandardContentBlock,
+    ReasoningContentBlock,
     SystemMessage,
+    TextContentBlock,
     ToolMessage,
 )
 from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph.state import CompiledStateGraph
+from langgraph.types import StreamMode
 
+from .budget import RequestBudget, start_request_budget
+from .constants import (
+    AGENT_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_ENABLED,
+    SINGLETON,
+    STREAM_COALESCE_SECONDS,
+)
 from .graph import create_graph, prepare_system_prompt
 from .location import OregonCity, UsaState
+from .response_cache import (
+    RESPONSE_CACHE,
+    ResponseCacheKey,
+    first_turn_query,
+    make_response_key,
+)
+
+# (city, state, system prompt digest, id of the checkpointer or None)
+AgentCacheKey = tuple[Optional[OregonCity], UsaState, str, Optional[int]]
+
+
+class CompiledAgentCache:
+    """Bounded, thread-safe LRU cache of compiled agent graphs.
+
+    Flask builds a new ChatView (and so a new LangChainChatManager) per
+    request, but there are only a few distinct jurisdictions. Compiled graphs
+    hold no per-conversation state when built without a checkpointer, so one
+    graph per (city, state, system prompt hash) is shared across requests and
+    threads.
+    """
+
+    def __init__(self, max_size: int = AGENT_CACHE_MAX_SIZE) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[AgentCacheKey, CompiledStateGraph] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def key_for(
+        city: Optional[OregonCity],
+        state: UsaState,
+        system_prompt: SystemMessage,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+    ) -> AgentCacheKey:
+        """Build a cache key; the prompt hash keeps edited prompts from colliding.
+
+        Session graphs are also keyed on their checkpointer, since the Flask
+        and ASGI apps persist sessions through different savers. The cached
+        graph holds a reference to it, so its id is not reused while cached.
+        """
+        digest = hashlib.sha256(system_prompt.text.encode("utf-8")).hexdigest()
+        return (city, state, digest, None if checkpointer is None else id(checkpointer))
+
+    def get_or_create(
+        self, key: AgentCacheKey, factory: Callable[[], CompiledStateGraph]
+    ) -> CompiledStateGraph:
+        """Return the cached graph for `key`, compiling it with `factory` on a miss."""
+        with self._lock:
+            agent = self._entries.get(key)
+            if agent is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return agent
+            self.misses += 1
+
+        # Compile outside the lock so a miss for one jurisdiction does not block
+        # hits for the others. Concurrent misses for the same key may both
+        # compile; the first one stored wins.
+        agent = factory()
+
+        with self._lock:
+            agent = self._entries.setdefault(key, agent)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return agent
+
+    def clear(self) -> None:
+        """Drop all cached graphs and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+AGENT_CACHE: Final = CompiledAgentCache()
+# Graphs compiled with a checkpointer for server-side sessions are kept apart
+# so stateless requests never resume (or write) checkpointed state.
+SESSION_AGENT_CACHE: Final = CompiledAgentCache()
+
+
+class DeltaCoalescer:
+    """Merge token-level text/reasoning deltas from stream_mode="messages".
+
+    The first delta is emitted immediately; later deltas are buffered until
+    `window_seconds` have passed since the previous emit, the block type
+    changes, or flush() is called. Each model message after the first that
+    produced text starts with a blank line, so a client that concatenates
+    consecutive text chunks keeps separate model turns apart.
+    """
+
+    def __init__(self, window_seconds: float = STREAM_COALESCE_SECONDS) -> None:
+        self.window_seconds = window_seconds
+        # True once a delta has been buffered for the current model message;
+        # the whole-message "updates" copy must then not be sent again.
+        self.streamed = False
+        self._kind: Optional[str] = None
+        self._parts: List[str] = []
+        self._last_emit = float("-inf")
+        self._text_message_id: Optional[str] = None
+
+    def add(self, message: AIMessageChunk) -> List[ContentBlock]:
+        """Buffer the deltas in `message`; return any blocks ready to send."""
+        ready: List[ContentBlock] = []
+        for b in message.content_blocks:
+            match b["type"]:
+                case "text":
+                    delta = b["text"]
+                case "reasoning":
+                    delta = b.get("reasoning", "")
+                case _:
+                    continue
+            if not delta:
+                continue
+
+            if b["type"] == "text":
+                if self._text_message_id not in (None, message.id):
+                    delta = "\n\n" + delta
+                self._text_message_id = message.id
+            if b["type"] != self._kind:
+                ready.extend(self.flush())
+                self._kind = b["type"]
+
+            self._parts.append(delta)
+            self.streamed = True
+            if time.monotonic() - self._last_emit >= self.window_seconds:
+                ready.extend(self.flush())
+        return ready
+
+    def flush(self) -> List[ContentBlock]:
+        """Return the buffered deltas as one block (or nothing if empty)."""
+        if not self._parts:
+            return []
+        merged = "".join(self._parts)
+        self._parts = []
+        self._last_emit = time.monotonic()
+        if self._kind == "text":
+            return [TextContentBlock(type="text", text=merged)]
+        return [ReasoningContentBlock(type="reasoning", reasoning=merged)]
 
 
 class LangChainChatManager:
@@ -33,10 +205,16 @@ class LangChainChatManager:
     logger: logging.Logger
     agent: Optional[CompiledStateGraph] = None
 
-    def __init__(self) -> None:
-        """Initialize the LangChain chat manager."""
+    def __init__(self, checkpointer: Optional[BaseCheckpointSaver] = None) -> None:
+        """Initialize the LangChain chat manager.
+
+        Args:
+            checkpointer: When set, the agent persists conversation state per
+                thread_id so callers only need to send new messages.
+        """
 
         self.logger = logging.getLogger(__name__)
+        self.checkpointer = checkpointer
 
         # Defer agent instantiation until 'generate_stream_response'.
         self.agent = None
@@ -55,11 +233,22 @@ class LangChainChatManager:
             AgentExecutor configured with tools and system prompt
         """
 
-        self.system_prompt = prepare_system_prompt(city, state)
+        system_prompt = prepare_system_prompt(city, state)
+        self.system_prompt = system_prompt
 
-        return create_graph(
-            system_prompt=self.system_prompt,
+        cache = AGENT_CACHE if self.checkpointer is None else SESSION_AGENT_CACHE
+        agent = cache.get_or_create(
+            cache.key_for(city, state, system_prompt, self.checkpointer),
+            lambda: create_graph(
+                system_prompt=system_prompt, checkpointer=self.checkpointer
+            ),
         )
+        self.logger.debug("Agent cache hits=%d misses=%d", cache.hits, cache.misses)
+        return agent
+
+    def prepare_agent(self, city: Optional[OregonCity], state: UsaState) -> None:
+        """Compile the agent for a jurisdiction before its first request."""
+        self.__create_agent_for_session(city, state, None)
 
     # TODO
     def generate_response(
@@ -83,6 +272,7 @@ class LangChainChatManager:
         city: Optional[OregonCity],
         state: UsaState,
         thread_id: Optional[str],
+        stream_deltas: bool = False,
     ) -> Generator[ContentBlock, Any, None]:
         """Generate streaming response using LangChain agent.
 
@@ -92,43 +282,193 @@ class LangChainChatManager:
                       'function', 'tool', 'system', or 'developer'.
             city: User's city
             state: User's state
+            stream_deltas: Yield text and reasoning as coalesced token-level
+                      deltas (see DeltaCoalescer) instead of one block per
+                      completed model message.
 
         Yields:
             Response chunks as they are generated
         """
 
+        cache_key = self.__response_cache_key(
+            messages, city, state, thread_id, stream_deltas
+        )
+        if cache_key is not None:
+            cached = RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                self.logger.debug("Replaying cached response (%d blocks)", len(cached))
+                yield from cached
+                return
+        recorded: List[ContentBlock] = []
+
         if self.agent is None:
             self.agent = self.__create_agent_for_session(city, state, thread_id)
-
-        if thread_id is not None:
-            config: RunnableConfig = RunnableConfig(
-                configurable={"thread_id": thread_id}
-            )
-        else:
-            config = RunnableConfig()
+        config = self.__run_config(thread_id)
+        # Retries share one budget, so they cannot extend the request.
+        budget = start_request_budget()
 
         # Snapshot so retries start from a clean message state.
         messages_at_start = list(messages)
 
-        for attempt in range(self._MAX_STREAM_RETRIES + 1):
-            if attempt > 0:
-                messages.clear()
-                messages.extend(messages_at_start)
-                self.logger.warning(
-                    "Retrying stream after connection reset "
-                    f"(attempt {attempt + 1}/{self._MAX_STREAM_RETRIES + 1})"
-                )
-                time.sleep(self._RETRY_DELAY_SECONDS)
-            try:
-                yielded_any = False
-                for chunk in self.__stream_once(messages, city, state, config):
-                    yielded_any = True
-                    yield chunk
+        try:
+            for attempt in range(self._MAX_STREAM_RETRIES + 1):
+                if attempt > 0:
+                    messages.clear()
+                    messages.extend(messages_at_start)
+                    self.__log_retry(attempt)
+                    time.sleep(self._RETRY_DELAY_SECONDS)
+                try:
+                    yielded_any = False
+                    for chunk in self.__stream_once(
+                        messages, city, state, config, stream_deltas
+                    ):
+                        yielded_any = True
+                        recorded.append(chunk)
+                        yield chunk
+                    self.__cache_response(cache_key, recorded, budget)
+                    return
+                except (httpcore.ReadError, httpx.ReadError, ConnectionError):
+                    # Don't retry after partial output — the client would receive duplicates.
+                    if not self.__may_retry(attempt, yielded_any, budget):
+                        raise
+        finally:
+            self.__log_budget(budget)
+
+    async def agenerate_streaming_response(
+        self,
+        messages: List[AnyMessage | Dict[str, Any]],
+        city: Optional[OregonCity],
+        state: UsaState,
+        thread_id: Optional[str],
+        stream_deltas: bool = False,
+    ) -> AsyncGenerator[ContentBlock, None]:
+        """Async counterpart of generate_streaming_response built on agent.astream.
+
+        Lets an ASGI server multiplex many concurrent streams on one worker
+        instead of holding an OS thread per conversation.
+        """
+
+        cache_key = self.__response_cache_key(
+            messages, city, state, thread_id, stream_deltas
+        )
+        if cache_key is not None:
+            cached = RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                self.logger.debug("Replaying cached response (%d blocks)", len(cached))
+                for block in cached:
+                    yield block
                 return
-            except (httpcore.ReadError, httpx.ReadError, ConnectionError):
-                # Don't retry after partial output — the client would receive duplicates.
-                if attempt >= self._MAX_STREAM_RETRIES or yielded_any:
-                    raise
+        recorded: List[ContentBlock] = []
+
+        if self.agent is None:
+            self.agent = self.__create_agent_for_session(city, state, thread_id)
+        config = self.__run_config(thread_id)
+        # Retries share one budget, so they cannot extend the request.
+        budget = start_request_budget()
+
+        # Snapshot so retries start from a clean message state.
+        messages_at_start = list(messages)
+
+        try:
+            for attempt in range(self._MAX_STREAM_RETRIES + 1):
+                if attempt > 0:
+                    messages.clear()
+                    messages.extend(messages_at_start)
+                    self.__log_retry(attempt)
+                    await asyncio.sleep(self._RETRY_DELAY_SECONDS)
+                try:
+                    yielded_any = False
+                    async for chunk in self.__astream_once(
+                        messages, city, state, config, stream_deltas
+                    ):
+                        yielded_any = True
+                        recorded.append(chunk)
+                        yield chunk
+                    self.__cache_response(cache_key, recorded, budget)
+                    return
+                except (httpcore.ReadError, httpx.ReadError, ConnectionError):
+                    # Don't retry after partial output — the client would receive duplicates.
+                    if not self.__may_retry(attempt, yielded_any, budget):
+                        raise
+        finally:
+            self.__log_budget(budget)
+
+    @staticmethod
+    def __response_cache_key(
+        messages: List[AnyMessage | Dict[str, Any]],
+        city: Optional[OregonCity],
+        state: UsaState,
+        thread_id: Optional[str],
+        stream_deltas: bool,
+    ) -> Optional[ResponseCacheKey]:
+        """Key for RESPONSE_CACHE, or None if this request must run the agent.
+
+        Delta-mode answers are cached apart: replayed to a default client,
+        each token-sized block would render as its own paragraph.
+        """
+        # Session turns must go through the graph so the checkpointer records them.
+        if not RESPONSE_CACHE_ENABLED or thread_id is not None:
+            return None
+        query = first_turn_query(messages)
+        if query is None:
+            return None
+        return make_response_key(
+            query,
+            city,
+            state,
+            SINGLETON.MODEL_NAME,
+            prepare_system_prompt(city, state),
+            SINGLETON.VERTEX_AI_DATASTORES.values(),
+            stream_deltas,
+        )
+
+    def __cache_response(
+        self,
+        cache_key: Optional[ResponseCacheKey],
+        recorded: List[ContentBlock],
+        budget: Optional[RequestBudget],
+    ) -> None:
+        if cache_key is None:
+            return
+        # An answer cut short by the budget must not be replayed as complete.
+        if budget is not None and budget.exhausted_by is not None:
+            self.logger.debug(
+                "Not caching response cut short by %s", budget.exhausted_by
+            )
+            return
+        RESPONSE_CACHE.put(cache_key, recorded)
+
+    @staticmethod
+    def __run_config(thread_id: Optional[str]) -> RunnableConfig:
+        if thread_id is not None:
+            return RunnableConfig(configurable={"thread_id": thread_id})
+        return RunnableConfig()
+
+    def __may_retry(
+        self, attempt: int, yielded_any: bool, budget: Optional[RequestBudget]
+    ) -> bool:
+        if attempt >= self._MAX_STREAM_RETRIES or yielded_any:
+            return False
+        # A retry that would start after the deadline cannot answer in time.
+        return budget is None or budget.remaining_seconds() > self._RETRY_DELAY_SECONDS
+
+    def __log_budget(self, budget: Optional[RequestBudget]) -> None:
+        if budget is not None:
+            self.logger.info("Request budget: %s", budget.summary())
+
+    def __log_retry(self, attempt: int) -> None:
+        self.logger.warning(
+            "Retrying stream after connection reset "
+            f"(attempt {attempt + 1}/{self._MAX_STREAM_RETRIES + 1})"
+        )
+
+    @staticmethod
+    def __stream_modes(stream_deltas: bool) -> List[StreamMode]:
+        return (
+            ["messages", "updates", "custom"]
+            if stream_deltas
+            else ["updates", "custom"]
+        )
 
     def __stream_once(
         self,
@@ -136,8 +476,10 @@ class LangChainChatManager:
         city: Optional[OregonCity],
         state: UsaState,
         config: RunnableConfig,
+        stream_deltas: bool,
     ) -> Generator[ContentBlock, Any, None]:
         assert self.agent is not None
+        coalescer = DeltaCoalescer(STREAM_COALESCE_SECONDS) if stream_deltas else None
         # Stream the agent response.
         for mode, chunk in self.agent.stream(
             input={
@@ -145,61 +487,121 @@ class LangChainChatManager:
                 "city": city,
                 "state": state,
             },
-            stream_mode=["updates", "custom"],
+            stream_mode=self.__stream_modes(stream_deltas),
             config=config,
         ):
-            # Custom chunks are emitted directly by tools (e.g. generate_letter).
-            if mode == "custom":
-                self.logger.debug(
-                    f"Received custom chunk from tool: {cast(Dict[str, Any], chunk).get('type')}"
-                )
-                yield NonStandardContentBlock(
-                    type="non_standard", value=cast(Dict[str, Any], chunk)
-                )
-                continue
+            yield from self.__blocks_from_stream_part(mode, chunk, messages, coalescer)
+        if coalescer is not None:
+            yield from coalescer.flush()
 
-            # outer dict key changes with internal messages (Model, Tool, ...)
-            chunk = cast(Dict[str, Any], chunk)
-            if not chunk:
-                continue
-            chunk_k = next(iter(chunk))
-
-            # TODO: refactor this match/yield into a function
-            # Specialize handling/printing based on each message class/type
-            for m in chunk[chunk_k]["messages"]:
-                # Extend caller's list so tool messages are included in the agent's running context.
-                messages.append(m)
-
-                match m:
-                    # Messages sent by the Model
-                    case AIMessage():
-                        for b in m.content_blocks:
-                            match b["type"]:
-                                # text responses from the Model
-                                case "text":
-                                    self.logger.debug(b)
+    async def __astream_once(
+        self,
+        messages: List[AnyMessage | Dict[str, Any]],
+        city: Optional[OregonCity],
+        state: UsaState,
+        config: RunnableConfig,
+        stream_deltas: bool,
+    ) -> AsyncGenerator[ContentBlock, None]:
+        assert self.agent is not None
+        coalescer = DeltaCoalescer(STREAM_COALESCE_SECONDS) if stream_deltas else None
+        async for mode, chunk in self.agent.astream(
+            input={
+                "messages": messages,
+                "city": city,
+                "state": state,
+            },
+            stream_mode=self.__stream_modes(stream_deltas),
+            config=config,
+        ):
+            for block in self.__blocks_from_stream_part(
+                mode, chunk, messages, coalescer
+            ):
+                yield block
+        if coalescer is not None:
+            for block in coalescer.flush():
+                yield block
+
+    def __blocks_from_stream_part(
+        self,
+        mode: str,
+        chunk: Any,
+        messages: List[AnyMessage | Dict[str, Any]],
+        coalescer: Optional[DeltaCoalescer] = None,
+    ) -> Generator[ContentBlock, Any, None]:
+        """Turn one (mode, chunk) pair from agent.stream/astream into content blocks."""
+        # Token deltas from the model node; tool messages also arrive in this
+        # mode but are handled from "updates" below.
+        if mode == "messages":
+            message, metadata = chunk
+            if (
+                coalescer is not None
+                and isinstance(message, AIMessageChunk)
+                and metadata.get("langgraph_node") == "model"
+            ):
+                yield from coalescer.add(message)
+            return
+
+        # Keep buffered deltas ahead of tool output and whole-message updates.
+        if coalescer is not None:
+            yield from coalescer.flush()
+
+        # Custom chunks are emitted directly by tools (e.g. generate_letter).
+        if mode == "custom":
+            self.logger.debug(
+                f"Received custom chunk from tool: {cast(Dict[str, Any], chunk).get('type')}"
+            )
+            yield NonStandardContentBlock(
+                type="non_standard", value=cast(Dict[str, Any], chunk)
+            )
+            return
+
+        # outer dict key changes with internal messages (Model, Tool, ...)
+        chunk = cast(Dict[str, Any], chunk)
+        if not chunk:
+            return
+        chunk_k = next(iter(chunk))
+
+        # Specialize handling/printing based on each message class/type
+        for m in chunk[chunk_k]["messages"]:
+            # Extend caller's list so tool messages are included in the agent's running context.
+            messages.append(m)
+
+            match m:
+                # Messages sent by the Model
+                case AIMessage():
+                    # Text already sent as deltas is only logged here.
+                    already_streamed = False
+                    if coalescer is not None and coalescer.streamed:
+                        already_streamed, coalescer.streamed = True, False
+                    for b in m.content_blocks:
+                        match b["type"]:
+                            # text responses from the Model
+                            case "text":
+                                self.logger.debug(b)
+                                if not already_streamed:
                                     yield b
-                                # reasoning steps (aka "thoughts") from the Model
-                                case "reasoning":
-                                    if "reasoning" in b:
-                                        self.logger.debug(b)
+                            # reasoning steps (aka "thoughts") from the Model
+                            case "reasoning":
+                                if "reasoning" in b:
+                                    self.logger.debug(b)
+                                    if not already_streamed:
                                         yield b
-                                case "tool_call":
-                                    self.logger.info(b)
-                                case "server_tool_call":
-                                    self.logger.info(b)
-
-                    # Messages sent back by a tool
-                    case ToolMessage():
-                        for b in m.content_blocks:
-                            match b["type"]:
-                                case "text":
-                                    self.logger.info(b["text"])
-                                case "invalid_tool_call":
-                                    self.logger.error(b)
-                                case _:
-                                    self.logger.debug(f"ToolMessage: {m}")
-
-                    # Fall-through case
-                    case _:
-                        self.logger.debug(f"{type(m)}: {m}")
+                            case "tool_call":
+                                self.logger.info(b)
+                            case "server_tool_call":
+                                self.logger.info(b)
+
+                # Messages sent back by a tool
+                case ToolMessage():
+                    for b in m.content_blocks:
+                        match b["type"]:
+                            case "text":
+                                self.logger.info(b["text"])
+                            case "invalid_tool_call":
+                                self.logger.error(b)
+                            case _:
+                                self.logger.debug(f"ToolMessage: {m}")
+
+                # Fall-through case
+                case _:
+                    self.logger.debug(f"{type(m)}: {m}")
@@ -2,35 +2,60 @@
 This module defines Tools for an Agent to call
 """
 
+import contextvars
+import json
 import logging
-from typing import Callable, Optional, Type, cast
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import TYPE_CHECKING, Callable, Final, Optional, Type, cast
 
 import httpx
-from google.api_core import exceptions as google_exceptions
 from google.oauth2 import service_account
 from google.oauth2.credentials import Credentials
 from langchain_core.tools import BaseTool, tool
-from langchain_google_community import VertexAISearchRetriever
 from langgraph.config import get_stream_writer
 from pydantic import BaseModel, Field
 from tenacity import (
+    RetryCallState,
     retry,
-    retry_if_exception_type,
+    retry_if_exception,
     stop_after_attempt,
+    stop_any,
     wait_exponential,
 )
+from tenacity.stop import stop_base
 
+from .budget import past_request_deadline
 from .constants import (
     LETTER_TEMPLATE,
+    LOCAL_RETRIEVAL_FALLBACK_SECONDS,
+    LOCAL_RETRIEVAL_MODE,
+    PROGRESSIVE_RETRIEVAL_ENABLED,
+    RAG_FAN_OUT_MAX_WORKERS,
+    RAG_FAN_OUT_TIMEOUT_SECONDS,
+    RAG_PROGRESSIVE_PAGE_SIZE,
+    RETRIEVER_POOL_IDLE_SECONDS,
+    RETRIEVER_POOL_MAX_SIZE,
     SINGLETON,
     DatastoreKey,
 )
 from .google_auth import load_gcp_credentials
+from .local_retrieval import search_local_laws
 from .location import OregonCity, UsaState
+from .metrics import timed_fn
+from .ors_sections import lookup_sections
+from .retrieval_cache import RETRIEVAL_CACHE, make_cache_key
+
+if TYPE_CHECKING:
+    from langchain_google_community import VertexAISearchRetriever
 
 logger = logging.getLogger(__name__)
 
 
+@timed_fn("repair_mojibake")
 def repair_mojibake(text: str) -> str:
     """Attempt to repair UTF-8 text that was incorrectly decoded as Latin-1.
 
@@ -66,14 +91,163 @@ def repair_mojibake(text: str) -> str:
     return repaired
 
 
+def _new_retriever(**kwargs: object) -> "VertexAISearchRetriever":
+    # langchain_google_community and the Discovery Engine client are imported
+    # on the first RAG call rather than with the app.
+    from langchain_google_community import VertexAISearchRetriever
+
+    return VertexAISearchRetriever(**kwargs)
+
+
+class RetrieverPool:
+    """Process-wide pool of long-lived VertexAISearchRetriever instances.
+
+    Building a retriever re-reads the credentials and opens a new Discovery
+    Engine gRPC channel, so doing it on every tool call adds file I/O and TLS
+    setup to each RAG search. The pool loads credentials once and keeps one
+    retriever per datastore ID; callers receive a shallow copy carrying their
+    per-call request parameters (filter, max_documents), which shares the
+    pooled client and channel.
+
+    Thread-safe: gunicorn threads may acquire concurrently.
+    """
+
+    def __init__(
+        self,
+        max_size: int = RETRIEVER_POOL_MAX_SIZE,
+        idle_seconds: float = RETRIEVER_POOL_IDLE_SECONDS,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._credentials: Optional[Credentials | service_account.Credentials] = None
+        # datastore ID -> (retriever, monotonic time of last use), in LRU order.
+        self._entries: OrderedDict[str, tuple["VertexAISearchRetriever", float]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _get_credentials(self) -> Credentials | service_account.Credentials:
+        # Caller holds self._lock.
+        if self._credentials is None:
+            if SINGLETON.GOOGLE_APPLICATION_CREDENTIALS is None:
+                raise ValueError("GOOGLE_APPLICATION_CREDENTIALS is not set")
+            self._credentials = load_gcp_credentials(
+                SINGLETON.GOOGLE_APPLICATION_CREDENTIALS
+            )
+        return self._credentials
+
+    def _evict_idle(self, now: float) -> None:
+        # Caller holds self._lock. Evicted retrievers are not closed explicitly:
+        # a concurrent search may still hold a copy sharing the same channel, so
+        # the channel is left for garbage collection to release.
+        for data_store_id in [
+            k
+            for k, (_, last_used) in self._entries.items()
+            if now - last_used > self.idle_seconds
+        ]:
+            logger.debug("Evicting idle retriever for datastore %s", data_store_id)
+            del self._entries[data_store_id]
+
+    def acquire(
+        self,
+        data_store_id: str,
+        *,
+        name: Optional[str] = "tfa-retriever",
+        filter: Optional[str] = None,
+        max_documents: int = 3,
+    ) -> "VertexAISearchRetriever":
+        """Return a retriever for `data_store_id` with per-call parameters applied."""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(data_store_id)
+            if entry is None:
+                base = _new_retriever(
+                    beta=True,  # required for this implementation
+                    credentials=self._get_credentials(),
+                    project_id=SINGLETON.GOOGLE_CLOUD_PROJECT,
+                    location_id=SINGLETON.GOOGLE_CLOUD_LOCATION,
+                    data_store_id=data_store_id,
+                    engine_data_type=0,  # 0 = unstructured; all TFA datastores are unstructured docs
+                    get_extractive_answers=True,  # TODO: figure out if this is useful
+                    # Suggestion-only: spell corrections are recorded in the response but the
+                    # original query is used for retrieval. Prevents auto-correction from
+                    # mangling ORS references and other legal terminology.
+                    spell_correction_mode=1,
+                )
+                while len(self._entries) >= self.max_size:
+                    evicted, _ = self._entries.popitem(last=False)
+                    logger.debug("Evicting LRU retriever for datastore %s", evicted)
+            else:
+                base = entry[0]
+            self._entries[data_store_id] = (base, now)
+            self._entries.move_to_end(data_store_id)
+
+        # model_copy does not re-run __init__, so the copy shares the pooled
+        # SearchServiceClient; only the request parameters differ.
+        return base.model_copy(
+            update={"name": name, "filter": filter, "max_documents": max_documents}
+        )
+
+    def clear(self) -> None:
+        """Drop all pooled retrievers and cached credentials."""
+        with self._lock:
+            self._entries.clear()
+            self._credentials = None
+
+
+RETRIEVER_POOL: Final = RetrieverPool()
+
+
+class _StopPastRequestDeadline(stop_base):
+    """Stop retrying once the request's budget deadline has passed (budget.py)."""
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        return past_request_deadline()
+
+
+def _is_transient_search_error(e: BaseException) -> bool:
+    # google.api_core is already loaded by the time a search has raised.
+    from google.api_core.exceptions import ServiceUnavailable
+
+    return isinstance(e, (httpx.ReadError, ServiceUnavailable))
+
+
+def _is_search_unavailable(e: BaseException) -> bool:
+    """True for errors the local index may answer for: timeouts and outages.
+
+    Anything else (bad credentials, an invalid filter, a bug) is re-raised
+    rather than hidden behind local results.
+    """
+    from google.api_core import exceptions as google_exceptions
+
+    return isinstance(
+        e,
+        (
+            TimeoutError,
+            ConnectionError,
+            httpx.TransportError,
+            google_exceptions.RetryError,
+            google_exceptions.ServerError,
+            google_exceptions.TooManyRequests,
+        ),
+    )
+
+
 class RagBuilder:
     """
     Helper class to construct a Rag tool from VertexAISearchRetriever
-    The helper class handles creds, project, location, datastore, etc.
+    The helper class handles project, location, datastore, etc.; credentials
+    and the underlying client come from the shared RETRIEVER_POOL.
     """
 
-    __credentials: Credentials | service_account.Credentials
-    rag: VertexAISearchRetriever
+    rag: "VertexAISearchRetriever"
 
     def __init__(
         self,
@@ -82,35 +256,17 @@ class RagBuilder:
         filter: Optional[str] = None,
         max_documents: int = 3,
     ) -> None:
-        if SINGLETON.GOOGLE_APPLICATION_CREDENTIALS is None:
-            raise ValueError("GOOGLE_APPLICATION_CREDENTIALS is not set")
-
-        self.__credentials = load_gcp_credentials(
-            SINGLETON.GOOGLE_APPLICATION_CREDENTIALS
-        )
-
-        self.rag = VertexAISearchRetriever(
-            beta=True,  # required for this implementation
-            credentials=self.__credentials,
-            project_id=SINGLETON.GOOGLE_CLOUD_PROJECT,
-            location_id=SINGLETON.GOOGLE_CLOUD_LOCATION,
-            data_store_id=data_store_id,
-            engine_data_type=0,  # 0 = unstructured; all TFA datastores are unstructured docs
-            get_extractive_answers=True,  # TODO: figure out if this is useful
-            # Suggestion-only: spell corrections are recorded in the response but the
-            # original query is used for retrieval. Prevents auto-correction from
-            # mangling ORS references and other legal terminology.
-            spell_correction_mode=1,
+        self.rag = RETRIEVER_POOL.acquire(
+            data_store_id,
             name=name,
-            max_documents=max_documents,
             filter=filter,
+            max_documents=max_documents,
         )
 
+    @timed_fn("rag_search")
     @retry(
-        retry=retry_if_exception_type(
-            (httpx.ReadError, google_exceptions.ServiceUnavailable)
-        ),
-        stop=stop_after_attempt(3),
+        retry=retry_if_exception(_is_transient_search_error),
+        stop=stop_any(stop_after_attempt(3), _StopPastRequestDeadline()),
         wait=wait_exponential(multiplier=0.5, max=4),
         reraise=True,
         before_sleep=lambda rs: logger.warning(
@@ -119,12 +275,16 @@ class RagBuilder:
             rs.outcome.exception() if rs.outcome else None,
         ),
     )
-    def search(self, query: str) -> str:
+    def search_passages(self, query: str) -> list[str]:
+        """Return each retrieved passage separately (mojibake repaired)."""
         docs = self.rag.invoke(
             input=query,
         )
 
-        return "\n".join([repair_mojibake(doc.page_content) for doc in docs])
+        return [repair_mojibake(doc.page_content) for doc in docs]
+
+    def search(self, query: str) -> str:
+        return "\n".join(self.search_passages(query))
 
 
 def filter_builder(state: UsaState, city: Optional[OregonCity] = None) -> str:
@@ -182,6 +342,42 @@ def generate_letter(letter: str) -> str:
     return "Letter generated successfully."
 
 
+class OrsSectionLookupInputSchema(BaseModel):
+    citations: str = Field(
+        description="""One or more ORS section numbers or ranges, e.g. 'ORS 90.394',
+                       '90.155, 90.160' or 'ORS 90.453 to 90.459'. Subsection
+                       references such as '(3)(a)' are ignored; the whole section
+                       is returned."""
+    )
+
+
+@tool(args_schema=OrsSectionLookupInputSchema)
+def lookup_ors_section(citations: str) -> str:
+    """Return the full text of specific ORS chapter 90 sections by number.
+
+    Use this instead of a search when you already know which sections you
+    need, e.g. to quote or verify a subsection before citing it. Long
+    ranges are truncated to their first sections. Sections outside the bundled
+    statutes are reported as not found; use retrieve_city_state_laws for those
+    and for any question where the section is not yet known.
+
+    Args:
+        citations: ORS section numbers or ranges.
+
+    Returns:
+        Each section's number and text, or a not-found note.
+    """
+    resolved = lookup_sections(citations)
+    if not resolved:
+        return "No ORS section numbers found in the request."
+    return "\n\n".join(
+        f"ORS {number} {text}"
+        if text is not None
+        else f"ORS {number}: not found in the bundled statutes."
+        for number, text in resolved
+    )
+
+
 class QueryOnlyInputSchema(BaseModel):
     query: str
     max_documents: int = Field(
@@ -191,7 +387,9 @@ class QueryOnlyInputSchema(BaseModel):
         description="""Number of passages to retrieve (1–8). Use a smaller value
                        (3–5) for focused questions. Use a larger value (6–8) when
                        the question spans multiple topics or an initial retrieval
-                       missed the relevant passage.""",
+                       missed the relevant passage. Repeating a query with a
+                       larger value is answered from the earlier search without
+                       searching again.""",
     )
 
 
@@ -224,7 +422,9 @@ class CityStateLawsInputSchema(BaseModel):
                        (3–5) for focused questions with a clear statutory target.
                        Use a larger value (6–8) when the question spans multiple
                        statutes, involves city overrides, or an initial retrieval
-                       missed the relevant passage.""",
+                       missed the relevant passage. Repeating the same query with a
+                       larger value is answered from the earlier search without
+                       searching again, so widen a search before rephrasing it.""",
     )
     max_extractive_answer_count: int = Field(
         default=1,
@@ -260,6 +460,71 @@ def _default_filter_from_city_state(**kwargs: object) -> str:
     )
 
 
+def _local_laws_from_city_state(**kwargs: object) -> Optional[list[str]]:
+    """Adapter that searches the bundled statute index with the tool kwargs."""
+    city = cast(Optional[OregonCity], kwargs.get("city"))
+    return search_local_laws(
+        query=cast(str, kwargs["query"]),
+        state=cast(UsaState, kwargs["state"]),
+        city=city,
+        max_documents=cast(int, kwargs["max_documents"]),
+    )
+
+
+# Vertex AI Search calls that may fall back to the local index run here so the
+# caller can stop waiting on them; separate from the fan-out pool, whose
+# workers submit to it.
+_remote_search_executor = ThreadPoolExecutor(
+    max_workers=RAG_FAN_OUT_MAX_WORKERS, thread_name_prefix="rag-remote"
+)
+
+
+def _search_with_local_fallback(
+    tool_name: str,
+    remote: Callable[[], list[str]],
+    local: Callable[[], Optional[list[str]]],
+) -> tuple[list[str], bool]:
+    """Run `remote`, answering from `local` if it is unavailable or too slow.
+
+    Returns the passages and whether they came from `remote`. Only timeouts
+    and transient errors (see _is_search_unavailable) fall back; if the local
+    index is unavailable, a remote error is re-raised and a slow remote search
+    is waited on after all.
+    """
+    # Context.run's result type does not survive submit(); restore it.
+    future = cast(
+        "Future[list[str]]",
+        _remote_search_executor.submit(contextvars.copy_context().run, remote),
+    )
+    try:
+        return future.result(timeout=LOCAL_RETRIEVAL_FALLBACK_SECONDS), True
+    except FuturesTimeoutError:
+        logger.warning(
+            "%s: Vertex AI Search did not answer within %.1fs, using local index",
+            tool_name,
+            LOCAL_RETRIEVAL_FALLBACK_SECONDS,
+        )
+        passages = local()
+        if passages is None:
+            return future.result(), True
+        return passages, False
+    except Exception as e:
+        if not _is_search_unavailable(e):
+            raise
+        logger.warning(
+            "%s: Vertex AI Search failed (%s), using local index", tool_name, e
+        )
+        passages = local()
+        if passages is None:
+            raise
+        return passages, False
+
+
+# Tool name -> passage-level search used by the tool. The fan-out tool calls
+# these directly so it can dedupe passages across datastores.
+_RAG_PASSAGE_SEARCHERS: dict[str, Callable[..., list[str]]] = {}
+
+
 def _make_rag_tool(
     datastore_key: DatastoreKey,
     tool_name: str,
@@ -267,8 +532,78 @@ def _make_rag_tool(
     *,
     args_schema: Type[BaseModel],
     filter_builder: Optional[Callable[..., str]] = None,
+    local_search: Optional[Callable[..., Optional[list[str]]]] = None,
 ) -> BaseTool:
-    """Factory that creates a RAG retrieval tool bound to a specific datastore."""
+    """Factory that creates a RAG retrieval tool bound to a specific datastore.
+
+    With `local_search`, LOCAL_RETRIEVAL_MODE decides whether the bundled
+    local index answers instead of ("primary") or when Vertex AI Search
+    fails or is slow ("fallback"). It returns None when no index is bundled.
+
+    With PROGRESSIVE_RETRIEVAL_ENABLED, Vertex AI Search is always asked for
+    RAG_PROGRESSIVE_PAGE_SIZE passages and the whole ranked page is cached;
+    the tool returns its top max_documents. Retrying a query with a larger
+    max_documents then costs no second search.
+    """
+
+    def _search(**kwargs: object) -> list[str]:
+        # Strip non-schema kwargs injected by LangChain (e.g. runtime) and
+        # validate to populate Field defaults for any omitted optional fields.
+        schema_data = {k: v for k, v in kwargs.items() if k in args_schema.model_fields}
+        validated = args_schema.model_validate(schema_data).model_dump()
+        if local_search is not None and LOCAL_RETRIEVAL_MODE == "primary":
+            local_passages = local_search(**validated)
+            if local_passages is not None:
+                return local_passages
+
+        rag_filter = filter_builder(**validated) if filter_builder is not None else None
+        data_store_id = SINGLETON.VERTEX_AI_DATASTORES[datastore_key]
+
+        top_k = validated["max_documents"]
+        page_size = (
+            max(top_k, RAG_PROGRESSIVE_PAGE_SIZE)
+            if PROGRESSIVE_RETRIEVAL_ENABLED
+            else top_k
+        )
+
+        # Key on everything except the raw query (normalized inside the key)
+        # so city/state and extraction parameters are part of the identity.
+        # The page requested stands in for max_documents: one cached page
+        # serves every smaller top-k.
+        cache_key = make_cache_key(
+            data_store_id,
+            validated["query"],
+            rag_filter,
+            {
+                **{k: v for k, v in validated.items() if k != "query"},
+                "max_documents": page_size,
+            },
+        )
+        cached = RETRIEVAL_CACHE.get(cache_key)
+        if cached is not None:
+            logger.debug("Retrieval cache hit for %s", tool_name)
+            return json.loads(cached)[:top_k]
+
+        def _remote() -> list[str]:
+            helper = RagBuilder(
+                data_store_id=data_store_id,
+                name=tool_name,
+                filter=rag_filter,
+                max_documents=page_size,
+            )
+            return helper.search_passages(query=validated["query"])
+
+        if local_search is None or LOCAL_RETRIEVAL_MODE == "off":
+            passages, from_remote = _remote(), True
+        else:
+            passages, from_remote = _search_with_local_fallback(
+                tool_name, _remote, lambda: local_search(**validated)
+            )
+        # Empty results are not cached so a freshly ingested corpus is picked
+        # up; neither are fallback results, so Vertex AI Search is retried.
+        if passages and from_remote:
+            RETRIEVAL_CACHE.put(cache_key, data_store_id, json.dumps(passages))
+        return passages[:top_k]
 
     @tool(
         tool_name,
@@ -277,19 +612,9 @@ def _make_rag_tool(
         response_format="content",
     )
     def _retrieve(**kwargs: object) -> str:
-        # Strip non-schema kwargs injected by LangChain (e.g. runtime) and
-        # validate to populate Field defaults for any omitted optional fields.
-        schema_data = {k: v for k, v in kwargs.items() if k in args_schema.model_fields}
-        validated = args_schema.model_validate(schema_data).model_dump()
-        rag_filter = filter_builder(**validated) if filter_builder is not None else None
-        helper = RagBuilder(
-            data_store_id=SINGLETON.VERTEX_AI_DATASTORES[datastore_key],
-            name=tool_name,
-            filter=rag_filter,
-            max_documents=validated["max_documents"],
-        )
-        return helper.search(query=validated["query"])
+        return "\n".join(_search(**kwargs))
 
+    _RAG_PASSAGE_SEARCHERS[tool_name] = _search
     return _retrieve
 
 
@@ -299,7 +624,32 @@ retrieve_city_state_laws: BaseTool = _make_rag_tool(
     "Retrieve relevant state (and when specified, city) specific housing laws from the RAG corpus.",
     args_schema=CityStateLawsInputSchema,
     filter_builder=_default_filter_from_city_state,
+    local_search=_local_laws_from_city_state,
+)
+
+
+@tool(
+    "retrieve_city_state_laws_local",
+    description=(
+        "Retrieve relevant state (and when specified, city) specific housing laws"
+        " from the bundled statute index."
+    ),
+    args_schema=CityStateLawsInputSchema,
+    response_format="content",
 )
+def retrieve_city_state_laws_local(**kwargs: object) -> str:
+    """Search the bundled BM25 index only, without Vertex AI Search.
+
+    Not registered with the agent; retrieve_city_state_laws already uses the
+    same index per LOCAL_RETRIEVAL_MODE. Useful offline and for comparing the
+    local ranking against Vertex AI Search.
+    """
+    schema_data = {
+        k: v for k, v in kwargs.items() if k in CityStateLawsInputSchema.model_fields
+    }
+    validated = CityStateLawsInputSchema.model_validate(schema_data).model_dump()
+    return "\n".join(_local_laws_from_city_state(**validated) or [])
+
 
 # Defined here for testability; inactive until added to RAG_TOOL_REGISTRY and
 # VERTEX_AI_DATASTORE_OREGON_LAW_HELP is configured.
@@ -326,3 +676,109 @@ RAG_TOOL_REGISTRY: list[tuple[DatastoreKey, BaseTool]] = [
 def get_active_rag_tools() -> list[BaseTool]:
     """Return tools whose backing datastore is present in the environment."""
     return [t for key, t in RAG_TOOL_REGISTRY if key in SINGLETON.VERTEX_AI_DATASTORES]
+
+
+FAN_OUT_TOOL_NAME: Final = "retrieve_housing_law_sources"
+
+_fan_out_executor = ThreadPoolExecutor(
+    max_workers=RAG_FAN_OUT_MAX_WORKERS, thread_name_prefix="rag-fan-out"
+)
+
+
+def _normalize_passage(passage: str) -> str:
+    return " ".join(passage.split())
+
+
+def _fan_out_search(tools: list[BaseTool], kwargs: dict[str, object]) -> list[str]:
+    """Query every tool's datastore concurrently and merge the passages.
+
+    Passages keep registry order (primary corpus first) and exact duplicates,
+    ignoring whitespace, are dropped. A datastore that fails or does not
+    answer within RAG_FAN_OUT_TIMEOUT_SECONDS of the fan-out starting is
+    skipped; the error is raised only if every datastore failed.
+    """
+    deadline = time.monotonic() + RAG_FAN_OUT_TIMEOUT_SECONDS
+    # Each search runs in a copy of the caller's context so per-request
+    # timings (metrics.py) include it. Context.run's result type does not
+    # survive submit(); restore it.
+    futures: list[tuple[str, Future[list[str]]]] = [
+        (
+            t.name,
+            cast(
+                "Future[list[str]]",
+                _fan_out_executor.submit(
+                    contextvars.copy_context().run,
+                    _RAG_PASSAGE_SEARCHERS[t.name],
+                    **kwargs,
+                ),
+            ),
+        )
+        for t in tools
+    ]
+
+    merged: list[str] = []
+    seen: set[str] = set()
+    errors: list[BaseException] = []
+    for name, future in futures:
+        try:
+            passages = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeoutError as e:
+            future.cancel()
+            logger.warning("RAG fan-out: %s timed out", name)
+            errors.append(e)
+            continue
+        except Exception as e:
+            logger.warning("RAG fan-out: %s failed: %s", name, e)
+            errors.append(e)
+            continue
+        for passage in passages:
+            key = _normalize_passage(passage)
+            if key not in seen:
+                seen.add(key)
+                merged.append(passage)
+
+    if errors and len(errors) == len(futures):
+        raise errors[0]
+    return merged
+
+
+def _make_fan_out_tool(tools: list[BaseTool]) -> BaseTool:
+    """Combine several RAG tools into one tool that queries them in parallel.
+
+    Saves the model a sequential tool-call round-trip per extra datastore.
+    CityStateLawsInputSchema is a superset of every RAG tool's schema; each
+    datastore only sees the fields its own schema declares.
+    """
+
+    @tool(
+        FAN_OUT_TOOL_NAME,
+        description=(
+            "Retrieve relevant state (and when specified, city) specific housing"
+            " laws together with plain-language legal guidance, searching every"
+            " available corpus at once."
+        ),
+        args_schema=CityStateLawsInputSchema,
+        response_format="content",
+    )
+    def _retrieve_all(**kwargs: object) -> str:
+        schema_data = {
+            k: v
+            for k, v in kwargs.items()
+            if k in CityStateLawsInputSchema.model_fields
+        }
+        validated = CityStateLawsInputSchema.model_validate(schema_data).model_dump()
+        return "\n".join(_fan_out_search(tools, validated))
+
+    return _retrieve_all
+
+
+def get_agent_rag_tools() -> list[BaseTool]:
+    """Return the RAG tools to give the agent.
+
+    With a single active datastore this is just its tool; with several, one
+    fan-out tool queries them all concurrently.
+    """
+    active = get_active_rag_tools()
+    if len(active) <= 1:
+        return active
+    return [_make_fan_out_tool(active)]
@@ -0,0 +1,229 @@
+"""In-process BM25 retrieval over the bundled statute corpus.
+
+The documents ingested into the Vertex AI Search laws datastore (ORS, OAR and
+city codes under scripts/documents/) are also chunked into passages and
+written to a prebuilt inverted index shipped inside this package (see
+scripts/build_local_index.py). Searching it takes well under a millisecond
+and needs no network, so retrieve_city_state_laws can answer from it directly
+(LOCAL_RETRIEVAL_MODE=primary) or fall back to it when Vertex AI Search fails
+or is slow (the default).
+
+City/state filtering mirrors langchain_tools.filter_builder: state-level
+passages always match, city passages only when that city is requested.
+"""
+
+import gzip
+import heapq
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Final, Optional
+
+from .constants import LOCAL_INDEX_PATH
+from .metrics import timed_fn
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION: Final = 1
+
+# Dotted section numbers (90.394, 30.01.087, 659A.421) are kept as one token so
+# a query citing a statute matches that section exactly.
+_TOKEN_RE: Final = re.compile(r"\d+[a-z]?(?:\.\d+)+|[a-z0-9]+")
+
+_STOPWORDS: Final = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or"
+    " shall that the their this to was were which who will with".split()
+)
+
+
+def _stem(token: str) -> str:
+    # Plural folding only: "deposits" -> "deposit". Leaves "premises"-style
+    # words that end in "ss"/"us"/"is" alone.
+    if (
+        len(token) > 3
+        and token.endswith("s")
+        and not token.endswith(("ss", "us", "is"))
+    ):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, split into words and section numbers, drop stopwords."""
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+@dataclass(frozen=True)
+class Passage:
+    """A chunk of one source document with its ingestion metadata."""
+
+    text: str
+    source: str
+    state: str
+    city: Optional[str] = None
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index."""
+
+    def __init__(
+        self,
+        passages: list[Passage],
+        postings: dict[str, list[int]],
+        doc_lengths: list[int],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self.passages = passages
+        # term -> flat [passage id, term frequency, passage id, ...] list; the
+        # flat layout keeps the serialized index compact.
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        n = len(passages)
+        avgdl = (sum(doc_lengths) / n) if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(p) / 2 + 0.5) / (len(p) / 2 + 0.5))
+            for term, p in postings.items()
+        }
+        self._norm = [
+            k1 * (1 - b + b * dl / avgdl) if avgdl else k1 for dl in doc_lengths
+        ]
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    @classmethod
+    def build(cls, passages: Iterable[Passage], **kwargs: float) -> "BM25Index":
+        passage_list = list(passages)
+        postings: dict[str, list[int]] = {}
+        doc_lengths: list[int] = []
+        for pid, passage in enumerate(passage_list):
+            tokens = tokenize(passage.text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).extend((pid, tf))
+        return cls(passage_list, postings, doc_lengths, **kwargs)
+
+    def search(
+        self, query: str, state: str, city: Optional[str] = None, k: int = 5
+    ) -> list[Passage]:
+        """Return the `k` best passages for `query` within the jurisdiction.
+
+        Passages must be for `state`; city passages are included only when
+        they match `city`, and state-level passages are always included.
+        """
+        state = state.lower()
+        city = city.lower() if city is not None else None
+        passages = self.passages
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            flat = self.postings.get(term)
+            if flat is None:
+                continue
+            idf = self._idf[term]
+            for i in range(0, len(flat), 2):
+                pid, tf = flat[i], flat[i + 1]
+                p = passages[pid]
+                if p.state != state or (p.city is not None and p.city != city):
+                    continue
+                scores[pid] = scores.get(pid, 0.0) + idf * tf * (self.k1 + 1) / (
+                    tf + self._norm[pid]
+                )
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [passages[pid] for pid, _ in best]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": INDEX_FORMAT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "passages": [
+                {"text": p.text, "source": p.source, "state": p.state, "city": p.city}
+                for p in self.passages
+            ],
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BM25Index":
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported local index version {data.get('version')!r}; "
+                "rebuild it with `make build-local-index`."
+            )
+        return cls(
+            [Passage(**p) for p in data["passages"]],
+            data["postings"],
+            data["doc_lengths"],
+            k1=data["k1"],
+            b=data["b"],
+        )
+
+    def save(self, path: Path) -> None:
+        # mtime=0 keeps the gzip output byte-identical across rebuilds of an
+        # unchanged corpus, so the committed file only changes with the text.
+        with open(path, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                f.write(json.dumps(self.to_dict(), separators=(",", ":")).encode())
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with gzip.open(path, "rb") as f:
+            return cls.from_dict(json.loads(f.read()))
+
+
+_index: Optional[BM25Index] = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+def get_local_index() -> Optional[BM25Index]:
+    """Return the bundled index, loading it on first call.
+
+    Returns None (and logs once) when the index file is missing or unreadable,
+    so callers can treat local retrieval as unavailable.
+    """
+    global _index, _index_loaded
+    with _index_lock:
+        if not _index_loaded:
+            _index_loaded = True
+            try:
+                _index = BM25Index.load(LOCAL_INDEX_PATH)
+                logger.info(
+                    "Loaded local retrieval index (%d passages) from %s",
+                    len(_index),
+                    LOCAL_INDEX_PATH,
+                )
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(
+                    "Local retrieval index unavailable at %s: %s", LOCAL_INDEX_PATH, e
+                )
+        return _index
+
+
+def reset_local_index() -> None:
+    """Forget the loaded index so the next call reloads it (for tests)."""
+    global _index, _index_loaded
+    with _index_lock:
+        _index = None
+        _index_loaded = False
+
+
+@timed_fn("local_search")
+def search_local_laws(
+    query: str, state: str, city: Optional[str] = None, max_documents: int = 5
+) -> Optional[list[str]]:
+    """Search the bundled statute index; None if it is unavailable."""
+    index = get_local_index()
+    if index is None:
+        return None
+    return [p.text for p in index.search(query, state, city, k=max_documents)]
@@ -0,0 +1,177 @@
+"""Per-stage latency timers for the chat hot path.
+
+Stages (request parsing, graph construction, model calls, RAG searches,
+mojibake repair, NDJSON serialization) are wrapped with `timed(...)` or
+`@timed_fn(...)`. Each observation feeds a process-wide summary (count, sum,
+p50/p95/p99 over a bounded window of recent samples) exported in Prometheus
+text format at /api/metrics, and is added to the current request's timings,
+which the chat endpoints report Server-Timing style on the final
+end_of_stream chunk.
+
+Everything is off unless METRICS_ENABLED is set; a disabled timer costs one
+global lookup. Each gunicorn worker keeps its own numbers, so a scrape
+reflects whichever worker answered it.
+"""
+
+import functools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Final, Iterator, Optional, ParamSpec, TypeVar
+
+from .constants import METRICS_ENABLED, METRICS_SAMPLE_WINDOW
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+QUANTILES: Final = (0.5, 0.95, 0.99)
+
+# Stage name -> total seconds spent in that stage during one request.
+RequestTimings = Dict[str, float]
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class _Stage:
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.samples: deque[float] = deque(maxlen=window)
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    """Nearest-rank quantile of an already sorted, non-empty list."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class StageMetrics:
+    """Thread-safe latency summaries keyed by stage name."""
+
+    def __init__(self, window: int = METRICS_SAMPLE_WINDOW) -> None:
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        self.window = window
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Stage] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = _Stage(self.window)
+            entry.count += 1
+            entry.total += seconds
+            entry.samples.append(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return count, sum and quantiles (in seconds) for every stage."""
+        with self._lock:
+            stages = {
+                name: (s.count, s.total, sorted(s.samples))
+                for name, s in self._stages.items()
+            }
+        result: Dict[str, Dict[str, float]] = {}
+        for name, (count, total, ordered) in sorted(stages.items()):
+            summary = {"count": float(count), "sum": total}
+            for q in QUANTILES:
+                summary[f"p{round(q * 100)}"] = _quantile(ordered, q)
+            result[name] = summary
+        return result
+
+    def render_prometheus(self) -> str:
+        """Render all stages as one Prometheus `summary` metric family."""
+        name = "tenantfirstaid_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each chat request stage.",
+            f"# TYPE {name} summary",
+        ]
+        for stage, summary in self.snapshot().items():
+            for q in QUANTILES:
+                value = summary[f"p{round(q * 100)}"]
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {summary["sum"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {int(summary["count"])}')
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+
+METRICS: Final = StageMetrics()
+
+
+def _record(stage: str, seconds: float) -> None:
+    METRICS.observe(stage, seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the enclosed block as `stage` when metrics are enabled."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(stage, time.perf_counter() - start)
+
+
+def timed_fn(stage: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorator form of `timed`."""
+
+    def decorator(fn: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if not METRICS_ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def start_request_timings(
+    timings: Optional[RequestTimings] = None,
+) -> Optional[RequestTimings]:
+    """Collect per-stage timings for the current request in this context.
+
+    Pass the dict returned by an earlier call to resume collecting into it,
+    e.g. from a streaming generator that runs after the view has returned.
+    Returns None when metrics are disabled.
+    """
+    if not METRICS_ENABLED:
+        return None
+    if timings is None:
+        timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing(timings: Optional[RequestTimings]) -> Optional[str]:
+    """Format request timings as a Server-Timing value.
+
+    Durations are in milliseconds, e.g. "parse;dur=0.4, model;dur=812.3".
+    Returns None when there is nothing to report.
+    """
+    if not timings:
+        return None
+    return ", ".join(
+        f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()
+    )
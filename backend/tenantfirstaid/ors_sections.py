@@ -0,0 +1,106 @@
+"""Exact ORS section lookup over the bundled sections.json.
+
+sections.json maps ORS section numbers ("90.394") to their full text. It is
+parsed on first lookup rather than at import, after which a lookup is a dict
+access and a range is a bisect over the sorted section numbers.
+"""
+
+import json
+import logging
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Final, Optional
+
+from .constants import ORS_SECTIONS_PATH
+
+logger = logging.getLogger(__name__)
+
+# Longest range a single citation may expand to; wider ranges are truncated.
+MAX_RANGE_SECTIONS: Final = 10
+
+_SECTION = r"\d{1,3}[A-Z]?\.\d{3,4}"
+# "90.394", "ORS 90.394(3)(a)", "90.394-90.396", "90.453 to 90.459".
+_CITATION_RE: Final = re.compile(
+    rf"({_SECTION})(?:\(\w+\))*(?:\s*(?:-|–|—|to|through)\s*(?:ORS\s*)?({_SECTION}))?",
+    re.IGNORECASE,
+)
+
+SectionKey = tuple[int, str, int]
+
+
+def _sort_key(section: str) -> SectionKey:
+    chapter, number = section.upper().split(".")
+    digits = chapter.rstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    return (int(digits), chapter[len(digits) :], int(number))
+
+
+class OrsSections:
+    """Section number -> text, with range queries in statute order."""
+
+    def __init__(self, sections: dict[str, str]) -> None:
+        self._text = {k.upper(): v for k, v in sections.items()}
+        self._ordered = sorted(self._text, key=_sort_key)
+        self._keys = [_sort_key(k) for k in self._ordered]
+
+    def __len__(self) -> int:
+        return len(self._text)
+
+    def get(self, section: str) -> Optional[str]:
+        return self._text.get(section.upper())
+
+    def range(self, first: str, last: str) -> list[str]:
+        """Section numbers from `first` to `last` inclusive that are present."""
+        lo, hi = sorted((_sort_key(first), _sort_key(last)))
+        return self._ordered[bisect_left(self._keys, lo) : bisect_right(self._keys, hi)]
+
+    @classmethod
+    def load(cls, path: Path) -> "OrsSections":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+
+_sections: Optional[OrsSections] = None
+_sections_lock = threading.Lock()
+
+
+def get_ors_sections() -> OrsSections:
+    """Return the bundled sections, parsing sections.json on first call."""
+    global _sections
+    with _sections_lock:
+        if _sections is None:
+            _sections = OrsSections.load(ORS_SECTIONS_PATH)
+            logger.debug("Loaded %d ORS sections", len(_sections))
+        return _sections
+
+
+def parse_citations(text: str) -> list[tuple[str, Optional[str]]]:
+    """Extract (section, range end or None) pairs from free-form citations."""
+    return [(m.group(1), m.group(2)) for m in _CITATION_RE.finditer(text)]
+
+
+def lookup_sections(citations: str) -> list[tuple[str, Optional[str]]]:
+    """Resolve citations to (section number, text or None if not bundled).
+
+    Ranges expand to the bundled sections they span, at most
+    MAX_RANGE_SECTIONS each. Duplicates are dropped, keeping citation order.
+    """
+    sections = get_ors_sections()
+    resolved: list[tuple[str, Optional[str]]] = []
+    seen: set[str] = set()
+    for first, last in parse_citations(citations):
+        if last is None:
+            numbers = [first.upper()]
+        else:
+            numbers = sections.range(first, last)
+            if len(numbers) > MAX_RANGE_SECTIONS:
+                logger.debug("Truncating ORS range %s-%s", first, last)
+                numbers = numbers[:MAX_RANGE_SECTIONS]
+            if not numbers:
+                numbers = [first.upper(), last.upper()]
+        for number in numbers:
+            if number not in seen:
+                seen.add(number)
+                resolved.append((number, sections.get(number)))
+    return resolved
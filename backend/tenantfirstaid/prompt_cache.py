@@ -0,0 +1,195 @@
+"""Provider-side context caching of the system prompt and tool declarations.
+
+The system prompt (system_prompt.md plus the location line) is ~15 KB and is
+resent, together with every tool declaration, on each model call; a turn that
+uses tools makes several. With PROMPT_CACHE_ENABLED, that prefix is stored
+once per process and jurisdiction as a Gemini cached context, and model calls
+send only the conversation plus the cache name (see graph._CachedPromptPrefix).
+
+Caches are created and refreshed on a background thread, so no request waits
+for one: until a cache exists (or if creating it fails), calls go out with the
+full prompt as before. A cache is replaced shortly before its TTL runs out.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Final, Optional
+
+from langchain_core.messages import SystemMessage
+
+from .constants import (
+    PROMPT_CACHE_MAX_SIZE,
+    PROMPT_CACHE_REFRESH_SECONDS,
+    PROMPT_CACHE_RETRY_SECONDS,
+    PROMPT_CACHE_TTL_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+logger = logging.getLogger(__name__)
+
+# (model, system message, tools, ttl seconds) -> provider cache name.
+CacheCreator = Callable[["ChatGoogleGenerativeAI", SystemMessage, list[Any], int], str]
+
+
+def _create_provider_cache(
+    model: "ChatGoogleGenerativeAI",
+    system_message: SystemMessage,
+    tools: list[Any],
+    ttl_seconds: int,
+) -> str:
+    from langchain_google_genai import create_context_cache
+
+    return create_context_cache(
+        model, [system_message], tools=tools, ttl=f"{ttl_seconds}s"
+    )
+
+
+def _cache_key(
+    model_name: str, system_message: SystemMessage, tools: Sequence[Any]
+) -> str:
+    h = hashlib.sha256()
+    h.update(model_name.encode())
+    h.update(b"\0")
+    h.update(system_message.text.encode())
+    for t in tools:
+        h.update(b"\0")
+        h.update(str(getattr(t, "name", t)).encode())
+    return h.hexdigest()
+
+
+@dataclass
+class _Entry:
+    name: Optional[str] = None
+    expires_at: float = 0.0
+    # Set while a create/refresh is running.
+    pending: Optional[Future[None]] = None
+    retry_at: float = 0.0
+
+
+class PromptContextCache:
+    """Process-wide map of prompt prefix -> provider cached-content name.
+
+    Thread-safe. Keeps at most `max_size` prefixes (least recently used are
+    forgotten; their provider caches simply expire).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = PROMPT_CACHE_TTL_SECONDS,
+        refresh_seconds: float = PROMPT_CACHE_REFRESH_SECONDS,
+        retry_seconds: float = PROMPT_CACHE_RETRY_SECONDS,
+        max_size: int = PROMPT_CACHE_MAX_SIZE,
+        creator: CacheCreator = _create_provider_cache,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        if refresh_seconds >= ttl_seconds:
+            raise ValueError("refresh_seconds must be shorter than ttl_seconds")
+        self.ttl_seconds = ttl_seconds
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.max_size = max_size
+        self._creator = creator
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="prompt-cache"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(
+        self,
+        model: "ChatGoogleGenerativeAI",
+        system_message: SystemMessage,
+        tools: Sequence[Any],
+    ) -> Optional[str]:
+        """Return a usable cache name for this prefix, or None to send it in full.
+
+        Schedules creation on a miss and a refresh when the cache is within
+        `refresh_seconds` of expiring.
+        """
+        key = _cache_key(model.model, system_message, tools)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(key)
+
+            usable = entry.name is not None and now < entry.expires_at
+            needs_refresh = not usable or entry.expires_at - now < self.refresh_seconds
+            if needs_refresh and entry.pending is None and now >= entry.retry_at:
+                entry.pending = self._executor.submit(
+                    self._create, entry, model, system_message, list(tools)
+                )
+            return entry.name if usable else None
+
+    def _create(
+        self,
+        entry: _Entry,
+        model: "ChatGoogleGenerativeAI",
+        system_message: SystemMessage,
+        tools: list[Any],
+    ) -> None:
+        started = time.monotonic()
+        try:
+            name = self._creator(model, system_message, tools, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(
+                "Prompt context cache creation failed, sending full prompts for "
+                "the next %.0fs: %s",
+                self.retry_seconds,
+                e,
+            )
+            with self._lock:
+                entry.pending = None
+                entry.retry_at = time.monotonic() + self.retry_seconds
+            return
+        logger.info("Created prompt context cache %s", name)
+        with self._lock:
+            entry.name = name
+            # Measured from before the request so we never overestimate.
+            entry.expires_at = started + self.ttl_seconds
+            entry.pending = None
+            entry.retry_at = 0.0
+
+    def invalidate(self, name: str) -> None:
+        """Stop using cache `name` (e.g. the provider rejected it).
+
+        Full prompts are sent for the next `retry_seconds` before a new cache
+        is created.
+        """
+        retry_at = time.monotonic() + self.retry_seconds
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.name == name:
+                    entry.name = None
+                    entry.expires_at = 0.0
+                    entry.retry_at = retry_at
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for in-flight creations to finish (for tests and tooling)."""
+        with self._lock:
+            pending = [e.pending for e in self._entries.values() if e.pending]
+        wait(pending, timeout=timeout)
+
+    def clear(self) -> None:
+        self.join()
+        with self._lock:
+            self._entries.clear()
+
+
+PROMPT_CACHE: Final = PromptContextCache()
@@ -0,0 +1,160 @@
+"""Cache of complete answers to first-turn questions.
+
+Much of the traffic is a single opening question ("Can my landlord keep my
+deposit?") with no prior history, and each one runs the full agent loop:
+several model calls plus retrieval. With RESPONSE_CACHE_ENABLED, the content
+blocks streamed for such a request are stored and replayed, as a normal
+stream, to later first-turn requests asking the same question in the same
+jurisdiction.
+
+Entries are scoped by city, state, model, a hash of the jurisdiction's system
+prompt, the configured datastore IDs and whether the client asked for
+token-level deltas, since each stream mode replays in its own block shape.
+Editing system_prompt.md, switching
+models or pointing at a freshly ingested datastore therefore starts from an
+empty scope; stale entries simply age out. Within a scope, a question only
+matches the same words in the same order: case, spacing and punctuation are
+ignored, nothing else. Near matches are deliberately not served, since one
+added word ("if I don't break my lease") can reverse the legal answer. Only
+short questions are cached, so a long message describing one tenant's
+situation is never answered with another tenant's reply, and answers
+containing a generated letter are never stored.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Dict, Final, List, Optional
+
+from langchain_core.messages import BaseMessage, ContentBlock, SystemMessage
+
+from .constants import (
+    RESPONSE_CACHE_MAX_QUERY_WORDS,
+    RESPONSE_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_TTL_SECONDS,
+)
+from .location import OregonCity, UsaState
+
+_WORD_RE: Final = re.compile(r"[\w']+")
+_USER_ROLES: Final = ("human", "user")
+
+# (city, state, model name, system prompt digest, datastore ids, stream_deltas)
+ResponseScope = tuple[Optional[str], str, str, str, tuple[str, ...], bool]
+
+
+@dataclass(frozen=True)
+class ResponseCacheKey:
+    scope: ResponseScope
+    # The question's words, case-folded, in order.
+    query: str
+
+
+def first_turn_query(messages: Sequence[BaseMessage | Dict[str, Any]]) -> Optional[str]:
+    """Return the question text if `messages` is a lone user message, else None."""
+    if len(messages) != 1:
+        return None
+    m = messages[0]
+    if isinstance(m, BaseMessage):
+        role, content = m.type, m.content
+    else:
+        role, content = m.get("role"), m.get("content")
+    if role not in _USER_ROLES or not isinstance(content, str):
+        return None
+    return content
+
+
+def make_response_key(
+    query: str,
+    city: Optional[OregonCity],
+    state: UsaState,
+    model_name: str,
+    system_prompt: SystemMessage,
+    datastore_ids: Iterable[str],
+    stream_deltas: bool = False,
+) -> Optional[ResponseCacheKey]:
+    """Build a key for `query`, or None if it is empty or too long to cache."""
+    words = _WORD_RE.findall(query.casefold())
+    if not words or len(words) > RESPONSE_CACHE_MAX_QUERY_WORDS:
+        return None
+    digest = hashlib.sha256(system_prompt.text.encode("utf-8")).hexdigest()
+    scope: ResponseScope = (
+        city,
+        state,
+        model_name,
+        digest,
+        tuple(sorted(datastore_ids)),
+        stream_deltas,
+    )
+    return ResponseCacheKey(scope, " ".join(words))
+
+
+@dataclass
+class _Entry:
+    key: ResponseCacheKey
+    blocks: List[ContentBlock]
+    expires_at: float
+
+
+class ResponseCache:
+    """Bounded, thread-safe LRU of streamed answers with per-entry expiry."""
+
+    def __init__(
+        self,
+        max_size: int = RESPONSE_CACHE_MAX_SIZE,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[ResponseScope, str], _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: ResponseCacheKey) -> Optional[List[ContentBlock]]:
+        """Return the blocks cached for `key`, or None."""
+        k = (key.scope, key.query)
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[k]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(k)
+            return list(entry.blocks)
+
+    def put(self, key: ResponseCacheKey, blocks: Sequence[ContentBlock]) -> bool:
+        """Store a completed answer; returns False if it is not cacheable."""
+        if not any(b["type"] == "text" for b in blocks):
+            return False
+        # Letters are written for one tenant's circumstances.
+        if any(b["type"] == "non_standard" for b in blocks):
+            return False
+        entry = _Entry(key, list(blocks), time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._entries[(key.scope, key.query)] = entry
+            self._entries.move_to_end((key.scope, key.query))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+RESPONSE_CACHE: Final = ResponseCache()
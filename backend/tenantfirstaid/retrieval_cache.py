@@ -0,0 +1,236 @@
+"""TTL + LRU cache for RAG retrieval results.
+
+Many tenants ask near-identical questions, so the agent issues the same
+retrieval (query, filter, extraction parameters) many times an hour. Vertex AI
+Search round-trips are the largest latency component after the LLM itself, so
+results are cached in front of RagBuilder.search.
+
+Two backends are provided: an in-process LRU (default) and a SQLite file that
+can be shared by every gunicorn worker on a node (set RETRIEVAL_CACHE_PATH).
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Final, Optional, Protocol
+
+from .constants import (
+    RETRIEVAL_CACHE_MAX_SIZE,
+    RETRIEVAL_CACHE_PATH,
+    RETRIEVAL_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share a key."""
+    return " ".join(query.casefold().split())
+
+
+def make_cache_key(
+    datastore_id: str,
+    query: str,
+    rag_filter: Optional[str],
+    params: Mapping[str, Any],
+) -> str:
+    """Hash the datastore, normalized query, filter and extraction parameters."""
+    payload = json.dumps(
+        [datastore_id, normalize_query(query), rag_filter, dict(params)],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RetrievalCacheBackend(Protocol):
+    """Storage used by RetrievalCache. Times are wall-clock epoch seconds."""
+
+    def get(self, key: str, now: float) -> Optional[str]: ...
+
+    def put(
+        self, key: str, datastore_id: str, value: str, expires_at: float
+    ) -> None: ...
+
+    def invalidate_datastore(self, datastore_id: str) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class InMemoryRetrievalBackend:
+    """Process-local LRU with per-entry expiry."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # key -> (datastore_id, value, expires_at), in LRU order.
+        self._entries: OrderedDict[str, tuple[str, str, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, datastore_id: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (datastore_id, value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_datastore(self, datastore_id: str) -> int:
+        with self._lock:
+            stale = [k for k, v in self._entries.items() if v[0] == datastore_id]
+            for k in stale:
+                del self._entries[k]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteRetrievalBackend:
+    """SQLite-file LRU with per-entry expiry, shareable across processes.
+
+    A short-lived connection is opened per operation so the backend is safe to
+    use from any thread or forked worker.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS retrieval_cache (
+            key TEXT PRIMARY KEY,
+            datastore_id TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str | Path, max_size: int) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        with self._connect() as conn:
+            conn.execute(self._SCHEMA)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS retrieval_cache_datastore"
+                " ON retrieval_cache (datastore_id)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with conn:  # Commits on success, rolls back on error.
+                yield conn
+        finally:
+            conn.close()
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM retrieval_cache").fetchone()[0]
+
+    def get(self, key: str, now: float) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM retrieval_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM retrieval_cache WHERE key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE retrieval_cache SET last_used = ? WHERE key = ?", (now, key)
+            )
+            return row[0]
+
+    def put(self, key: str, datastore_id: str, value: str, expires_at: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO retrieval_cache VALUES (?, ?, ?, ?, ?)",
+                (key, datastore_id, value, expires_at, time.time()),
+            )
+            conn.execute(
+                """
+                DELETE FROM retrieval_cache WHERE key IN (
+                    SELECT key FROM retrieval_cache
+                    ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_size,),
+            )
+
+    def invalidate_datastore(self, datastore_id: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM retrieval_cache WHERE datastore_id = ?", (datastore_id,)
+            ).rowcount
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM retrieval_cache")
+
+
+class RetrievalCache:
+    """Front end for a RetrievalCacheBackend with TTL and hit/miss counters."""
+
+    def __init__(
+        self,
+        backend: RetrievalCacheBackend,
+        ttl_seconds: float = RETRIEVAL_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.backend.get(key, time.time())
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, datastore_id: str, value: str) -> None:
+        self.backend.put(key, datastore_id, value, time.time() + self.ttl_seconds)
+
+    def invalidate_datastore(self, datastore_id: str) -> int:
+        """Drop every cached result for `datastore_id`, e.g. after re-ingestion."""
+        removed = self.backend.invalidate_datastore(datastore_id)
+        logger.info(
+            "Invalidated %d cached retrievals for datastore %s", removed, datastore_id
+        )
+        return removed
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def _default_backend() -> RetrievalCacheBackend:
+    if RETRIEVAL_CACHE_PATH:
+        return SqliteRetrievalBackend(RETRIEVAL_CACHE_PATH, RETRIEVAL_CACHE_MAX_SIZE)
+    return InMemoryRetrievalBackend(RETRIEVAL_CACHE_MAX_SIZE)
+
+
+RETRIEVAL_CACHE: Final = RetrievalCache(_default_backend())
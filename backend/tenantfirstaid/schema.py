@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -20,6 +20,11 @@ class LetterChunk(BaseModel):
 
 class EndOfStreamChunk(BaseModel):
     type: Literal["end_of_stream"] = "end_of_stream"
+    server_timing: Optional[str] = Field(
+        default=None,
+        description="Per-stage server timings (Server-Timing syntax), when enabled",
+        exclude_if=lambda v: v is None,
+    )
 
 
 ResponseChunk = TextChunk | ReasoningChunk | LetterChunk | EndOfStreamChunk
@@ -0,0 +1,174 @@
+"""Server-side conversation sessions backed by a LangGraph checkpointer.
+
+In the default (stateless) mode the frontend resends the full message history
+on every turn. In session mode the client sends only the new messages plus an
+opaque session token, and the agent resumes from the checkpointed state for
+that token. This keeps request payloads and per-turn parsing constant as a
+conversation (and any generated letters) grows.
+
+By default checkpoints are kept in the SQLite file at CHAT_SESSION_DB_PATH,
+shared by every worker process on the node. The Flask app reads it through a
+SqliteSaver (get_session_store); the ASGI app streams with agent.astream, which
+needs a checkpointer with async methods, so it uses an AsyncSqliteSaver on the
+same file (get_async_session_store). Any BaseCheckpointSaver can be passed to
+ChatSessionStore instead (e.g. a shared database for multi-node).
+"""
+
+import asyncio
+import logging
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from .constants import (
+    CHAT_SESSION_DB_PATH,
+    CHAT_SESSION_SWEEP_SECONDS,
+    CHAT_SESSION_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# secrets.token_urlsafe(32) yields 43 URL-safe base64 characters.
+_TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{43}$")
+
+
+def _thread_config(token: str) -> RunnableConfig:
+    return RunnableConfig(configurable={"thread_id": token})
+
+
+def _checkpoint_epoch(ts: str) -> float:
+    """Convert a checkpoint's ISO-8601 `ts` field to epoch seconds."""
+    return datetime.fromisoformat(ts).timestamp()
+
+
+class ChatSessionStore:
+    """Issues session tokens and enforces a TTL on checkpointed conversations.
+
+    Expiry is derived from the timestamp of each thread's latest checkpoint,
+    so it works unchanged when several workers share one checkpointer. Expired
+    threads are deleted when next looked up, and a sweep of all threads runs
+    at most once per `sweep_seconds` from the request path (no background
+    thread).
+    """
+
+    def __init__(
+        self,
+        checkpointer: BaseCheckpointSaver,
+        ttl_seconds: float = CHAT_SESSION_TTL_SECONDS,
+        sweep_seconds: float = CHAT_SESSION_SWEEP_SECONDS,
+    ) -> None:
+        self.checkpointer = checkpointer
+        self.ttl_seconds = ttl_seconds
+        self.sweep_seconds = sweep_seconds
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    @staticmethod
+    def new_token() -> str:
+        """Return a fresh, unguessable session token."""
+        return secrets.token_urlsafe(32)
+
+    @staticmethod
+    def is_valid_token(token: object) -> bool:
+        return isinstance(token, str) and bool(_TOKEN_PATTERN.match(token))
+
+    def is_active(self, token: str) -> bool:
+        """Return True if `token` has a checkpoint younger than the TTL.
+
+        Expired sessions are deleted as a side effect.
+        """
+        self.maybe_sweep()
+        checkpoint = self.checkpointer.get_tuple(_thread_config(token))
+        if checkpoint is None:
+            return False
+        age = time.time() - _checkpoint_epoch(checkpoint.checkpoint["ts"])
+        if age > self.ttl_seconds:
+            self.checkpointer.delete_thread(token)
+            logger.debug("Expired chat session after %.0fs idle", age)
+            return False
+        return True
+
+    def maybe_sweep(self) -> int:
+        """Run `sweep` if `sweep_seconds` have passed since the last one."""
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < self.sweep_seconds:
+                return 0
+            self._last_sweep = now
+        return self.sweep(now)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete every thread whose latest checkpoint is older than the TTL."""
+        cutoff = (time.time() if now is None else now) - self.ttl_seconds
+        latest: dict[str, float] = {}
+        for checkpoint in self.checkpointer.list(None):
+            thread_id = checkpoint.config["configurable"]["thread_id"]
+            ts = _checkpoint_epoch(checkpoint.checkpoint["ts"])
+            latest[thread_id] = max(ts, latest.get(thread_id, ts))
+
+        expired = [t for t, ts in latest.items() if ts < cutoff]
+        for thread_id in expired:
+            self.checkpointer.delete_thread(thread_id)
+        if expired:
+            logger.info("Evicted %d expired chat sessions", len(expired))
+        return len(expired)
+
+
+def _default_checkpointer() -> BaseCheckpointSaver:
+    # Not an in-memory saver: with several gunicorn workers, a session's next
+    # turn can land on a worker that never saw it. SqliteSaver serializes
+    # access with its own lock, so one connection can be shared across
+    # request threads.
+    return SqliteSaver(sqlite3.connect(CHAT_SESSION_DB_PATH, check_same_thread=False))
+
+
+_session_store: Optional[ChatSessionStore] = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> ChatSessionStore:
+    """Return the process-wide session store, creating it on first call."""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = ChatSessionStore(_default_checkpointer())
+        return _session_store
+
+
+_async_session_store: Optional[ChatSessionStore] = None
+
+
+def _bound_to(store: ChatSessionStore, loop: asyncio.AbstractEventLoop) -> bool:
+    checkpointer = store.checkpointer
+    return isinstance(checkpointer, AsyncSqliteSaver) and checkpointer.loop is loop
+
+
+async def get_async_session_store() -> ChatSessionStore:
+    """Return the session store for the running event loop (the ASGI app).
+
+    Its AsyncSqliteSaver is bound to the loop that created it. The store's
+    synchronous lookups (is_active, sweep) still work, but only from another
+    thread, so call them through asyncio.to_thread.
+    """
+    global _async_session_store
+    loop = asyncio.get_running_loop()
+    store = _async_session_store
+    if store is None or not _bound_to(store, loop):
+        conn = await aiosqlite.connect(CHAT_SESSION_DB_PATH)
+        # Another request may have connected while this one was waiting.
+        current = _async_session_store
+        if current is not None and _bound_to(current, loop):
+            await conn.close()
+            return current
+        store = _async_session_store = ChatSessionStore(AsyncSqliteSaver(conn))
+    return store
@@ -0,0 +1,78 @@
+"""NDJSON encoding of chat response chunks without per-chunk Pydantic models.
+
+The wire format is defined by the models in schema.py: one compact JSON
+object per line, e.g. {"type":"text","content":"..."}. Building a model and
+calling model_dump_json() for every chunk costs several allocations per
+token-level delta, so the chat endpoints instead join a pre-encoded
+'{"type":...,"content":' prefix with the JSON-escaped content. The output is
+byte-for-byte what model_dump_json() + "\\n" produces (see
+tests/test_stream_encoding.py).
+"""
+
+import logging
+from json.encoder import encode_basestring
+from typing import Any, Dict, Final, Optional
+
+from langchain_core.messages import ContentBlock
+
+logger = logging.getLogger(__name__)
+
+# Chunk type -> encoded line prefix; the content string and b"}\n" follow.
+_PREFIXES: Final = {
+    t: f'{{"type":"{t}","content":'.encode() for t in ("text", "reasoning", "letter")
+}
+_END_OF_STREAM: Final = b'{"type":"end_of_stream"}\n'
+_END_OF_STREAM_TIMING_PREFIX: Final = b'{"type":"end_of_stream","server_timing":'
+_SUFFIX: Final = b"}\n"
+
+
+def _block_type_and_content(content_block: ContentBlock) -> Optional[tuple[str, str]]:
+    """Map a raw LangChain content block to its schema.py chunk type and content.
+
+    Returns None for block types the frontend does not render.
+    """
+    match content_block["type"]:
+        case "reasoning":
+            return "reasoning", content_block["reasoning"]
+        case "text":
+            return "text", content_block["text"]
+        case "non_standard":
+            # Tool-emitted chunks are wrapped in NonStandardContentBlock.
+            # Add a case here for each tool chunk type (e.g. letter, citation).
+            inner: Dict[str, Any] = content_block["value"]
+            match inner.get("type"):
+                case "letter":
+                    logger.debug("Routing non_standard block to letter.")
+                    return "letter", inner["content"]
+                case _:
+                    logger.warning(
+                        "Unhandled non_standard block type: %s", inner.get("type")
+                    )
+        case _:
+            # Unknown LLM block types are intentionally dropped.
+            logger.warning("Unhandled block type: %s", content_block["type"])
+    return None
+
+
+def encode_block(content_block: ContentBlock) -> Optional[bytes]:
+    """Return the NDJSON line for `content_block`, or None if it is not sent."""
+    routed = _block_type_and_content(content_block)
+    if routed is None:
+        return None
+    chunk_type, content = routed
+    return b"".join(
+        (_PREFIXES[chunk_type], encode_basestring(content).encode(), _SUFFIX)
+    )
+
+
+def encode_end_of_stream(server_timing: Optional[str] = None) -> bytes:
+    """Return the final end_of_stream line."""
+    if server_timing is None:
+        return _END_OF_STREAM
+    return b"".join(
+        (
+            _END_OF_STREAM_TIMING_PREFIX,
+            encode_basestring(server_timing).encode(),
+            _SUFFIX,
+        )
+    )
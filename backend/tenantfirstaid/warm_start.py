@@ -0,0 +1,140 @@
+"""Preloading in the gunicorn master and warm-up of each worker.
+
+Without preloading, every worker imports the LangChain, LangGraph and Google
+stacks itself, and its first chat request also pays for the LLM client,
+credential loading and graph compilation. gunicorn_config.py runs the app
+with preload_app and these hooks:
+
+- preload() runs in the master after the app is imported. It imports the
+  dependencies the app defers to first use (PRELOADED_MODULES) and loads the
+  read-only data files (ORS sections, the local retrieval index), so workers
+  inherit them from the fork instead of loading them again.
+- reset_after_fork() runs first thing in each worker. It drops anything that
+  holds a gRPC/HTTP client or a compiled graph bound to one. None should
+  exist, because the master never serves a request, but a client created
+  before fork would share its connection state with every worker.
+- warm_up() runs in each worker before it accepts connections. It builds the
+  LLM client and compiles the default jurisdiction's agent. It also creates
+  the pooled retrievers and, with WARM_START_REQUEST_ENABLED, sends
+  WARM_START_QUERY through /api/query.
+
+Warm-up failures are logged and otherwise ignored: the first real request
+then does the same work, as it would without warm-up.
+"""
+
+import importlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Final, Optional
+
+from .constants import SINGLETON, WARM_START_QUERY, WARM_START_REQUEST_ENABLED
+from .graph import reset_llm
+from .langchain_chat_manager import (
+    AGENT_CACHE,
+    SESSION_AGENT_CACHE,
+    LangChainChatManager,
+)
+from .langchain_tools import RETRIEVER_POOL
+from .local_retrieval import get_local_index
+from .location import UsaState
+from .ors_sections import get_ors_sections
+
+logger = logging.getLogger(__name__)
+
+# Jurisdiction whose agent is compiled during warm-up. Other jurisdictions
+# are compiled by their first request.
+WARM_START_STATE: Final = UsaState("or")
+
+# Imported lazily by the app so that importing it stays fast (see
+# scripts/import_time.py); the master imports them once for all workers.
+PRELOADED_MODULES: Final = (
+    "langchain_google_genai",
+    "langchain_google_community",
+    "xhtml2pdf.pisa",
+)
+
+
+def rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """Resident set size of `pid` (default: this process); None without /proc."""
+    try:
+        status = Path(f"/proc/{pid or os.getpid()}/status").read_text()
+    except OSError:
+        return None
+    for line in status.splitlines():
+        key, _, value = line.partition(":")
+        if key == "VmRSS":
+            return int(value.split()[0]) * 1024
+    return None
+
+
+def format_rss(rss: Optional[int]) -> str:
+    return "n/a" if rss is None else f"{rss / 2**20:.1f} MiB"
+
+
+def preload() -> None:
+    """Load deferred modules and read-only data in the master for every worker."""
+    for name in PRELOADED_MODULES:
+        importlib.import_module(name)
+    sections = get_ors_sections()
+    index = get_local_index()
+    logger.info(
+        "Preloaded %d modules, %d ORS sections and %s",
+        len(PRELOADED_MODULES),
+        len(sections),
+        "no local index" if index is None else f"{len(index)} local passages",
+    )
+
+
+def reset_after_fork() -> None:
+    """Drop clients and client-bound graphs inherited from the parent process."""
+    reset_llm()
+    RETRIEVER_POOL.clear()
+    AGENT_CACHE.clear()
+    SESSION_AGENT_CACHE.clear()
+
+
+def _step(name: str, fn: Any, *args: Any) -> Optional[float]:
+    start = time.monotonic()
+    try:
+        fn(*args)
+    except Exception as e:
+        logger.warning("Warm-up step %s failed: %s", name, e)
+        return None
+    return time.monotonic() - start
+
+
+def _warm_request(app: Any) -> None:
+    body = {
+        "messages": [{"role": "human", "content": WARM_START_QUERY}],
+        "city": None,
+        "state": WARM_START_STATE,
+    }
+    with app.test_client() as client:
+        response = client.post("/api/query", json=body)
+        # Reading the body runs the whole stream.
+        response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/query returned {response.status_code}")
+
+
+def warm_up(app: Any = None) -> dict[str, Optional[float]]:
+    """Build what a worker's first chat request would, before it accepts traffic.
+
+    `app` is the Flask app the synthetic request is sent to; it is only used
+    with WARM_START_REQUEST_ENABLED. Returns the seconds each step took, or
+    None for steps that failed.
+    """
+    steps: dict[str, Optional[float]] = {
+        "agent": _step(
+            "agent", LangChainChatManager().prepare_agent, None, WARM_START_STATE
+        ),
+    }
+    for key, datastore_id in SINGLETON.VERTEX_AI_DATASTORES.items():
+        steps[f"retriever:{key}"] = _step(
+            f"retriever:{key}", RETRIEVER_POOL.acquire, datastore_id
+        )
+    if WARM_START_REQUEST_ENABLED and app is not None:
+        steps["request"] = _step("request", _warm_request, app)
+    return steps
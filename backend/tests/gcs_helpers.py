@@ -1,7 +1,12 @@
 """Shared mock builders for the GCS provisioning script tests."""
 
+import base64
+import hashlib
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+from google.api_core import exceptions as gcp_exceptions
+
 
 def patch_singleton(target: str):
     """Patch a script module's SINGLETON with a fake GCP project and credentials path.
@@ -13,3 +18,65 @@ def patch_singleton(target: str):
     singleton.GOOGLE_CLOUD_PROJECT = "my-project"
     singleton.GOOGLE_APPLICATION_CREDENTIALS = "/fake/creds.json"
     return patch(target, singleton)
+
+
+class FakeBlob:
+    """In-memory stand-in for storage.Blob: stores bytes and GCS-style checksums."""
+
+    def __init__(self, name: str, bucket: "FakeBucket", chunk_size=None):
+        self.name = name
+        self.bucket = bucket
+        self.chunk_size = chunk_size
+        self.data: bytes | None = None
+        self.content_type: str | None = None
+
+    @property
+    def size(self) -> int | None:
+        return None if self.data is None else len(self.data)
+
+    @property
+    def md5_hash(self) -> str | None:
+        if self.data is None:
+            return None
+        return base64.b64encode(hashlib.md5(self.data).digest()).decode("ascii")
+
+    crc32c = None
+
+    def upload_from_filename(self, filename: str, content_type=None) -> None:
+        self.data = Path(filename).read_bytes()
+        self.content_type = content_type
+        self.bucket.objects[self.name] = self
+        self.bucket.uploads.append(self.name)
+
+
+class FakeBucket:
+    """In-memory stand-in for storage.Bucket; `uploads` records every upload."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.objects: dict[str, FakeBlob] = {}
+        self.uploads: list[str] = []
+
+    def blob(self, name: str, chunk_size=None) -> FakeBlob:
+        return FakeBlob(name, self, chunk_size=chunk_size)
+
+    def list_blobs(self) -> list[FakeBlob]:
+        return list(self.objects.values())
+
+
+class FakeStorageClient:
+    """In-memory stand-in for storage.Client covering the calls upload_to_gcs makes."""
+
+    def __init__(self, *args, **kwargs):
+        self.buckets: dict[str, FakeBucket] = {}
+
+    def create_bucket(self, name: str, location=None) -> FakeBucket:
+        if name in self.buckets:
+            raise gcp_exceptions.Conflict(f"bucket {name} already exists")
+        bucket = self.buckets[name] = FakeBucket(name)
+        return bucket
+
+    def get_bucket(self, name: str) -> FakeBucket:
+        if name not in self.buckets:
+            raise gcp_exceptions.NotFound(f"bucket {name} not found")
+        return self.buckets[name]
@@ -5,6 +5,7 @@ from unittest.mock import patch
 import pytest
 
 from tenantfirstaid.app import app, limiter
+from tenantfirstaid.feedback import FEEDBACK_QUEUE
 
 
 @pytest.fixture
@@ -79,12 +80,16 @@ class TestQueryRoute:
 class TestFeedbackRoute:
     @patch("tenantfirstaid.feedback.EmailMessage")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_post_feedback_returns_200(self, mock_email_cls, client):
+    def test_post_feedback_returns_202_with_job_id(self, mock_email_cls, client):
         resp = client.post(
             "/api/feedback",
             data={"name": "Jane", "subject": "Bug", "feedback": "Broken"},
         )
-        assert resp.status_code == 200
+        assert resp.status_code == 202
+        assert set(resp.get_json()) == {"job_id"}
+        FEEDBACK_QUEUE.join()
+
+        mock_email_cls.return_value.send.assert_called_once()
 
     @patch("tenantfirstaid.feedback.EmailMessage")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
@@ -99,6 +104,7 @@ class TestFeedbackRoute:
             data={"name": "Jane", "subject": "Bug", "feedback": "Broken"},
         )
         assert resp.status_code == 429
+        FEEDBACK_QUEUE.join()
 
 
 class TestContentType:
@@ -116,3 +122,16 @@ class TestContentType:
             },
         )
         assert resp.mimetype == "text/plain"
+
+
+class TestMetrics:
+    def test_metrics_hidden_when_disabled(self, client):
+        with patch("tenantfirstaid.app.METRICS_ENABLED", False):
+            assert client.get("/api/metrics").status_code == 404
+
+    def test_metrics_exposed_when_enabled(self, client):
+        with patch("tenantfirstaid.app.METRICS_ENABLED", True):
+            resp = client.get("/api/metrics")
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/plain"
+        assert "tenantfirstaid_stage_duration_seconds" in resp.get_data(as_text=True)
@@ -0,0 +1,235 @@
+"""Tests for the ASGI entry point and its async /api/query endpoint."""
+
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+import pytest_asyncio
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from tenantfirstaid import sessions
+from tenantfirstaid.asgi import app
+
+
+async def _fake_stream(*_args, **_kwargs):
+    yield {"type": "text", "text": "Async advice."}
+    yield {"type": "non_standard", "value": {"type": "letter", "content": "Dear"}}
+
+
+@pytest.fixture
+def mock_async_chat_manager(mocker):
+    mock = mocker.patch("tenantfirstaid.asgi.LangChainChatManager", autospec=True)
+    instance = mock.return_value
+    instance.agenerate_streaming_response.side_effect = _fake_stream
+    return instance
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+def _patch_session_store(mocker):
+    store = mocker.Mock()
+    mocker.patch("tenantfirstaid.asgi.get_async_session_store", return_value=store)
+    return store
+
+
+_BODY = {
+    "messages": [{"role": "human", "content": "Help"}],
+    "city": None,
+    "state": "or",
+}
+
+
+@pytest.mark.asyncio
+async def test_query_streams_ndjson(client, mock_async_chat_manager):
+    resp = await client.post("/api/query", json=_BODY)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    lines = [json.loads(line) for line in resp.text.strip().split("\n")]
+    assert lines == [
+        {"type": "text", "content": "Async advice."},
+        {"type": "letter", "content": "Dear"},
+        {"type": "end_of_stream"},
+    ]
+    kwargs = mock_async_chat_manager.agenerate_streaming_response.call_args.kwargs
+    assert kwargs["thread_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_query_allowed_origin_gets_cors_headers(client, mock_async_chat_manager):
+    resp = await client.post(
+        "/api/query", json=_BODY, headers={"Origin": "https://tenantfirstaid.com"}
+    )
+    assert resp.headers["access-control-allow-origin"] == "https://tenantfirstaid.com"
+
+
+@pytest.mark.asyncio
+async def test_query_disallowed_origin_no_cors_headers(client, mock_async_chat_manager):
+    resp = await client.post(
+        "/api/query", json=_BODY, headers={"Origin": "https://evil.com"}
+    )
+    assert "access-control-allow-origin" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_query_invalid_body_returns_400(client, mock_async_chat_manager):
+    resp = await client.post("/api/query", content=b"not json")
+    assert resp.status_code == 400
+    mock_async_chat_manager.agenerate_streaming_response.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_query_expired_session_returns_410(
+    client, mock_async_chat_manager, mocker
+):
+    store = _patch_session_store(mocker)
+    store.is_valid_token.return_value = True
+    store.is_active.return_value = False
+
+    resp = await client.post("/api/query", json={**_BODY, "session": "tok"})
+
+    assert resp.status_code == 410
+
+
+@pytest.mark.asyncio
+async def test_query_new_session_returns_token(client, mock_async_chat_manager, mocker):
+    store = _patch_session_store(mocker)
+    store.new_token.return_value = "new-token"
+
+    resp = await client.post("/api/query", json={**_BODY, "session": None})
+
+    assert resp.headers["x-session-token"] == "new-token"
+    kwargs = mock_async_chat_manager.agenerate_streaming_response.call_args.kwargs
+    assert kwargs["thread_id"] == "new-token"
+
+
+@pytest.mark.asyncio
+async def test_session_lookup_runs_off_the_event_loop(
+    client, mock_async_chat_manager, mocker
+):
+    store = _patch_session_store(mocker)
+    store.is_valid_token.return_value = True
+    lookup_threads = []
+    store.is_active.side_effect = lambda _token: (
+        lookup_threads.append(threading.current_thread()) or True
+    )
+
+    await client.post("/api/query", json={**_BODY, "session": "tok"})
+
+    assert lookup_threads and lookup_threads[0] is not threading.main_thread()
+
+
+class _FakeLLM(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@pytest.fixture
+def session_db(tmp_path, mocker):
+    mocker.patch(
+        "tenantfirstaid.sessions.CHAT_SESSION_DB_PATH", str(tmp_path / "s.sqlite")
+    )
+    mocker.patch("tenantfirstaid.sessions._async_session_store", None)
+    yield
+    store = sessions._async_session_store
+    if store is not None:
+        assert isinstance(store.checkpointer, AsyncSqliteSaver)
+        asyncio.run(store.checkpointer.conn.close())
+
+
+@pytest.mark.asyncio
+async def test_session_mode_streams_through_async_checkpointer(
+    client, session_db, mocker
+):
+    answers = iter([AIMessage("First answer."), AIMessage("Second answer.")])
+    mocker.patch(
+        "tenantfirstaid.graph._get_llm", return_value=_FakeLLM(messages=answers)
+    )
+
+    first = await client.post("/api/query", json={**_BODY, "session": None})
+    token = first.headers["x-session-token"]
+    second = await client.post(
+        "/api/query",
+        json={
+            **_BODY,
+            "messages": [{"role": "human", "content": "And then?"}],
+            "session": token,
+        },
+    )
+
+    for resp, answer in ((first, "First answer."), (second, "Second answer.")):
+        assert resp.status_code == 200
+        lines = [json.loads(line) for line in resp.text.strip().split("\n")]
+        assert lines == [{"type": "text", "content": answer}, {"type": "end_of_stream"}]
+    store = await sessions.get_async_session_store()
+    saved = await store.checkpointer.aget_tuple({"configurable": {"thread_id": token}})
+    assert saved is not None
+    assert len(saved.checkpoint["channel_values"]["messages"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_stream_is_cancelled_when_client_disconnects(mocker):
+    first_chunk_sent, stream_closed = asyncio.Event(), asyncio.Event()
+
+    async def endless(*_args, **_kwargs):
+        try:
+            yield {"type": "text", "text": "Partial"}
+            await asyncio.Event().wait()
+        finally:
+            stream_closed.set()
+
+    manager = mocker.patch("tenantfirstaid.asgi.LangChainChatManager", autospec=True)
+    manager.return_value.agenerate_streaming_response.side_effect = endless
+
+    request = [{"type": "http.request", "body": json.dumps(_BODY).encode()}]
+    sent = []
+
+    async def receive():
+        if request:
+            return request.pop()
+        await first_chunk_sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body":
+            first_chunk_sent.set()
+
+    scope = {"type": "http", "method": "POST", "path": "/api/query", "headers": []}
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+    assert stream_closed.is_set()
+    # The end_of_stream chunk is never sent.
+    assert all(m.get("more_body") for m in sent[1:])
+
+
+@pytest.mark.asyncio
+async def test_preflight_is_bridged_to_flask(client):
+    resp = await client.options(
+        "/api/query",
+        headers={
+            "Origin": "https://tenantfirstaid.com",
+            "Access-Control-Request-Method": "POST",
+        },
+    )
+    assert resp.status_code == 200
+    assert resp.headers["access-control-allow-origin"] == "https://tenantfirstaid.com"
+
+
+@pytest.mark.asyncio
+async def test_other_routes_are_bridged_to_flask(client):
+    # GET is not an allowed method on /api/query in the Flask app.
+    resp = await client.get("/api/query?x=1")
+    assert resp.status_code == 405
+
+    resp = await client.get("/does-not-exist")
+    assert resp.status_code == 404
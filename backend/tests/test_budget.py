@@ -0,0 +1,150 @@
+"""Tests for per-request agent budgets (budget.py and graph._BudgetGuard)."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain.agents.middleware.types import ModelRequest, ToolCallRequest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from tenantfirstaid.budget import (
+    BUDGET_EXHAUSTED_NOTE,
+    RequestBudget,
+    current_budget,
+    past_request_deadline,
+    start_request_budget,
+)
+from tenantfirstaid.graph import _BudgetGuard, create_graph, prepare_system_prompt
+from tenantfirstaid.location import UsaState
+
+
+@pytest.fixture(autouse=True)
+def _no_budget():
+    """Budgets live in the test's context; start each test without one."""
+    with patch("tenantfirstaid.budget.REQUEST_BUDGET_ENABLED", False):
+        start_request_budget()
+    yield
+
+
+def _model_request() -> ModelRequest:
+    return ModelRequest(
+        model=MagicMock(), messages=[HumanMessage("hi")], tools=[MagicMock()]
+    )
+
+
+def _tool_request(name: str = "retrieve_city_state_laws") -> ToolCallRequest:
+    return ToolCallRequest(
+        tool_call={"name": name, "args": {}, "id": "call-1"},
+        tool=None,
+        state={},
+        runtime=MagicMock(),
+    )
+
+
+def test_last_model_call_must_answer():
+    budget = RequestBudget(max_model_calls=3)
+    assert [budget.start_model_call() for _ in range(3)] == [False, False, True]
+    assert budget.exhausted_by == "model_calls"
+
+
+def test_tool_calls_stop_at_limit():
+    budget = RequestBudget(max_tool_calls=2)
+    assert [budget.start_tool_call() for _ in range(3)] == [True, True, False]
+    assert budget.tool_calls == 2
+    assert budget.start_model_call()
+    assert budget.exhausted_by == "tool_calls"
+
+
+def test_retrieval_time_and_deadline():
+    budget = RequestBudget(max_retrieval_seconds=5)
+    budget.add_retrieval_time(5.0)
+    assert budget.exhausted()
+    assert budget.exhausted_by == "retrieval_time"
+
+    budget = RequestBudget(deadline_seconds=10, started=0.0)
+    with patch("tenantfirstaid.budget.time.monotonic", return_value=10.0):
+        start_request_budget(budget)
+        assert past_request_deadline()
+        assert not budget.start_tool_call()
+    assert budget.exhausted_by == "deadline"
+
+
+def test_disabled_budget_clears_context():
+    start_request_budget(RequestBudget())
+    with patch("tenantfirstaid.budget.REQUEST_BUDGET_ENABLED", False):
+        assert start_request_budget() is None
+    assert current_budget() is None
+    assert not past_request_deadline()
+
+
+def test_guard_passes_through_without_budget():
+    request, handler = _model_request(), MagicMock()
+    _BudgetGuard().wrap_model_call(request, handler)
+    handler.assert_called_once_with(request)
+
+    tool_request = _tool_request()
+    _BudgetGuard().wrap_tool_call(tool_request, handler)
+    handler.assert_called_with(tool_request)
+
+
+def test_guard_forces_answer_once_exhausted():
+    start_request_budget(RequestBudget(max_model_calls=2))
+    handler = MagicMock()
+    guard = _BudgetGuard()
+
+    guard.wrap_model_call(_model_request(), handler)
+    assert handler.call_args.args[0].tool_choice is None
+    guard.wrap_model_call(_model_request(), handler)
+    sent = handler.call_args.args[0]
+    assert sent.tool_choice == "none"
+    assert sent.messages[-1].content == BUDGET_EXHAUSTED_NOTE
+
+
+def test_guard_blocks_tools_and_records_retrieval_time():
+    budget = RequestBudget(max_tool_calls=1)
+    start_request_budget(budget)
+    handler = MagicMock(return_value=ToolMessage("passages", tool_call_id="call-1"))
+    guard = _BudgetGuard()
+
+    with patch("tenantfirstaid.graph.time") as mock_time:
+        mock_time.monotonic.side_effect = [0.0, 2.5]
+        assert guard.wrap_tool_call(_tool_request(), handler).content == "passages"
+    assert budget.retrieval_seconds == 2.5
+
+    blocked = guard.wrap_tool_call(_tool_request(), handler)
+    assert blocked.content == BUDGET_EXHAUSTED_NOTE
+    assert blocked.status == "error"
+    assert handler.call_count == 1
+
+
+class _ToolLoopLLM(GenericFakeChatModel):
+    """Fake model that keeps asking for sections until it may not use tools."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@patch("tenantfirstaid.graph._get_llm")
+def test_agent_answers_after_tool_budget(mock_get_llm):
+    lookup = {"name": "lookup_ors_section", "args": {"citations": "ORS 90.100"}}
+    mock_get_llm.return_value = _ToolLoopLLM(
+        messages=iter(
+            [AIMessage("", tool_calls=[{**lookup, "id": f"c{i}"}]) for i in range(3)]
+            + [AIMessage("Here is what I found.")]
+        )
+    )
+    state = UsaState.OREGON
+    agent = create_graph(system_prompt=prepare_system_prompt(None, state))
+    budget = RequestBudget(max_tool_calls=2)
+    start_request_budget(budget)
+
+    result = agent.invoke({"messages": [HumanMessage("Help")], "state": state})
+
+    tool_results = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+    assert [m.content == BUDGET_EXHAUSTED_NOTE for m in tool_results] == [
+        False,
+        False,
+        True,
+    ]
+    assert result["messages"][-1].content == "Here is what I found."
+    assert budget.summary().endswith("exhausted_by=tool_calls")
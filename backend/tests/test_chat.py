@@ -1,87 +1,82 @@
 import json
+from typing import cast
 
-from tenantfirstaid.chat import ChatView, _classify_blocks
-from tenantfirstaid.schema import EndOfStreamChunk
+import pytest
+from langchain_core.messages import ContentBlock
 
+from tenantfirstaid.chat import (
+    SESSION_TOKEN_HEADER,
+    ChatView,
+    parse_chat_request,
+)
+from tenantfirstaid.schema import (
+    EndOfStreamChunk,
+    LetterChunk,
+    ReasoningChunk,
+    TextChunk,
+)
+from tenantfirstaid.stream_encoding import encode_block
 
-def text_block(text: str) -> dict:
+
+def text_block(text: str) -> ContentBlock:
     return {"type": "text", "text": text}
 
 
-def reasoning_block(reasoning: str) -> dict:
+def reasoning_block(reasoning: str) -> ContentBlock:
     return {"type": "reasoning", "reasoning": reasoning}
 
 
-def letter_block(content: str) -> dict:
+def letter_block(content: str) -> ContentBlock:
     return {"type": "non_standard", "value": {"type": "letter", "content": content}}
 
 
-def chunks(blocks):
-    return list(_classify_blocks(iter(blocks)))
+def chunks(blocks: list[ContentBlock]) -> list[dict]:
+    """Decode the NDJSON lines the chat stream sends for `blocks`."""
+    lines = (encode_block(block) for block in blocks)
+    return [json.loads(line) for line in lines if line is not None]
 
 
-class TestClassifyBlocks:
+class TestEncodeBlocks:
     def test_plain_text_passthrough(self):
         result = chunks([text_block("Here is some advice.")])
-        assert len(result) == 1
-        assert result[0].type == "text"
-        assert result[0].content == "Here is some advice."
+        assert result == [{"type": "text", "content": "Here is some advice."}]
 
     def test_reasoning_passthrough(self):
         result = chunks([reasoning_block("Let me think.")])
-        assert len(result) == 1
-        assert result[0].type == "reasoning"
-        assert result[0].content == "Let me think."
-
-    def test_non_standard_letter_block_routed_correctly(self, app):
-        with app.app_context():
-            result = chunks(
-                [
-                    {
-                        "type": "non_standard",
-                        "value": {"type": "letter", "content": "Dear Landlord,"},
-                    }
-                ]
-            )
-        assert len(result) == 1
-        assert result[0].type == "letter"
-        assert result[0].content == "Dear Landlord,"
-
-    def test_non_standard_unknown_inner_type_is_skipped(self, app):
-        with app.app_context():
-            result = chunks(
-                [
-                    {
-                        "type": "non_standard",
-                        "value": {"type": "citation", "content": "..."},
-                    }
-                ]
-            )
+        assert result == [{"type": "reasoning", "content": "Let me think."}]
+
+    def test_non_standard_letter_block_routed_correctly(self):
+        result = chunks([letter_block("Dear Landlord,")])
+        assert result == [{"type": "letter", "content": "Dear Landlord,"}]
+
+    def test_non_standard_unknown_inner_type_is_skipped(self):
+        result = chunks(
+            [
+                {
+                    "type": "non_standard",
+                    "value": {"type": "citation", "content": "..."},
+                }
+            ]
+        )
         assert result == []
 
-    def test_unknown_block_type_is_skipped(self, app):
-        with app.app_context():
-            result = chunks([{"type": "image", "image": "..."}])
+    def test_unknown_block_type_is_skipped(self):
+        result = chunks([{"type": "image", "url": "https://example.com/a.png"}])
         assert result == []
 
     def test_empty_content_text(self):
         result = chunks([text_block("")])
-        assert len(result) == 1
-        assert result[0].content == ""
+        assert result == [{"type": "text", "content": ""}]
 
-    def test_mixed_block_stream(self, app):
+    def test_mixed_block_stream(self):
         blocks = [
             text_block("Hello"),
             reasoning_block("Thinking..."),
             letter_block("Dear Landlord,"),
-            {"type": "unknown_widget", "data": "???"},
+            cast(ContentBlock, {"type": "unknown_widget", "data": "???"}),
         ]
-        with app.app_context():
-            result = chunks(blocks)
-        assert len(result) == 3
-        assert result[0].type == "text"
-        assert result[1].type == "reasoning"
-        assert result[2].type == "letter"
+        result = chunks(blocks)
+        assert [chunk["type"] for chunk in result] == ["text", "reasoning", "letter"]
 
 
 class TestDispatchRequest:
@@ -109,6 +104,27 @@ class TestDispatchRequest:
         lines = resp.data.decode().strip().split("\n")
         assert len(lines) >= 1
 
+    def test_wire_format_matches_schema(self, app, mock_chat_manager):
+        mock_chat_manager.generate_streaming_response.return_value = iter(
+            [text_block('Say "no".\n'), reasoning_block("Hmm"), letter_block("Dear")]
+        )
+        app.add_url_rule(
+            "/api/query", view_func=ChatView.as_view("chat_wire"), methods=["POST"]
+        )
+        with app.test_client() as client:
+            response = client.post(
+                "/api/query", json={"messages": [], "city": None, "state": "or"}
+            )
+        expected = [
+            TextChunk(content='Say "no".\n'),
+            ReasoningChunk(content="Hmm"),
+            LetterChunk(content="Dear"),
+            EndOfStreamChunk(),
+        ]
+        assert response.data == "".join(
+            m.model_dump_json() + "\n" for m in expected
+        ).encode("utf-8")
+
     def test_generate_yields_done_chunk_last(self, app, mock_chat_manager):
         app.add_url_rule(
             "/api/query",
@@ -127,3 +143,119 @@ class TestDispatchRequest:
         assert response.status_code == 200
         lines = [line for line in response.data.decode().strip().split("\n") if line]
         assert json.loads(lines[-1]) == {"type": "end_of_stream"}
+
+    def test_done_chunk_carries_server_timing_when_enabled(
+        self, app, mock_chat_manager, mocker
+    ):
+        mocker.patch("tenantfirstaid.metrics.METRICS_ENABLED", True)
+        app.add_url_rule(
+            "/api/query",
+            view_func=ChatView.as_view("chat_timing"),
+            methods=["POST"],
+        )
+        with app.test_client() as client:
+            response = client.post(
+                "/api/query",
+                json={"messages": [], "city": None, "state": "or"},
+            )
+        lines = [line for line in response.data.decode().strip().split("\n") if line]
+        done = json.loads(lines[-1])
+        assert done["type"] == "end_of_stream"
+        assert "parse;dur=" in done["server_timing"]
+        assert "serialize;dur=" in done["server_timing"]
+
+
+class TestSessionMode:
+    @pytest.fixture
+    def session_client(self, app):
+        app.add_url_rule(
+            "/api/query", view_func=ChatView.as_view("chat"), methods=["POST"]
+        )
+        return app.test_client()
+
+    @pytest.fixture
+    def store(self, mocker):
+        store = mocker.patch("tenantfirstaid.chat.get_session_store").return_value
+        store.new_token.return_value = "new-token"
+        return store
+
+    def _post(self, client, session, messages):
+        return client.post(
+            "/api/query",
+            json={
+                "messages": messages,
+                "city": None,
+                "state": "or",
+                "session": session,
+            },
+        )
+
+    def test_null_session_starts_new_session(
+        self, session_client, store, mock_chat_manager, mocker
+    ):
+        cm_cls = mocker.patch("tenantfirstaid.chat.LangChainChatManager")
+        cm_cls.return_value = mock_chat_manager
+
+        resp = self._post(session_client, None, [{"role": "human", "content": "Hi"}])
+
+        assert resp.status_code == 200
+        assert resp.headers[SESSION_TOKEN_HEADER] == "new-token"
+        cm_cls.assert_called_with(checkpointer=store.checkpointer)
+        kwargs = mock_chat_manager.generate_streaming_response.call_args.kwargs
+        assert kwargs["thread_id"] == "new-token"
+        assert "id" in kwargs["messages"][0]
+
+    def test_active_session_resumes_thread(
+        self, session_client, store, mock_chat_manager
+    ):
+        store.is_valid_token.return_value = True
+        store.is_active.return_value = True
+
+        resp = self._post(session_client, "tok", [{"role": "human", "content": "More"}])
+
+        assert resp.status_code == 200
+        assert resp.headers[SESSION_TOKEN_HEADER] == "tok"
+        kwargs = mock_chat_manager.generate_streaming_response.call_args.kwargs
+        assert kwargs["thread_id"] == "tok"
+
+    def test_expired_session_returns_410(
+        self, session_client, store, mock_chat_manager
+    ):
+        store.is_valid_token.return_value = True
+        store.is_active.return_value = False
+
+        resp = self._post(session_client, "tok", [{"role": "human", "content": "More"}])
+
+        assert resp.status_code == 410
+        mock_chat_manager.generate_streaming_response.assert_not_called()
+
+    def test_stateless_mode_has_no_session_header(
+        self, session_client, mock_chat_manager
+    ):
+        resp = session_client.post(
+            "/api/query",
+            json={"messages": [], "city": None, "state": "or"},
+        )
+        assert SESSION_TOKEN_HEADER not in resp.headers
+        kwargs = mock_chat_manager.generate_streaming_response.call_args.kwargs
+        assert kwargs["thread_id"] is None
+
+
+class TestStreamDeltas:
+    @pytest.mark.parametrize(
+        "body_value, expected", [(True, True), (False, False), ("yes", False)]
+    )
+    def test_parse_stream_deltas_flag(self, body_value, expected):
+        chat_request = parse_chat_request(
+            {
+                "messages": [],
+                "city": None,
+                "state": "or",
+                "stream_deltas": body_value,
+            }
+        )
+        assert chat_request.stream_deltas is expected
+
+    def test_default_is_whole_message_streaming(self):
+        chat_request = parse_chat_request({"messages": [], "city": None, "state": "or"})
+        assert chat_request.stream_deltas is False
@@ -1,6 +1,8 @@
 """Tests for scripts.create_datastore_gcs."""
 
 import contextlib
+import json
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -17,7 +19,9 @@ from scripts.create_datastore_gcs import (
     create_datastore,
     delete_datastore,
     import_documents,
+    load_pending_documents,
     main,
+    run_incremental_import,
 )
 from scripts.shared import collection_path
 
@@ -175,6 +179,105 @@ class TestImportDocuments:
         )
 
 
+def _pending_tree(
+    tmp_path: Path, upsert: list[str], delete: list[str], bucket: str = "my-bucket"
+) -> Path:
+    with (tmp_path / "metadata.jsonl").open("w") as f:
+        for doc_id in ["ORS090", "ORS105", "PCC30.01"]:
+            entry = {
+                "id": doc_id,
+                "structData": {"city": None, "state": "or"},
+                "content": {
+                    "mimeType": "text/plain",
+                    "uri": f"gs://{bucket}/{doc_id}.txt",
+                },
+            }
+            f.write(json.dumps(entry) + "\n")
+    (tmp_path / "pending_import.json").write_text(
+        json.dumps({"upsert": upsert, "delete": delete})
+    )
+    return tmp_path
+
+
+class TestIncrementalImport:
+    def test_loads_only_pending_documents(self, tmp_path: Path):
+        _pending_tree(tmp_path, ["PCC30.01"], ["ORS091"])
+        documents, to_delete = load_pending_documents(tmp_path, "my-bucket")
+        assert [d.id for d in documents] == ["PCC30.01"]
+        assert to_delete == ["ORS091"]
+
+    def test_pending_document_missing_from_metadata_raises(self, tmp_path: Path):
+        _pending_tree(tmp_path, ["EHC8"], [])
+        with pytest.raises(DatastoreError, match="EHC8"):
+            load_pending_documents(tmp_path, "my-bucket")
+
+    def test_pending_document_in_other_bucket_raises(self, tmp_path: Path):
+        _pending_tree(tmp_path, ["ORS090"], [], bucket="old-bucket")
+        with pytest.raises(DatastoreError, match="do not point at"):
+            load_pending_documents(tmp_path, "my-bucket")
+
+    def test_upserts_inline_deletes_and_clears_pending(self, tmp_path: Path):
+        _pending_tree(tmp_path, ["ORS090", "PCC30.01"], ["ORS091"])
+        client = _doc_client(success=2)
+
+        run_incremental_import(
+            client, "p", "global", "my-ds", "my-bucket", tmp_path, wait=True
+        )
+
+        request = client.import_documents.call_args.kwargs["request"]
+        assert request.parent == _branch_path("p", "global", "my-ds")
+        assert [d.id for d in request.inline_source.documents] == [
+            "ORS090",
+            "PCC30.01",
+        ]
+        assert (
+            request.reconciliation_mode
+            == discoveryengine.ImportDocumentsRequest.ReconciliationMode.INCREMENTAL
+        )
+        client.delete_document.assert_called_once_with(
+            name=f"{_branch_path('p', 'global', 'my-ds')}/documents/ORS091"
+        )
+        pending = json.loads((tmp_path / "pending_import.json").read_text())
+        assert pending == {"upsert": [], "delete": []}
+
+    def test_invalidates_cached_retrievals_after_import(self, tmp_path: Path):
+        _pending_tree(tmp_path, ["ORS090"], [])
+        with patch(
+            "scripts.create_datastore_gcs.RETRIEVAL_CACHE.invalidate_datastore"
+        ) as invalidate:
+            run_incremental_import(
+                _doc_client(success=1),
+                "p",
+                "global",
+                "my-ds",
+                "my-bucket",
+                tmp_path,
+                wait=True,
+            )
+        invalidate.assert_called_once_with("my-ds")
+
+    def test_failed_documents_keep_pending(self, tmp_path: Path):
+        _pending_tree(tmp_path, ["ORS090"], [])
+        err = MagicMock()
+        err.message = "bad doc"
+        client = _doc_client(success=0, failure=1, error_samples=[err])
+
+        with pytest.raises(DatastoreError, match="bad doc"):
+            run_incremental_import(
+                client, "p", "global", "my-ds", "my-bucket", tmp_path, wait=True
+            )
+
+        pending = json.loads((tmp_path / "pending_import.json").read_text())
+        assert pending["upsert"] == ["ORS090"]
+
+    def test_nothing_pending_makes_no_calls(self, tmp_path: Path):
+        client = MagicMock()
+        run_incremental_import(
+            client, "p", "global", "my-ds", "my-bucket", tmp_path, wait=True
+        )
+        client.import_documents.assert_not_called()
+
+
 class TestDeleteDatastore:
     def test_calls_delete_and_waits(self):
         client = MagicMock()
@@ -310,3 +413,23 @@ class TestMain:
         err = capsys.readouterr().err
         assert "Rollback failed" in err
         assert _DEFAULT_DS_NAME in err
+
+    def test_incremental_skips_datastore_creation(self, tmp_path: Path):
+        _pending_tree(tmp_path, ["ORS090"], [])
+        ds_client = MagicMock()
+        doc_client = _doc_client(success=1)
+
+        with self._patched_main(
+            ds_client,
+            doc_client,
+            argv=[
+                *self._ARGV_BASE,
+                "--incremental",
+                "--documents-dir",
+                str(tmp_path),
+            ],
+        ):
+            main()
+
+        ds_client.create_data_store.assert_not_called()
+        doc_client.import_documents.assert_called_once()
@@ -4,14 +4,43 @@ from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from hypothesis import given
+from hypothesis import strategies as st
 
 from scripts.enforce_ascii import (
+    ASCII_REPLACEMENTS,
     InvalidUtf8Error,
     UnrecognizedAsciiError,
+    _apply_ascii_replacements,
+    _iter_ascii_replacements,
     enforce_ascii,
     validate_and_rewrite_tree,
 )
 
+_REPLACEMENT_ALPHABET = st.sampled_from(
+    ["§", " ", "\n", "a", "9", "é"] + [orig for orig, _ in ASCII_REPLACEMENTS]
+)
+
+
+class TestReplacements:
+    def test_every_table_entry_applied(self):
+        text = "".join(orig for orig, _ in ASCII_REPLACEMENTS)
+        assert _apply_ascii_replacements(text) == "".join(
+            repl for _, repl in ASCII_REPLACEMENTS
+        )
+
+    def test_mixed_section_signs(self):
+        assert _apply_ascii_replacements("§§§ 1 § §2") == (
+            "Sections Section 1 Section Section 2"
+        )
+
+    @pytest.mark.property
+    @given(st.lists(st.text(alphabet=_REPLACEMENT_ALPHABET, max_size=12), max_size=8))
+    def test_chunked_matches_whole_text(self, chunks: list[str]):
+        assert "".join(_iter_ascii_replacements(chunks)) == (
+            _apply_ascii_replacements("".join(chunks))
+        )
+
 
 class TestEnforceAscii:
     def test_already_ascii_is_unchanged(self, tmp_path: Path):
@@ -119,6 +148,35 @@ class TestValidateAndRewriteTree:
         assert "A.txt" in err
         assert "B.txt" in err
 
+    def test_process_pool_matches_serial(self, tmp_path: Path):
+        for i in range(10):
+            (tmp_path / f"f{i}.txt").write_text(f"Chapter {i} — Rights", "utf-8")
+        (tmp_path / "bad.txt").write_text("café", encoding="utf-8")
+        with pytest.raises(RuntimeError, match="1 file\\(s\\) failed"):
+            validate_and_rewrite_tree(tmp_path, workers=2)
+        assert (tmp_path / "f7.txt").read_text(encoding="ascii") == (
+            "Chapter 7 -- Rights"
+        )
+
+    def test_large_files_are_streamed(self, tmp_path: Path):
+        text = "See §\n\n90.100 — “quoted” " * 50
+        (tmp_path / "a.txt").write_text(text, encoding="utf-8")
+        (tmp_path / "b.txt").write_text(text + "café", encoding="utf-8")
+        with (
+            patch("scripts.enforce_ascii.STREAM_THRESHOLD_BYTES", 0),
+            patch("scripts.enforce_ascii._STREAM_CHUNK_CHARS", 7),
+        ):
+            with pytest.raises(RuntimeError, match="1 file\\(s\\) with issues"):
+                validate_and_rewrite_tree(tmp_path, check_only=True)
+            assert (tmp_path / "a.txt").read_text(encoding="utf-8") == text
+            with pytest.raises(RuntimeError, match="failed ASCII validation"):
+                validate_and_rewrite_tree(tmp_path)
+
+        expected = _apply_ascii_replacements(text)
+        assert (tmp_path / "a.txt").read_text(encoding="ascii") == expected
+        assert (tmp_path / "b.txt").read_text(encoding="utf-8") == expected + "café"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["a.txt", "b.txt"]
+
 
 class TestMain:
     def test_check_flag_validates_only(
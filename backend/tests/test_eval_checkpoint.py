@@ -0,0 +1,161 @@
+"""Tests for resumable evaluation runs (evaluate/eval_checkpoint.py)."""
+
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+from google.genai import errors as genai_errors
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
+
+from evaluate.eval_checkpoint import CheckpointRow, EvalCheckpoint, row_from_result
+from evaluate.run_langsmith_evaluation import (
+    _is_rate_limited,
+    _run_with_checkpoint,
+    run_evaluation,
+)
+
+
+def _example(query: str, scenario_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(), inputs={"query": query}, metadata={"scenario_id": scenario_id}
+    )
+
+
+def _result(example, score: float = 1.0, error=None) -> dict:
+    return {
+        "run": SimpleNamespace(error=error),
+        "example": example,
+        "evaluation_results": {
+            "results": [SimpleNamespace(key="tone", score=score)],
+        },
+    }
+
+
+def _row(result: dict) -> CheckpointRow:
+    row = row_from_result(result)
+    assert row is not None
+    return row
+
+
+def test_new_checkpoint_round_trip(tmp_path: Path):
+    path = tmp_path / "run.jsonl"
+    cp = EvalCheckpoint.open(path, "ds", num_repetitions=2)
+    assert cp.experiment_name is None
+    cp.start("tfa-123")
+    cp.record(CheckpointRow("a", "q", {"tone": 1.0}, scenario_id=3))
+
+    resumed = EvalCheckpoint.open(path, "ds", num_repetitions=2)
+    assert resumed.experiment_name == "tfa-123"
+    assert resumed.rows == cp.rows
+    assert resumed.remaining(["a", "b"]) == {"a": 1, "b": 2}
+
+
+def test_start_does_not_overwrite_resumed_checkpoint(tmp_path: Path):
+    path = tmp_path / "run.jsonl"
+    cp = EvalCheckpoint.open(path, "ds", 1)
+    cp.start("first")
+    cp.record(CheckpointRow("a", "q", {"tone": 1.0}))
+
+    resumed = EvalCheckpoint.open(path, "ds", 1)
+    resumed.start("second")
+    assert EvalCheckpoint.open(path, "ds", 1).experiment_name == "first"
+    assert len(EvalCheckpoint.open(path, "ds", 1).rows) == 1
+
+
+def test_mismatched_checkpoint_rejected(tmp_path: Path):
+    path = tmp_path / "run.jsonl"
+    EvalCheckpoint.open(path, "ds", 1).start("x")
+    with pytest.raises(ValueError, match="delete it to start over"):
+        EvalCheckpoint.open(path, "other", 1)
+
+
+def test_scenario_results_group_and_sort(tmp_path: Path):
+    cp = EvalCheckpoint(tmp_path / "run.jsonl", "ds", 2)
+    cp.rows = [
+        CheckpointRow("b", "second", {"tone": 0.0}, scenario_id=2),
+        CheckpointRow("a", "first", {"tone": 1.0}, scenario_id=1),
+        CheckpointRow("b", "second", {"tone": 1.0}, scenario_id=2),
+    ]
+    scenarios = cp.scenario_results()
+    assert [s.scenario_id for s in scenarios] == [1, 2]
+    assert scenarios[1].scores == {"tone": [0.0, 1.0]}
+    assert cp.mean_scores() == {"tone": pytest.approx(2 / 3)}
+
+
+def test_row_from_result_skips_errors():
+    ex = _example("q", 4)
+    assert row_from_result(_result(ex, error="boom")) is None
+    row = row_from_result(_result(ex, score=0.5))
+    assert row == CheckpointRow(str(ex.id), "q", {"tone": 0.5}, scenario_id=4)
+
+
+def test_run_evaluation_resumes_missing_runs(tmp_path: Path):
+    done, todo = _example("done", 1), _example("todo", 2)
+    path = tmp_path / "run.jsonl"
+    cp = EvalCheckpoint.open(path, "ds", 2)
+    cp.start("tfa-existing")
+    for _ in range(2):
+        cp.record(_row(_result(done)))
+    cp.record(_row(_result(todo)))
+
+    client = MagicMock()
+    client.list_examples.return_value = [done, todo]
+    results = MagicMock()
+    results.experiment_name = "tfa-existing"
+    results.__iter__.return_value = iter([_result(todo, score=0.0)])
+
+    with (
+        patch("evaluate.run_langsmith_evaluation.Client", return_value=client),
+        patch(
+            "evaluate.run_langsmith_evaluation.evaluate", return_value=results
+        ) as mock_evaluate,
+    ):
+        run_evaluation(
+            dataset_name="ds",
+            num_repetitions=2,
+            max_concurrency=4,
+            checkpoint_path=path,
+        )
+
+    kwargs = mock_evaluate.call_args.kwargs
+    assert kwargs["data"] == [todo]
+    assert kwargs["experiment"] == "tfa-existing"
+    # langsmith rejects an experiment together with an experiment_prefix.
+    assert "experiment_prefix" not in kwargs
+    assert kwargs["max_concurrency"] == 4
+    assert EvalCheckpoint.open(path, "ds", 2).remaining([str(todo.id)]) == {}
+
+
+def test_run_with_checkpoint_nothing_left(tmp_path: Path):
+    ex = _example("q", 1)
+    cp = EvalCheckpoint.open(tmp_path / "run.jsonl", "ds", 1)
+    cp.start("tfa-done")
+    cp.record(_row(_result(ex)))
+    client = MagicMock()
+    client.list_examples.return_value = [ex]
+
+    with patch("evaluate.run_langsmith_evaluation.evaluate") as mock_evaluate:
+        _run_with_checkpoint(client, "ds", cp)
+
+    mock_evaluate.assert_not_called()
+
+
+def test_rate_limit_detected_through_gemini_wrapper():
+    quota = genai_errors.ClientError(
+        429, {"error": {"message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+    )
+    try:
+        try:
+            raise quota
+        except genai_errors.ClientError as e:
+            raise ChatGoogleGenerativeAIError("Error calling model") from e
+    except ChatGoogleGenerativeAIError as wrapped:
+        assert _is_rate_limited(wrapped)
+
+    assert _is_rate_limited(google_exceptions.ResourceExhausted("quota"))
+    bad_request = genai_errors.ClientError(400, {"error": {"message": "bad"}})
+    assert not _is_rate_limited(ChatGoogleGenerativeAIError("x"))
+    assert not _is_rate_limited(bad_request)
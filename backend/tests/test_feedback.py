@@ -1,13 +1,42 @@
 """Tests for feedback email and PDF conversion."""
 
 import io
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
 from flask import Flask
 from xhtml2pdf.context import pisaContext
 
-from tenantfirstaid.feedback import convert_html_to_pdf, send_feedback
+from tenantfirstaid.feedback import (
+    FEEDBACK_QUEUE,
+    MAX_TRANSCRIPT_HTML_SIZE,
+    FeedbackJob,
+    FeedbackQueue,
+    convert_html_to_pdf,
+    render_pdf,
+    send_feedback,
+)
+
+
+@pytest.fixture(autouse=True)
+def _drain_feedback_queue():
+    yield
+    FEEDBACK_QUEUE.join()
+
+
+@pytest.fixture
+def submitted(mocker) -> MagicMock:
+    """Spy on FEEDBACK_QUEUE.submit to get hold of the jobs send_feedback queues."""
+    return mocker.spy(FEEDBACK_QUEUE, "submit")
+
+
+def _finished(submitted: MagicMock, body: object) -> FeedbackJob:
+    """Wait for the job that send_feedback queued for a 202 response body."""
+    job: FeedbackJob = submitted.spy_return
+    assert body == {"job_id": job.id}
+    assert job.done.wait(5)
+    return job
 
 
 @pytest.fixture
@@ -25,68 +54,101 @@ def feedback_app():
 
 
 class TestConvertHtmlToPdf:
-    @patch("tenantfirstaid.feedback.pisa")
-    def test_valid_html_returns_bytes(self, mock_pisa):
+    @patch("xhtml2pdf.pisa.CreatePDF")
+    def test_valid_html_returns_bytes(self, mock_create_pdf):
         mock_status = MagicMock()
         mock_status.err = 0
-        mock_pisa.CreatePDF.return_value = mock_status
+        mock_create_pdf.return_value = mock_status
 
         result = convert_html_to_pdf("<html><body>Hello</body></html>")
         assert isinstance(result, bytes)
 
-    @patch("tenantfirstaid.feedback.pisa")
-    def test_pisa_error_returns_none(self, mock_pisa):
+    @patch("xhtml2pdf.pisa.CreatePDF")
+    def test_pisa_error_returns_none(self, mock_create_pdf):
         mock_status = MagicMock(spec=pisaContext)
         mock_status.err = 1
-        mock_pisa.CreatePDF.return_value = mock_status
+        mock_create_pdf.return_value = mock_status
 
         result = convert_html_to_pdf("<html><body>Bad</body></html>")
         assert result is None
 
 
+class TestRenderPdf:
+    def test_renders_in_child_process(self):
+        pdf = render_pdf("<html><body>Chat log</body></html>")
+        assert pdf is not None and pdf.startswith(b"%PDF")
+
+    def test_timeout_returns_none(self):
+        assert render_pdf("<html><body>Chat log</body></html>", timeout=0) is None
+
+
 class TestSendFeedbackSimple:
     """Tests for feedback without transcript attachment."""
 
     @patch("tenantfirstaid.feedback.EmailMessage")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_simple_feedback_sends_email(self, mock_email_cls, feedback_app):
+    def test_simple_feedback_queues_email(
+        self, mock_email_cls, feedback_app, submitted
+    ):
         with feedback_app.test_request_context(
             "/api/feedback",
             method="POST",
             data={"name": "Jane", "subject": "Bug", "feedback": "Broken page"},
         ):
-            msg, status = send_feedback()
-        assert status == 200
-        assert msg == "Message sent"
+            body, status = send_feedback()
+        assert status == 202
+        job = _finished(submitted, body)
+        assert (job.status, job.attempts) == ("sent", 1)
         mock_email_cls.return_value.send.assert_called_once()
 
     @patch("tenantfirstaid.feedback.EmailMessage")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
     def test_simple_feedback_without_subject_uses_default(
-        self, mock_email_cls, feedback_app
+        self, mock_email_cls, feedback_app, submitted
     ):
         with feedback_app.test_request_context(
             "/api/feedback",
             method="POST",
             data={"name": "Jane", "feedback": "Broken page"},
         ):
-            msg, status = send_feedback()
-        assert status == 200
+            body, status = send_feedback()
+        assert status == 202
+        _finished(submitted, body)
         call_kwargs = mock_email_cls.call_args[1]
         assert call_kwargs["subject"] == "Homepage Feedback"
 
+    @patch("tenantfirstaid.feedback.FEEDBACK_SEND_RETRY_SECONDS", 0)
     @patch("tenantfirstaid.feedback.EmailMessage")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_email_failure_returns_500(self, mock_email_cls, feedback_app):
+    def test_email_failure_is_retried_then_reported(
+        self, mock_email_cls, feedback_app, submitted
+    ):
         mock_email_cls.return_value.send.side_effect = Exception("SMTP down")
         with feedback_app.test_request_context(
             "/api/feedback",
             method="POST",
             data={"name": "Jane", "subject": "Bug", "feedback": "Help"},
         ):
-            msg, status = send_feedback()
-        assert status == 500
-        assert "SMTP down" in msg
+            body, _ = send_feedback()
+        job = _finished(submitted, body)
+        assert (job.status, job.attempts) == ("failed", 3)
+        assert job.error is not None and "SMTP down" in job.error
+
+    @patch("tenantfirstaid.feedback.FEEDBACK_SEND_RETRY_SECONDS", 0)
+    @patch("tenantfirstaid.feedback.EmailMessage")
+    @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
+    def test_transient_email_failure_succeeds_on_retry(
+        self, mock_email_cls, feedback_app, submitted
+    ):
+        mock_email_cls.return_value.send.side_effect = [Exception("timeout"), 1]
+        with feedback_app.test_request_context(
+            "/api/feedback",
+            method="POST",
+            data={"name": "Jane", "subject": "Bug", "feedback": "Help"},
+        ):
+            body, _ = send_feedback()
+        job = _finished(submitted, body)
+        assert (job.status, job.attempts) == ("sent", 2)
 
 
 class TestSendFeedbackWithTranscript:
@@ -96,35 +158,69 @@ class TestSendFeedbackWithTranscript:
         return (io.BytesIO(content.encode("utf-8")), "transcript.html")
 
     @patch("tenantfirstaid.feedback.EmailMessage")
-    @patch("tenantfirstaid.feedback.convert_html_to_pdf", return_value=b"%PDF-fake")
+    @patch("tenantfirstaid.feedback.render_pdf", return_value=b"%PDF-fake")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_transcript_happy_path(self, mock_pdf, mock_email_cls, feedback_app):
+    def test_transcript_happy_path(
+        self, mock_pdf, mock_email_cls, feedback_app, submitted
+    ):
         with feedback_app.test_request_context(
             "/api/feedback",
             method="POST",
             data={"feedback": "Great chat", "transcript": self._make_file()},
             content_type="multipart/form-data",
         ):
-            msg, status = send_feedback()
-        assert status == 200
-        mock_email_cls.return_value.attach.assert_called_once()
+            body, status = send_feedback()
+        assert status == 202
+        job = _finished(submitted, body)
+        assert job.status == "sent"
+        assert job.transcript_html is None
+        mock_pdf.assert_called_once_with("<html><body>Chat log</body></html>")
+        mock_email_cls.return_value.attach.assert_called_once_with(
+            "transcript.pdf", b"%PDF-fake", "application/pdf"
+        )
 
-    @patch("tenantfirstaid.feedback.convert_html_to_pdf", return_value=None)
+    @patch("tenantfirstaid.feedback.EmailMessage")
+    @patch("tenantfirstaid.feedback.render_pdf", return_value=None)
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_pdf_conversion_failure_returns_500(self, mock_pdf, feedback_app):
+    def test_pdf_conversion_failure_fails_job(
+        self, mock_pdf, mock_email_cls, feedback_app, submitted
+    ):
         with feedback_app.test_request_context(
             "/api/feedback",
             method="POST",
             data={"feedback": "Chat", "transcript": self._make_file()},
             content_type="multipart/form-data",
+        ):
+            body, _ = send_feedback()
+        job = _finished(submitted, body)
+        assert (job.status, job.error) == ("failed", "PDF conversion failed")
+        mock_email_cls.assert_not_called()
+
+    @patch("tenantfirstaid.feedback.render_pdf")
+    @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
+    def test_oversized_transcript_returns_413_before_rendering(
+        self, mock_pdf, feedback_app
+    ):
+        with feedback_app.test_request_context(
+            "/api/feedback",
+            method="POST",
+            data={
+                "feedback": "Chat",
+                "transcript": self._make_file("x" * (MAX_TRANSCRIPT_HTML_SIZE + 1)),
+            },
+            content_type="multipart/form-data",
         ):
             msg, status = send_feedback()
-        assert status == 500
-        assert "PDF" in msg
+        assert status == 413
+        assert isinstance(msg, str) and "large" in msg.lower()
+        mock_pdf.assert_not_called()
 
-    @patch("tenantfirstaid.feedback.convert_html_to_pdf")
+    @patch("tenantfirstaid.feedback.EmailMessage")
+    @patch("tenantfirstaid.feedback.render_pdf")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_oversized_attachment_returns_413(self, mock_pdf, feedback_app):
+    def test_oversized_pdf_fails_job(
+        self, mock_pdf, mock_email_cls, feedback_app, submitted
+    ):
         mock_pdf.return_value = b"x" * (2 * 1024 * 1024 + 1)
         with feedback_app.test_request_context(
             "/api/feedback",
@@ -132,14 +228,17 @@ class TestSendFeedbackWithTranscript:
             data={"feedback": "Chat", "transcript": self._make_file()},
             content_type="multipart/form-data",
         ):
-            msg, status = send_feedback()
-        assert status == 413
-        assert "large" in msg.lower()
+            body, _ = send_feedback()
+        job = _finished(submitted, body)
+        assert (job.status, job.error) == ("failed", "Attachment too large")
+        mock_email_cls.assert_not_called()
 
     @patch("tenantfirstaid.feedback.EmailMessage")
-    @patch("tenantfirstaid.feedback.convert_html_to_pdf", return_value=b"%PDF-fake")
+    @patch("tenantfirstaid.feedback.render_pdf", return_value=b"%PDF-fake")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_cc_recipients_parsed(self, mock_pdf, mock_email_cls, feedback_app):
+    def test_cc_recipients_parsed(
+        self, mock_pdf, mock_email_cls, feedback_app, submitted
+    ):
         with feedback_app.test_request_context(
             "/api/feedback",
             method="POST",
@@ -150,15 +249,18 @@ class TestSendFeedbackWithTranscript:
             },
             content_type="multipart/form-data",
         ):
-            msg, status = send_feedback()
-        assert status == 200
+            body, status = send_feedback()
+        assert status == 202
+        _finished(submitted, body)
         call_kwargs = mock_email_cls.call_args[1]
         assert call_kwargs["cc"] == ["a@b.com", "c@d.com"]
 
     @patch("tenantfirstaid.feedback.EmailMessage")
-    @patch("tenantfirstaid.feedback.convert_html_to_pdf", return_value=b"%PDF-fake")
+    @patch("tenantfirstaid.feedback.render_pdf", return_value=b"%PDF-fake")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_cc_empty_strings_filtered(self, mock_pdf, mock_email_cls, feedback_app):
+    def test_cc_empty_strings_filtered(
+        self, mock_pdf, mock_email_cls, feedback_app, submitted
+    ):
         with feedback_app.test_request_context(
             "/api/feedback",
             method="POST",
@@ -169,24 +271,35 @@ class TestSendFeedbackWithTranscript:
             },
             content_type="multipart/form-data",
         ):
-            msg, status = send_feedback()
-        assert status == 200
+            body, status = send_feedback()
+        assert status == 202
+        _finished(submitted, body)
         call_kwargs = mock_email_cls.call_args[1]
         assert call_kwargs["cc"] == ["a@b.com", "c@d.com"]
 
-    @patch("tenantfirstaid.feedback.EmailMessage")
-    @patch("tenantfirstaid.feedback.convert_html_to_pdf", return_value=b"%PDF-fake")
+    @patch(
+        "tenantfirstaid.feedback.FEEDBACK_QUEUE", FeedbackQueue(workers=1, max_queued=1)
+    )
+    @patch("tenantfirstaid.feedback.render_pdf")
     @patch.dict("os.environ", {"SENDER_EMAIL": "s@t.com", "RECIPIENT_EMAIL": "r@t.com"})
-    def test_email_failure_with_transcript_returns_500(
-        self, mock_pdf, mock_email_cls, feedback_app
-    ):
-        mock_email_cls.return_value.send.side_effect = Exception("Connection refused")
-        with feedback_app.test_request_context(
-            "/api/feedback",
-            method="POST",
-            data={"feedback": "Chat", "transcript": self._make_file()},
-            content_type="multipart/form-data",
-        ):
-            msg, status = send_feedback()
-        assert status == 500
-        assert "Connection refused" in msg
+    def test_full_queue_returns_503(self, mock_pdf, feedback_app):
+        rendering, release = threading.Event(), threading.Event()
+
+        def render(html):
+            rendering.set()
+            release.wait(5)
+
+        mock_pdf.side_effect = render
+        statuses = []
+        for _ in range(3):
+            with feedback_app.test_request_context(
+                "/api/feedback",
+                method="POST",
+                data={"feedback": "Chat", "transcript": self._make_file()},
+                content_type="multipart/form-data",
+            ):
+                statuses.append(send_feedback()[1])
+            # The worker holds the first job, so the second fills the queue.
+            assert rendering.wait(5)
+        release.set()
+        assert statuses == [202, 202, 503]
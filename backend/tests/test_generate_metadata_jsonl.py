@@ -6,7 +6,12 @@ from unittest.mock import patch
 
 import pytest
 
-from scripts.generate_metadata_jsonl import build_entries, infer_city
+from scripts.generate_metadata_jsonl import (
+    build_entries,
+    build_entries_incremental,
+    infer_city,
+)
+from scripts.ingest_manifest import IngestManifest
 
 
 class TestInferCity:
@@ -87,6 +92,46 @@ class TestBuildEntries:
             build_entries(tmp_path, "my-bucket", set())
 
 
+class TestBuildEntriesIncremental:
+    def test_only_changed_files_are_revalidated(self, tmp_path: Path):
+        (tmp_path / "ORS090.txt").write_text("state doc")
+        (tmp_path / "portland").mkdir()
+        (tmp_path / "portland" / "PCC30.01.txt").write_text("Chapter 30 — Rights")
+        manifest = IngestManifest(tmp_path)
+        entries, diff = build_entries_incremental(tmp_path, "b", set(), manifest)
+        assert len(entries) == 2
+        assert diff.added == ["ORS090", "PCC30.01"]
+
+        (tmp_path / "portland" / "PCC30.01.txt").write_text("Chapter 30 — Duties")
+        validated: list[str] = []
+
+        def fake_validate(root: Path, *, file_filter):
+            validated.extend(
+                p.name for p in sorted(root.rglob("*.txt")) if file_filter(p)
+            )
+
+        with patch(
+            "scripts.generate_metadata_jsonl.validate_and_rewrite_tree",
+            side_effect=fake_validate,
+        ):
+            entries, diff = build_entries_incremental(tmp_path, "b", set(), manifest)
+
+        assert validated == ["PCC30.01.txt"]
+        assert (diff.changed, diff.unchanged) == (["PCC30.01"], 1)
+
+    def test_scoped_run_does_not_remove_other_scopes(self, tmp_path: Path):
+        (tmp_path / "ORS090.txt").write_text("state doc")
+        (tmp_path / "portland").mkdir()
+        (tmp_path / "portland" / "PCC30.01.txt").write_text("portland doc")
+        manifest = IngestManifest(tmp_path)
+        build_entries_incremental(tmp_path, "b", set(), manifest)
+
+        entries, diff = build_entries_incremental(tmp_path, "b", {"portland"}, manifest)
+        assert [e.id for e in entries] == ["PCC30.01"]
+        assert not diff
+        assert "ORS090.txt" in manifest.entries
+
+
 class TestMain:
     def test_missing_bucket_raises(self):
         with patch("sys.argv", ["generate_metadata_jsonl"]):
@@ -113,3 +158,26 @@ class TestMain:
         entry = json.loads(lines[0])
         assert entry["id"] == "ORS090"
         assert entry["content"]["uri"] == "gs://test-bucket/ORS090.txt"
+
+    def test_second_run_reports_and_queues_changes(self, tmp_path: Path, capsys):
+        (tmp_path / "ORS090.txt").write_text("doc")
+        (tmp_path / "ORS105.txt").write_text("doc")
+        output = tmp_path / "out.jsonl"
+
+        with (
+            patch("scripts.generate_metadata_jsonl.DOCUMENTS_DIR", tmp_path),
+            patch("scripts.generate_metadata_jsonl.OUTPUT_FILE", output),
+            patch("sys.argv", ["generate_metadata_jsonl", "--bucket", "test-bucket"]),
+        ):
+            from scripts.generate_metadata_jsonl import main
+
+            main()
+            (tmp_path / "ORS105.txt").unlink()
+            (tmp_path / "ORS091.txt").write_text("new doc")
+            capsys.readouterr()
+            main()
+
+        out = capsys.readouterr().out
+        assert "1 added, 0 changed, 1 removed, 1 unchanged" in out
+        pending = json.loads((tmp_path / "pending_import.json").read_text())
+        assert pending == {"upsert": ["ORS090", "ORS091"], "delete": ["ORS105"]}
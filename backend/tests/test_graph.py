@@ -3,11 +3,22 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain.agents.middleware.types import ModelRequest
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
 
 from tenantfirstaid.graph import (
     TFAContext,
     _adapt_query,
+    _CachedPromptPrefix,
+    _CompactHistory,
     _DatasetInput,
     _SystemPromptFromContext,
     create_graph,
@@ -205,3 +216,105 @@ def test_graph_adapter_converts_query_to_human_message(mock_get_llm):
     ]
     assert len(human_messages) == 1
     assert human_messages[0].content == "Can my landlord enter without notice?"
+
+
+def _gemini_request(**settings) -> ModelRequest:
+    model = MagicMock(spec=ChatGoogleGenerativeAI)
+    model.model = "gemini-test"
+    return ModelRequest(
+        model=model,
+        messages=[HumanMessage("hi")],
+        system_message=SystemMessage("Base prompt."),
+        tools=[MagicMock()],
+        model_settings=settings,
+    )
+
+
+@patch("tenantfirstaid.graph.PROMPT_CACHE_ENABLED", True)
+@patch("tenantfirstaid.graph.PROMPT_CACHE")
+def test_cached_prompt_prefix_sends_only_messages(mock_cache):
+    """With a live cache, the system prompt and tools are replaced by its name."""
+    mock_cache.lookup.return_value = "cachedContents/abc"
+    request = _gemini_request(seed=0)
+    handler = MagicMock()
+
+    _CachedPromptPrefix().wrap_model_call(request, handler)
+
+    sent = handler.call_args.args[0]
+    assert sent.system_message is None
+    assert sent.tools == []
+    assert sent.model_settings == {"seed": 0, "cached_content": "cachedContents/abc"}
+    assert sent.messages == request.messages
+
+
+@patch("tenantfirstaid.graph.PROMPT_CACHE_ENABLED", True)
+@patch("tenantfirstaid.graph.PROMPT_CACHE")
+def test_cached_prompt_prefix_passes_through_without_cache(mock_cache):
+    mock_cache.lookup.return_value = None
+    request = _gemini_request()
+    handler = MagicMock()
+
+    _CachedPromptPrefix().wrap_model_call(request, handler)
+
+    handler.assert_called_once_with(request)
+
+
+@patch("tenantfirstaid.graph.PROMPT_CACHE")
+def test_cached_prompt_prefix_disabled_by_default(mock_cache):
+    request = _gemini_request()
+    handler = MagicMock()
+
+    _CachedPromptPrefix().wrap_model_call(request, handler)
+
+    handler.assert_called_once_with(request)
+    mock_cache.lookup.assert_not_called()
+
+
+@patch("tenantfirstaid.graph.PROMPT_CACHE_ENABLED", True)
+@patch("tenantfirstaid.graph.PROMPT_CACHE")
+@pytest.mark.asyncio
+async def test_cached_prompt_prefix_retries_without_rejected_cache(mock_cache):
+    """A call the provider rejects with the cache is retried with the full prompt."""
+    mock_cache.lookup.return_value = "cachedContents/gone"
+    request = _gemini_request()
+    sent = []
+
+    async def handler(req):
+        sent.append(req)
+        if req.system_message is None:
+            raise ChatGoogleGenerativeAIError("cached content not found")
+        return MagicMock()
+
+    await _CachedPromptPrefix().awrap_model_call(request, handler)
+
+    assert [r.system_message for r in sent] == [None, request.system_message]
+    mock_cache.invalidate.assert_called_once_with("cachedContents/gone")
+
+
+def test_compact_history_rewrites_only_the_model_request():
+    history: list[AnyMessage] = [
+        HumanMessage("Is my heater a repair?"),
+        ToolMessage("ORS 90.320 " * 100, tool_call_id="1", name="lookup_ors_section"),
+        AIMessage("Yes."),
+        HumanMessage("How long does the landlord have?"),
+    ]
+    request = ModelRequest(model=MagicMock(), messages=history)
+    handler = MagicMock()
+
+    _CompactHistory().wrap_model_call(request, handler)
+
+    sent = handler.call_args.args[0].messages
+    assert sent[1].content == (
+        "[Earlier lookup_ors_section result omitted; sections mentioned: 90.320.]"
+    )
+    assert request.messages[1] is history[1]
+
+
+@patch("tenantfirstaid.graph.HISTORY_COMPACTION_ENABLED", False)
+def test_compact_history_disabled():
+    request = _gemini_request()
+    handler = MagicMock()
+
+    _CompactHistory().wrap_model_call(request, handler)
+
+    handler.assert_called_once_with(request)
@@ -0,0 +1,160 @@
+"""Tests for history.py — compaction of earlier conversation turns."""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from tenantfirstaid.history import SUPERSEDED_LETTER_NOTE, HistoryCompactor
+
+PASSAGES = "ORS 90.320 requires landlords to maintain habitable premises. " * 20 + (
+    "See also ORS 90.360 and ORS 90.365."
+)
+LETTER = (
+    "Jane Tenant\n123 Main St\n\nDear Mr. Landlord,\n\n"
+    "Please repair the heater.\n\nSincerely,\n\nJane Tenant"
+)
+
+
+def _search_turn(question: str, answer: str, call_id: str) -> list:
+    return [
+        HumanMessage(question),
+        AIMessage(
+            "",
+            tool_calls=[
+                {
+                    "name": "retrieve_city_state_laws",
+                    "args": {"query": question},
+                    "id": call_id,
+                }
+            ],
+        ),
+        ToolMessage(PASSAGES, tool_call_id=call_id, name="retrieve_city_state_laws"),
+        AIMessage(answer),
+    ]
+
+
+def _letter_turn(question: str, letter: str, call_id: str) -> list:
+    return [
+        HumanMessage(question),
+        AIMessage(
+            "",
+            tool_calls=[
+                {"name": "generate_letter", "args": {"letter": letter}, "id": call_id}
+            ],
+        ),
+        ToolMessage(
+            "Letter generated successfully.",
+            tool_call_id=call_id,
+            name="generate_letter",
+        ),
+        AIMessage("Here is your letter."),
+    ]
+
+
+def test_single_turn_is_unchanged():
+    messages = _search_turn("Is my heater a repair?", "Yes.", "1")
+
+    assert HistoryCompactor().compact(messages) == messages
+
+
+def test_stubs_earlier_tool_results_but_not_current_ones():
+    earlier = _search_turn("Is my heater a repair?", "Yes, ORS 90.320.", "1")
+    current = _search_turn("How long does the landlord have?", "", "2")[:3]
+
+    compacted = HistoryCompactor().compact(earlier + current)
+
+    assert compacted[2].content == (
+        "[Earlier retrieve_city_state_laws result omitted; sections mentioned: "
+        "90.320, 90.360, 90.365.]"
+    )
+    assert isinstance(compacted[2], ToolMessage)
+    assert compacted[2].tool_call_id == "1"
+    assert compacted[4:] == current
+    # Everything but the stale result is kept as it was.
+    assert [m for i, m in enumerate(compacted[:4]) if i != 2] == [
+        m for i, m in enumerate(earlier) if i != 2
+    ]
+
+
+def test_short_tool_results_are_kept():
+    earlier = _letter_turn("Write a letter", LETTER, "1")
+    current = [HumanMessage("Thanks")]
+
+    compacted = HistoryCompactor().compact(earlier + current)
+
+    assert compacted[2].content == "Letter generated successfully."
+
+
+def test_only_latest_letter_call_is_kept():
+    first = _letter_turn("Write a letter", LETTER, "1")
+    second = _letter_turn("Make it firmer", LETTER.replace("Please", "You must"), "2")
+    current = [HumanMessage("Thanks")]
+
+    compacted = HistoryCompactor().compact(first + second + current)
+
+    assert isinstance(compacted[1], AIMessage)
+    assert isinstance(compacted[5], AIMessage)
+    assert compacted[1].tool_calls[0]["args"] == {"letter": SUPERSEDED_LETTER_NOTE}
+    assert compacted[5].tool_calls[0]["args"]["letter"].count("You must") == 1
+
+
+def test_letter_in_current_turn_supersedes_earlier_letters():
+    earlier = _letter_turn("Write a letter", LETTER, "1")
+    current = _letter_turn("Make it firmer", LETTER, "2")[:2]
+
+    compacted = HistoryCompactor().compact(earlier + current)
+
+    assert isinstance(compacted[1], AIMessage)
+    assert compacted[1].tool_calls[0]["args"] == {"letter": SUPERSEDED_LETTER_NOTE}
+    assert compacted[4:] == current
+
+
+def test_letters_expanded_into_ai_text_are_collapsed():
+    """The frontend resends letters as part of the AI message text."""
+    history = [
+        HumanMessage("Write a letter"),
+        AIMessage(f"Here is a draft.\n{LETTER}\nLet me know what to change."),
+        HumanMessage("Make it firmer"),
+        AIMessage(f"Updated.\n{LETTER.replace('Please', 'You must')}"),
+        HumanMessage("Thanks"),
+    ]
+
+    compacted = HistoryCompactor().compact(history)
+
+    assert compacted[1].content == (
+        f"Here is a draft.\nJane Tenant\n123 Main St\n\n{SUPERSEDED_LETTER_NOTE}\n"
+        "Let me know what to change."
+    )
+    assert compacted[3] == history[3]
+
+
+def test_drops_oldest_turns_over_budget():
+    turns = [
+        [HumanMessage(f"Question {i} " + "x" * 400), AIMessage("y" * 400)]
+        for i in range(5)
+    ]
+    current = [HumanMessage("Last question")]
+    # Each earlier turn is roughly 200 estimated tokens.
+    compactor = HistoryCompactor(token_budget=450)
+
+    compacted = compactor.compact([m for t in turns for m in t] + current)
+
+    assert compacted == turns[3] + turns[4] + current
+
+
+def test_caches_compacted_turns_by_prefix():
+    compactor = HistoryCompactor()
+    first = _search_turn("Is my heater a repair?", "Yes.", "1")
+    second = _search_turn("What about mold?", "Also yes.", "2")
+
+    compactor.compact(first + [HumanMessage("Next")])
+    compactor.compact(first + second + [HumanMessage("Next")])
+    assert (compactor.hits, compactor.misses) == (1, 2)
+
+    # The same turn after a different history is a different prefix.
+    compactor.compact(second + [HumanMessage("Next")])
+    assert (compactor.hits, compactor.misses) == (1, 3)
+
+
+def test_rejects_empty_cache():
+    with pytest.raises(ValueError):
+        HistoryCompactor(max_size=0)
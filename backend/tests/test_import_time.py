@@ -0,0 +1,61 @@
+"""Tests for scripts.import_time."""
+
+from unittest.mock import patch
+
+from scripts.import_time import (
+    ImportTimeResult,
+    main,
+    measure,
+    parse_importtime,
+)
+
+_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       2000 |     json.decoder
+import time:       500 |       2500 |   json
+import time:      1000 |       3620 | tenantfirstaid.app
+"""
+
+
+def test_parse_importtime_reads_self_and_cumulative_times():
+    modules = parse_importtime("unrelated warning\n" + _SAMPLE)
+
+    assert modules == {
+        "_io": (120, 120),
+        "json.decoder": (2000, 2000),
+        "json": (500, 2500),
+        "tenantfirstaid.app": (1000, 3620),
+    }
+
+
+def test_problems_report_budget_and_deferred_modules():
+    result = ImportTimeResult(
+        "tenantfirstaid.app", seconds=[1.0, 3.0, 2.0], deferred_loaded=["xhtml2pdf"]
+    )
+
+    assert result.problems(budget=2.5) == [
+        "xhtml2pdf is imported with tenantfirstaid.app"
+    ]
+    assert result.problems(budget=1.5)[-1] == (
+        "median import time 2.00s exceeds the 1.50s budget"
+    )
+
+
+def test_app_import_defers_heavy_dependencies():
+    result = measure(runs=1)
+
+    assert result.seconds[0] > 0
+    assert result.deferred_loaded == []
+
+
+@patch("scripts.import_time.measure")
+def test_main_exit_status_follows_budget(mock_measure, capsys):
+    mock_measure.return_value = ImportTimeResult(
+        "tenantfirstaid.app", seconds=[1.2], packages={"langsmith": 0.3}
+    )
+
+    assert main(["--budget", "2"]) == 0
+    assert "0.300s  langsmith" in capsys.readouterr().out
+    assert main(["--budget", "1"]) == 1
+    assert "exceeds the 1.00s budget" in capsys.readouterr().out
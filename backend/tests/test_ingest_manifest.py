@@ -0,0 +1,109 @@
+"""Tests for scripts.ingest_manifest."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from scripts.ingest_manifest import (
+    IngestDiff,
+    IngestManifest,
+    ManifestError,
+    load_pending_import,
+    merge_pending_import,
+)
+
+
+def _emit(root: Path, *names: str, city=None) -> dict:
+    return {
+        root / name: (Path(name).stem, {"city": city, "state": "or"}, f"gs://b/{name}")
+        for name in names
+    }
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "a.txt").write_text("alpha")
+    (tmp_path / "b.txt").write_text("beta")
+    return tmp_path
+
+
+def test_first_record_adds_everything(tree: Path):
+    manifest = IngestManifest(tree)
+    diff = manifest.record(_emit(tree, "a.txt", "b.txt"))
+    assert diff.added == ["a", "b"]
+    assert not manifest.has_changed(tree / "a.txt")
+
+
+def test_round_trip_and_change_detection(tree: Path):
+    manifest = IngestManifest(tree)
+    manifest.record(_emit(tree, "a.txt", "b.txt"))
+    manifest.save(tree / "manifest.json")
+
+    loaded = IngestManifest.load(tree / "manifest.json", tree)
+    assert loaded.entries == manifest.entries
+    (tree / "b.txt").write_text("beta, amended")
+    assert loaded.has_changed(tree / "b.txt")
+    assert not loaded.has_changed(tree / "a.txt")
+
+    diff = loaded.record(_emit(tree, "a.txt", "b.txt"))
+    assert (diff.added, diff.changed, diff.removed, diff.unchanged) == (
+        [],
+        ["b"],
+        [],
+        1,
+    )
+
+
+def test_touched_file_with_same_content_is_unchanged(tree: Path):
+    manifest = IngestManifest(tree)
+    manifest.record(_emit(tree, "a.txt"))
+    st = (tree / "a.txt").stat()
+    os.utime(tree / "a.txt", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not manifest.has_changed(tree / "a.txt")
+    assert not manifest.record(_emit(tree, "a.txt"))
+
+
+def test_struct_data_change_is_reported(tree: Path):
+    manifest = IngestManifest(tree)
+    manifest.record(_emit(tree, "a.txt"))
+    diff = manifest.record(_emit(tree, "a.txt", city="portland"))
+    assert diff.changed == ["a"]
+
+
+def test_removed_respects_scope(tree: Path):
+    manifest = IngestManifest(tree)
+    manifest.record(_emit(tree, "a.txt", "b.txt"))
+    (tree / "b.txt").unlink()
+
+    scoped = manifest.record(_emit(tree, "a.txt"), in_scope=lambda rel: False)
+    assert scoped.removed == []
+    assert "b.txt" in manifest.entries
+
+    diff = manifest.record(_emit(tree, "a.txt"))
+    assert diff.removed == ["b"]
+    assert "b.txt" not in manifest.entries
+
+
+def test_moved_file_is_not_removed(tree: Path):
+    manifest = IngestManifest(tree)
+    manifest.record(_emit(tree, "a.txt"))
+    (tree / "2025").mkdir()
+    (tree / "a.txt").rename(tree / "2025" / "a.txt")
+    diff = manifest.record(_emit(tree, "2025/a.txt"))
+    assert (diff.added, diff.removed) == (["a"], [])
+
+
+def test_version_mismatch_rejected(tmp_path: Path):
+    path = tmp_path / "manifest.json"
+    path.write_text('{"version": 0, "entries": {}}')
+    with pytest.raises(ManifestError, match="Delete it"):
+        IngestManifest.load(path, tmp_path)
+
+
+def test_pending_import_accumulates(tmp_path: Path):
+    path = tmp_path / "pending_import.json"
+    merge_pending_import(path, IngestDiff(added=["a"], changed=["b"], removed=["c"]))
+    pending = merge_pending_import(path, IngestDiff(added=["c"], removed=["a"]))
+    assert pending == {"upsert": ["b", "c"], "delete": ["a"]}
+    assert load_pending_import(path) == pending
@@ -1,19 +1,46 @@
 """Tests for LangChain-based chat manager."""
 
+from typing import Any, Dict, Optional, cast
 from unittest.mock import MagicMock, patch
 
 import httpcore
 import httpx
 import pytest
-from langchain_core.messages import AIMessage
-
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    AnyMessage,
+    HumanMessage,
+)
+from langchain_core.messages.content import ContentBlock, TextContentBlock
+from langgraph.checkpoint.memory import InMemorySaver
+
+from tenantfirstaid.budget import RequestBudget, current_budget
 from tenantfirstaid.graph import prepare_system_prompt, tools
-from tenantfirstaid.langchain_chat_manager import LangChainChatManager
+from tenantfirstaid.langchain_chat_manager import (
+    AGENT_CACHE,
+    SESSION_AGENT_CACHE,
+    CompiledAgentCache,
+    DeltaCoalescer,
+    LangChainChatManager,
+)
 from tenantfirstaid.location import OregonCity, UsaState
+from tenantfirstaid.response_cache import RESPONSE_CACHE
 
 pytestmark = pytest.mark.langchain
 
 
+@pytest.fixture(autouse=True)
+def _empty_agent_cache():
+    """Keep graphs compiled against a mocked LLM from leaking between tests."""
+    AGENT_CACHE.clear()
+    SESSION_AGENT_CACHE.clear()
+    yield
+    AGENT_CACHE.clear()
+    SESSION_AGENT_CACHE.clear()
+
+
 @pytest.fixture
 def oregon_state():
     return UsaState.from_maybe_str("or")
@@ -45,10 +72,11 @@ def test_prepare_system_prompt_includes_city_state(oregon_state, portland_city):
 
 
 def test_tools_include_rag_retrieval():
-    """Test that tools list includes RAG retrieval and letter template tools."""
-    assert len(tools) == 3
+    """Test that tools list includes RAG retrieval, section lookup and letter template tools."""
+    assert len(tools) == 4
     tool_names = [tool.name for tool in tools]
     assert "retrieve_city_state_laws" in tool_names
+    assert "lookup_ors_section" in tool_names
     assert "generate_letter" in tool_names
     assert "get_letter_template" in tool_names
 
@@ -91,7 +119,7 @@ def test_streaming_text_response(mock_create_agent, oregon_state, portland_city)
 def test_streaming_custom_chunk_yields_non_standard_block(
     mock_create_agent, oregon_state
 ):
-    """Custom-mode chunks (e.g. from generate_letter) are wrapped in NonStandardContentBlock so _classify_blocks can distinguish tool chunks from LLM chunks."""
+    """Custom-mode chunks (e.g. from generate_letter) are wrapped in NonStandardContentBlock so encode_block can distinguish tool chunks from LLM chunks."""
     mock_agent = MagicMock()
     mock_agent.stream.return_value = iter(
         [("custom", {"type": "letter", "content": "Dear Landlord,"})]
@@ -184,6 +212,26 @@ def test_no_retry_after_partial_yield(
     mock_sleep.assert_not_called()
 
 
+@patch("tenantfirstaid.langchain_chat_manager.start_request_budget")
+@patch("tenantfirstaid.langchain_chat_manager.time.sleep")
+@patch.object(LangChainChatManager, _STREAM_ONCE)
+@patch.object(LangChainChatManager, _CREATE_AGENT)
+def test_no_retry_past_request_deadline(
+    _mock_create, mock_stream_once, mock_sleep, mock_start_budget, oregon_state
+):
+    """A retry that could only start after the request deadline is not attempted."""
+    mock_start_budget.return_value = RequestBudget(deadline_seconds=1.0)
+    mock_stream_once.side_effect = [httpcore.ReadError("reset"), _good_stream()]
+    cm = LangChainChatManager()
+    with pytest.raises(httpcore.ReadError):
+        list(
+            cm.generate_streaming_response(
+                messages=[], city=None, state=oregon_state, thread_id=None
+            )
+        )
+    mock_sleep.assert_not_called()
+
+
 @patch("tenantfirstaid.langchain_chat_manager.time.sleep")
 @patch.object(LangChainChatManager, _STREAM_ONCE)
 @patch.object(LangChainChatManager, _CREATE_AGENT)
@@ -274,3 +322,474 @@ def test_agent_creation_without_thread_id(mock_get_llm, oregon_state, portland_c
     create = getattr(cm, "_LangChainChatManager__create_agent_for_session")
     agent = create(portland_city, oregon_state, None)
     assert agent is not None
+
+
+# ── compiled agent cache ───────────────────────────────────────────────────────
+
+
+@patch("tenantfirstaid.langchain_chat_manager.create_graph")
+def test_agent_cache_reuses_graph_per_jurisdiction(
+    mock_create_graph, oregon_state, portland_city, eugene_city
+):
+    """New managers for the same jurisdiction share one compiled graph."""
+    mock_create_graph.side_effect = lambda **_kwargs: MagicMock()
+
+    def _create(city):
+        cm = LangChainChatManager()
+        return getattr(cm, _CREATE_AGENT)(city, oregon_state, None)
+
+    first = _create(portland_city)
+    second = _create(portland_city)
+    other = _create(eugene_city)
+
+    assert first is second
+    assert other is not first
+    assert mock_create_graph.call_count == 2
+    assert (AGENT_CACHE.hits, AGENT_CACHE.misses) == (1, 2)
+
+
+@patch("tenantfirstaid.langchain_chat_manager.create_graph")
+def test_agent_cache_passes_jurisdiction_prompt(
+    mock_create_graph, oregon_state, eugene_city
+):
+    """The cached graph is compiled with the caller's location-specific prompt."""
+    cm = LangChainChatManager()
+    getattr(cm, _CREATE_AGENT)(eugene_city, oregon_state, None)
+
+    prompt = mock_create_graph.call_args.kwargs["system_prompt"]
+    assert "Eugene OR" in prompt.content
+    assert cm.system_prompt is prompt
+
+
+def test_agent_cache_key_changes_with_prompt(oregon_state):
+    base = prepare_system_prompt(None, oregon_state)
+    edited = base.model_copy(update={"content": base.text + "extra"})
+    assert CompiledAgentCache.key_for(
+        None, oregon_state, base
+    ) != CompiledAgentCache.key_for(None, oregon_state, edited)
+
+
+def test_agent_cache_key_separates_checkpointers(oregon_state):
+    prompt = prepare_system_prompt(None, oregon_state)
+    savers = [None, InMemorySaver(), InMemorySaver()]
+    keys = {CompiledAgentCache.key_for(None, oregon_state, prompt, s) for s in savers}
+    assert len(keys) == 3
+
+
+def test_agent_cache_evicts_least_recently_used(oregon_state):
+    cache = CompiledAgentCache(max_size=2)
+    keys = [(None, oregon_state, h, None) for h in ("a", "b", "c")]
+    graphs = [MagicMock() for _ in keys]
+
+    cache.get_or_create(keys[0], lambda: graphs[0])
+    cache.get_or_create(keys[1], lambda: graphs[1])
+    cache.get_or_create(keys[0], lambda: graphs[0])  # "b" is now LRU
+    cache.get_or_create(keys[2], lambda: graphs[2])
+
+    assert len(cache) == 2
+    rebuilt = MagicMock()
+    assert cache.get_or_create(keys[1], lambda: rebuilt) is rebuilt
+    assert cache.get_or_create(keys[2], MagicMock) is graphs[2]
+
+
+def test_agent_cache_rejects_non_positive_size():
+    with pytest.raises(ValueError, match="max_size"):
+        CompiledAgentCache(max_size=0)
+
+
+# ── server-side sessions ───────────────────────────────────────────────────────
+
+
+@patch("tenantfirstaid.graph._get_llm")
+def test_checkpointed_session_resumes_history(mock_get_llm, oregon_state):
+    """With a checkpointer, the second turn sees the first without resending it."""
+    mock_llm = MagicMock()
+    mock_llm.bind_tools.return_value = mock_llm
+    mock_llm.invoke.return_value = AIMessage(content="Answer.")
+    mock_get_llm.return_value = mock_llm
+    saver = InMemorySaver()
+
+    for question in ("First question", "Follow-up"):
+        cm = LangChainChatManager(checkpointer=saver)
+        list(
+            cm.generate_streaming_response(
+                messages=[{"role": "human", "content": question}],
+                city=None,
+                state=oregon_state,
+                thread_id="session-1",
+            )
+        )
+
+    state = saver.get_tuple({"configurable": {"thread_id": "session-1"}})
+    assert state is not None
+    humans = [
+        m.content
+        for m in state.checkpoint["channel_values"]["messages"]
+        if isinstance(m, HumanMessage)
+    ]
+    assert humans == ["First question", "Follow-up"]
+    # The second turn's model call received the full history.
+    prompt_messages = mock_llm.invoke.call_args.args[0]
+    assert [m.content for m in prompt_messages if isinstance(m, HumanMessage)] == [
+        "First question",
+        "Follow-up",
+    ]
+
+
+@patch("tenantfirstaid.langchain_chat_manager.create_graph")
+def test_checkpointed_graphs_cached_separately(mock_create_graph, oregon_state):
+    mock_create_graph.side_effect = lambda **_kwargs: MagicMock()
+    saver = InMemorySaver()
+
+    stateless = getattr(LangChainChatManager(), _CREATE_AGENT)(None, oregon_state, None)
+    stateful = getattr(LangChainChatManager(checkpointer=saver), _CREATE_AGENT)(
+        None, oregon_state, None
+    )
+
+    assert stateless is not stateful
+    assert mock_create_graph.call_args.kwargs["checkpointer"] is saver
+
+
+# ── async streaming ────────────────────────────────────────────────────────────
+
+
+async def _collect(agen):
+    return [b async for b in agen]
+
+
+@pytest.mark.asyncio
+@patch.object(LangChainChatManager, _CREATE_AGENT)
+async def test_async_streaming_text_and_custom(mock_create_agent, oregon_state):
+    """agenerate_streaming_response mirrors the sync path using agent.astream."""
+    ai_msg = AIMessage(content=[{"type": "text", "text": "You have rights."}])
+
+    async def _astream(**_kwargs):
+        yield ("updates", {"model": {"messages": [ai_msg]}})
+        yield ("custom", {"type": "letter", "content": "Dear Landlord,"})
+
+    mock_agent = MagicMock()
+    mock_agent.astream.side_effect = _astream
+    mock_create_agent.return_value = mock_agent
+
+    cm = LangChainChatManager()
+    blocks = await _collect(
+        cm.agenerate_streaming_response(
+            messages=[], city=None, state=oregon_state, thread_id="t-1"
+        )
+    )
+
+    assert [b["type"] for b in blocks] == ["text", "non_standard"]
+    config = mock_agent.astream.call_args.kwargs["config"]
+    assert config["configurable"]["thread_id"] == "t-1"
+
+
+@pytest.mark.asyncio
+@patch("tenantfirstaid.langchain_chat_manager.asyncio.sleep")
+@patch.object(LangChainChatManager, _CREATE_AGENT)
+async def test_async_retry_succeeds_on_second_attempt(
+    mock_create_agent, mock_sleep, oregon_state
+):
+    attempts = []
+
+    async def _astream(**_kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise httpx.ReadError("reset")
+        yield ("custom", {"type": "letter", "content": "ok"})
+
+    mock_agent = MagicMock()
+    mock_agent.astream.side_effect = _astream
+    mock_create_agent.return_value = mock_agent
+
+    cm = LangChainChatManager()
+    blocks = await _collect(
+        cm.agenerate_streaming_response(
+            messages=[], city=None, state=oregon_state, thread_id=None
+        )
+    )
+
+    assert len(blocks) == 1
+    assert len(attempts) == 2
+    mock_sleep.assert_awaited_once()
+
+
+# ── token-level streaming ──────────────────────────────────────────────────────
+
+
+def _block_text(block: ContentBlock) -> str:
+    return cast(TextContentBlock, block)["text"]
+
+
+class _StreamingFakeLLM(GenericFakeChatModel):
+    """Fake model that streams its reply word by word through a real graph."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@patch("tenantfirstaid.langchain_chat_manager.STREAM_COALESCE_SECONDS", 0)
+@patch("tenantfirstaid.graph._get_llm")
+def test_stream_deltas_yields_incremental_text(mock_get_llm, oregon_state):
+    mock_get_llm.return_value = _StreamingFakeLLM(
+        messages=iter([AIMessage(content="You have rights here.")])
+    )
+
+    cm = LangChainChatManager()
+    blocks = list(
+        cm.generate_streaming_response(
+            messages=[{"role": "human", "content": "Help"}],
+            city=None,
+            state=oregon_state,
+            thread_id=None,
+            stream_deltas=True,
+        )
+    )
+
+    assert len(blocks) > 1
+    assert all(b["type"] == "text" for b in blocks)
+    # The completed message from the "updates" stream is not sent again.
+    assert "".join(_block_text(b) for b in blocks) == "You have rights here."
+
+
+@patch("tenantfirstaid.graph._get_llm")
+def test_without_stream_deltas_text_arrives_as_one_block(mock_get_llm, oregon_state):
+    mock_get_llm.return_value = _StreamingFakeLLM(
+        messages=iter([AIMessage(content="You have rights here.")])
+    )
+
+    cm = LangChainChatManager()
+    blocks = list(
+        cm.generate_streaming_response(
+            messages=[{"role": "human", "content": "Help"}],
+            city=None,
+            state=oregon_state,
+            thread_id=None,
+        )
+    )
+
+    assert [_block_text(b) for b in blocks] == ["You have rights here."]
+
+
+def _chunk(msg_id, *blocks):
+    return AIMessageChunk(id=msg_id, content=list(blocks))
+
+
+def _text(text):
+    return {"type": "text", "text": text}
+
+
+@patch("tenantfirstaid.langchain_chat_manager.time.monotonic")
+def test_delta_coalescer_merges_within_window(mock_monotonic):
+    coalescer = DeltaCoalescer(window_seconds=0.05)
+
+    mock_monotonic.return_value = 10.0
+    first = coalescer.add(_chunk("m1", _text("You")))
+    mock_monotonic.return_value = 10.01
+    second = coalescer.add(_chunk("m1", _text(" have")))
+    mock_monotonic.return_value = 10.02
+    third = coalescer.add(_chunk("m1", _text(" rights")))
+    mock_monotonic.return_value = 10.08
+    fourth = coalescer.add(_chunk("m1", _text(".")))
+
+    # The first delta goes out immediately; the rest wait out the window.
+    assert [_block_text(b) for b in first] == ["You"]
+    assert second == third == []
+    assert [_block_text(b) for b in fourth] == [" have rights."]
+    assert coalescer.flush() == []
+
+
+def test_delta_coalescer_flushes_on_type_change():
+    coalescer = DeltaCoalescer(window_seconds=60)
+    coalescer.add(_chunk("m1", {"type": "reasoning", "reasoning": "Thinking"}))
+    coalescer.add(_chunk("m1", {"type": "reasoning", "reasoning": " more"}))
+
+    blocks = coalescer.add(_chunk("m1", _text("Answer")))
+    blocks += coalescer.flush()
+
+    assert blocks == [
+        {"type": "reasoning", "reasoning": " more"},
+        {"type": "text", "text": "Answer"},
+    ]
+
+
+def test_delta_coalescer_separates_model_turns():
+    coalescer = DeltaCoalescer(window_seconds=0)
+    blocks = coalescer.add(_chunk("m1", _text("Let me check.")))
+    blocks += coalescer.add(_chunk("m2", _text("ORS 90.300 says")))
+
+    assert "".join(_block_text(b) for b in blocks) == "Let me check.\n\nORS 90.300 says"
+
+
+@pytest.mark.asyncio
+@patch("tenantfirstaid.langchain_chat_manager.STREAM_COALESCE_SECONDS", 0)
+@patch("tenantfirstaid.graph._get_llm")
+async def test_async_stream_deltas_yields_incremental_text(mock_get_llm, oregon_state):
+    mock_get_llm.return_value = _StreamingFakeLLM(
+        messages=iter([AIMessage(content="You have rights here.")])
+    )
+
+    cm = LangChainChatManager()
+    blocks = await _collect(
+        cm.agenerate_streaming_response(
+            messages=[{"role": "human", "content": "Help"}],
+            city=None,
+            state=oregon_state,
+            thread_id=None,
+            stream_deltas=True,
+        )
+    )
+
+    assert len(blocks) > 1
+    assert "".join(_block_text(b) for b in blocks) == "You have rights here."
+
+
+# ── first-turn response cache ──────────────────────────────────────────────────
+
+
+@pytest.fixture
+def response_cache():
+    with patch("tenantfirstaid.langchain_chat_manager.RESPONSE_CACHE_ENABLED", True):
+        RESPONSE_CACHE.clear()
+        yield RESPONSE_CACHE
+        RESPONSE_CACHE.clear()
+
+
+@patch.object(LangChainChatManager, "_LangChainChatManager__create_agent_for_session")
+def test_response_cache_replays_first_turn_answer(
+    mock_create_agent, response_cache, oregon_state
+):
+    mock_agent = MagicMock()
+    ai_msg = AIMessage(content=[{"type": "text", "text": "You have rights."}])
+    mock_agent.stream.side_effect = lambda **_: iter(
+        [("updates", {"agent": {"messages": [ai_msg]}})]
+    )
+    mock_create_agent.return_value = mock_agent
+
+    def ask(content):
+        return list(
+            LangChainChatManager().generate_streaming_response(
+                messages=[{"role": "human", "content": content}],
+                city=None,
+                state=oregon_state,
+                thread_id=None,
+            )
+        )
+
+    first = ask("Can my landlord keep my deposit?")
+    assert ask("can my landlord keep my deposit") == first
+    assert mock_agent.stream.call_count == 1
+    assert response_cache.hits == 1
+
+
+@patch.object(LangChainChatManager, "_LangChainChatManager__create_agent_for_session")
+def test_response_cache_skips_sessions_and_follow_ups(
+    mock_create_agent, response_cache, oregon_state
+):
+    mock_agent = MagicMock()
+    ai_msg = AIMessage(content=[{"type": "text", "text": "You have rights."}])
+    mock_agent.stream.side_effect = lambda **_: iter(
+        [("updates", {"agent": {"messages": [ai_msg]}})]
+    )
+    mock_create_agent.return_value = mock_agent
+
+    requests: list[tuple[Optional[str], list[AnyMessage | Dict[str, Any]]]] = [
+        ("session-token", [HumanMessage("Help")]),
+        (None, [HumanMessage("Help"), AIMessage("Hi"), HumanMessage("More")]),
+    ]
+    for thread_id, messages in requests:
+        list(
+            LangChainChatManager().generate_streaming_response(
+                messages=messages, city=None, state=oregon_state, thread_id=thread_id
+            )
+        )
+    assert len(response_cache) == 0
+
+
+@patch("tenantfirstaid.budget.REQUEST_BUDGET_ENABLED", True)
+@patch.object(LangChainChatManager, "_LangChainChatManager__create_agent_for_session")
+def test_response_cache_skips_answer_cut_short_by_budget(
+    mock_create_agent, response_cache, oregon_state
+):
+    ai_msg = AIMessage(content=[{"type": "text", "text": "Partial answer."}])
+
+    def stream(**_):
+        budget = current_budget()
+        assert budget is not None
+        budget.max_tool_calls = 0
+        assert budget.exhausted()
+        yield ("updates", {"agent": {"messages": [ai_msg]}})
+
+    mock_agent = MagicMock()
+    mock_agent.stream.side_effect = stream
+    mock_create_agent.return_value = mock_agent
+
+    blocks = list(
+        LangChainChatManager().generate_streaming_response(
+            messages=[{"role": "human", "content": "Can I withhold rent?"}],
+            city=None,
+            state=oregon_state,
+            thread_id=None,
+        )
+    )
+
+    assert blocks
+    assert len(response_cache) == 0
+
+
+@patch("tenantfirstaid.langchain_chat_manager.STREAM_COALESCE_SECONDS", 0)
+@patch("tenantfirstaid.graph._get_llm")
+def test_response_cache_keeps_delta_answers_from_default_clients(
+    mock_get_llm, response_cache, oregon_state
+):
+    mock_get_llm.return_value = _StreamingFakeLLM(
+        messages=iter(
+            [AIMessage(content="You have rights here."), AIMessage(content="Again.")]
+        )
+    )
+
+    def ask(stream_deltas):
+        return list(
+            LangChainChatManager().generate_streaming_response(
+                messages=[{"role": "human", "content": "Can I withhold rent?"}],
+                city=None,
+                state=oregon_state,
+                thread_id=None,
+                stream_deltas=stream_deltas,
+            )
+        )
+
+    deltas = ask(stream_deltas=True)
+    assert len(deltas) > 1 and len(response_cache) == 1
+
+    assert ask(stream_deltas=False) == [{"type": "text", "text": "Again."}]
+    assert ask(stream_deltas=True) == deltas
+    assert response_cache.hits == 1
+
+
+@pytest.mark.asyncio
+@patch.object(LangChainChatManager, "_LangChainChatManager__create_agent_for_session")
+async def test_async_response_cache_replays_first_turn_answer(
+    mock_create_agent, response_cache, oregon_state
+):
+    ai_msg = AIMessage(content=[{"type": "text", "text": "You have rights."}])
+
+    async def astream(**_):
+        yield ("updates", {"agent": {"messages": [ai_msg]}})
+
+    mock_agent = MagicMock()
+    mock_agent.astream.side_effect = astream
+    mock_create_agent.return_value = mock_agent
+
+    async def ask():
+        return [
+            b
+            async for b in LangChainChatManager().agenerate_streaming_response(
+                messages=[{"role": "user", "content": "Can I withhold rent?"}],
+                city=None,
+                state=oregon_state,
+                thread_id=None,
+            )
+        ]
+
+    assert await ask() == await ask()
+    assert mock_agent.astream.call_count == 1
@@ -3,6 +3,7 @@ Test location sanitization and other methods
 """
 
 import json
+import threading
 from typing import Dict, cast
 from unittest.mock import MagicMock, patch
 
@@ -17,22 +18,51 @@ from langchain_core.tools import StructuredTool
 from tenantfirstaid.constants import DatastoreKey
 from tenantfirstaid.google_auth import load_gcp_credentials
 from tenantfirstaid.langchain_tools import (
+    FAN_OUT_TOOL_NAME,
+    RETRIEVER_POOL,
     CityStateLawsInputSchema,
     RagBuilder,
+    RetrieverPool,
     _make_rag_tool,
     filter_builder,
     generate_letter,
     get_active_rag_tools,
+    get_agent_rag_tools,
     get_letter_template,
     repair_mojibake,
     retrieve_city_state_laws,
     retrieve_oregon_law_help,
 )
 from tenantfirstaid.location import OregonCity, UsaState
+from tenantfirstaid.retrieval_cache import RETRIEVAL_CACHE
 
 pytestmark = pytest.mark.langchain
 
 
+@pytest.fixture(autouse=True)
+def _empty_retriever_pool():
+    """Keep pooled (possibly mocked) retrievers from leaking between tests."""
+    RETRIEVER_POOL.clear()
+    yield
+    RETRIEVER_POOL.clear()
+
+
+@pytest.fixture(autouse=True)
+def _empty_retrieval_cache():
+    """Keep cached (mocked) search results from leaking between tests."""
+    RETRIEVAL_CACHE.clear()
+    yield
+    RETRIEVAL_CACHE.clear()
+
+
+@pytest.fixture(autouse=True)
+def _vertex_ai_search_only():
+    """Exercise Vertex AI Search error handling without the local fallback
+    (covered in test_local_retrieval.py)."""
+    with patch("tenantfirstaid.langchain_tools.LOCAL_RETRIEVAL_MODE", "off"):
+        yield
+
+
 def test_only_oregon_json_serialization():
     city = None
     beaver_state = UsaState("or")
@@ -83,7 +113,7 @@ def test_get_letter_template_returns_template():
 @patch("tenantfirstaid.langchain_tools.RagBuilder")
 def test_retrieve_city_state_laws_state_only(mock_rag_class):
     """Test tool can be invoked with only state parameter."""
-    mock_rag_class.return_value.search.return_value = ""
+    mock_rag_class.return_value.search_passages.return_value = []
 
     # Should not raise despite city being omitted.
     retrieve_city_state_laws.invoke(  # type: ignore[union-attr]
@@ -97,7 +127,7 @@ def test_retrieve_city_state_laws_state_only(mock_rag_class):
 @patch("tenantfirstaid.langchain_tools.RagBuilder")
 def test_retrieve_city_state_laws_with_city(mock_rag_class):
     """Test that city and state are forwarded to the filter."""
-    mock_rag_class.return_value.search.return_value = ""
+    mock_rag_class.return_value.search_passages.return_value = []
 
     retrieve_city_state_laws.invoke(  # type: ignore[union-attr]
         input={
@@ -193,7 +223,10 @@ def test_load_gcp_credentials_invalid_json():
 @patch("tenantfirstaid.langchain_tools.RagBuilder")
 def test_retrieve_city_state_laws_returns_joined_docs(mock_rag_class):
     """Test that RAG results are joined with newlines."""
-    mock_rag_class.return_value.search.return_value = "Doc1 content\nDoc2 content"
+    mock_rag_class.return_value.search_passages.return_value = [
+        "Doc1 content",
+        "Doc2 content",
+    ]
 
     _func = getattr(retrieve_city_state_laws, "func")
     result = _func(
@@ -251,7 +284,7 @@ def test_repair_mojibake_continuation_byte_chars_unchanged(text: str) -> None:
 @patch("tenantfirstaid.langchain_tools.RagBuilder")
 def test_retrieve_city_state_laws_empty_results(mock_rag_class):
     """Test behavior when RAG returns no documents."""
-    mock_rag_class.return_value.search.return_value = ""
+    mock_rag_class.return_value.search_passages.return_value = []
 
     _func = getattr(retrieve_city_state_laws, "func")
     result = _func(
@@ -264,7 +297,7 @@ def test_retrieve_city_state_laws_empty_results(mock_rag_class):
 @patch("tenantfirstaid.langchain_tools.RagBuilder")
 def test_retrieve_oregon_law_help_uses_correct_datastore(mock_rag_class):
     """Test that retrieve_oregon_law_help uses the oregon_law_help datastore without filtering."""
-    mock_rag_class.return_value.search.return_value = "Some legal guidance"
+    mock_rag_class.return_value.search_passages.return_value = ["Some legal guidance"]
 
     with patch.dict(
         "tenantfirstaid.langchain_tools.SINGLETON.VERTEX_AI_DATASTORES",
@@ -277,7 +310,7 @@ def test_retrieve_oregon_law_help_uses_correct_datastore(mock_rag_class):
         data_store_id="fake-olh-datastore-id",
         name="retrieve_oregon_law_help",
         filter=None,
-        max_documents=3,
+        max_documents=8,
     )
     assert result == "Some legal guidance"
 
@@ -297,7 +330,7 @@ def test_get_active_rag_tools_filters_by_configured_datastores():
 @patch("tenantfirstaid.langchain_tools.RagBuilder")
 def test_make_rag_tool_custom_filter_builder(mock_rag_class):
     """Custom filter_builder is called instead of the default."""
-    mock_rag_class.return_value.search.return_value = ""
+    mock_rag_class.return_value.search_passages.return_value = []
     custom_filter = MagicMock(return_value="custom-filter")
 
     custom_tool = _make_rag_tool(
@@ -327,7 +360,7 @@ def test_make_rag_tool_custom_filter_builder(mock_rag_class):
         data_store_id="fake-id",
         name="test_tool",
         filter="custom-filter",
-        max_documents=5,
+        max_documents=8,
     )
 
 
@@ -361,14 +394,15 @@ def test_generate_letter_empty_string(mock_get_stream_writer):
 
 
 @patch("tenantfirstaid.langchain_tools.load_gcp_credentials")
-@patch("tenantfirstaid.langchain_tools.VertexAISearchRetriever")
-def test_rag_search_retries_on_httpx_read_error(mock_retriever_class, mock_creds):
+@patch("tenantfirstaid.langchain_tools._new_retriever")
+def test_rag_search_retries_on_httpx_read_error(mock_new_retriever, mock_creds):
     """Transient httpx.ReadError is retried and succeeds on second attempt."""
     mock_creds.return_value = MagicMock()
     mock_doc = MagicMock()
     mock_doc.page_content = "result text"
 
-    mock_instance = mock_retriever_class.return_value
+    mock_instance = mock_new_retriever.return_value
+    mock_instance.model_copy.return_value = mock_instance
     mock_instance.invoke.side_effect = [
         httpx.ReadError("Connection reset by peer"),
         [mock_doc],
@@ -385,12 +419,13 @@ def test_rag_search_retries_on_httpx_read_error(mock_retriever_class, mock_creds
 
 
 @patch("tenantfirstaid.langchain_tools.load_gcp_credentials")
-@patch("tenantfirstaid.langchain_tools.VertexAISearchRetriever")
-def test_rag_search_gives_up_after_three_attempts(mock_retriever_class, mock_creds):
+@patch("tenantfirstaid.langchain_tools._new_retriever")
+def test_rag_search_gives_up_after_three_attempts(mock_new_retriever, mock_creds):
     """After 3 failed attempts the error is reraised."""
     mock_creds.return_value = MagicMock()
 
-    mock_instance = mock_retriever_class.return_value
+    mock_instance = mock_new_retriever.return_value
+    mock_instance.model_copy.return_value = mock_instance
     mock_instance.invoke.side_effect = httpx.ReadError("Connection reset by peer")
 
     builder = RagBuilder(
@@ -401,3 +436,319 @@ def test_rag_search_gives_up_after_three_attempts(mock_retriever_class, mock_cre
         builder.search("test query")
 
     assert mock_instance.invoke.call_count == 3
+
+
+@patch("tenantfirstaid.langchain_tools.past_request_deadline", return_value=True)
+@patch("tenantfirstaid.langchain_tools.load_gcp_credentials")
+@patch("tenantfirstaid.langchain_tools._new_retriever")
+def test_rag_search_stops_retrying_past_request_deadline(
+    mock_new_retriever, mock_creds, _mock_deadline
+):
+    """No backoff retries once the request's budget deadline has passed."""
+    mock_instance = mock_new_retriever.return_value
+    mock_instance.model_copy.return_value = mock_instance
+    mock_instance.invoke.side_effect = httpx.ReadError("Connection reset by peer")
+
+    builder = RagBuilder(data_store_id="fake-datastore-id")
+    with pytest.raises(httpx.ReadError):
+        builder.search("test query")
+
+    assert mock_instance.invoke.call_count == 1
+
+
+# --- RetrieverPool tests ---
+
+
+@patch("tenantfirstaid.langchain_tools.load_gcp_credentials")
+@patch("tenantfirstaid.langchain_tools._new_retriever")
+def test_rag_builder_reuses_pooled_retriever(mock_new_retriever, mock_creds):
+    """Repeated RagBuilder construction loads creds and builds the client once."""
+    RagBuilder(data_store_id="fake-datastore-id", filter="f1", max_documents=3)
+    RagBuilder(data_store_id="fake-datastore-id", filter="f2", max_documents=7)
+
+    mock_creds.assert_called_once()
+    mock_new_retriever.assert_called_once()
+    copies = mock_new_retriever.return_value.model_copy.call_args_list
+    assert [c.kwargs["update"]["filter"] for c in copies] == ["f1", "f2"]
+    assert [c.kwargs["update"]["max_documents"] for c in copies] == [3, 7]
+
+
+@patch("tenantfirstaid.langchain_tools.load_gcp_credentials")
+@patch("tenantfirstaid.langchain_tools._new_retriever")
+def test_retriever_pool_keys_by_datastore(mock_new_retriever, mock_creds):
+    """Each datastore gets its own retriever; credentials are shared."""
+    pool = RetrieverPool()
+    pool.acquire("ds-a")
+    pool.acquire("ds-b")
+    pool.acquire("ds-a")
+
+    assert len(pool) == 2
+    assert mock_new_retriever.call_count == 2
+    mock_creds.assert_called_once()
+    built_for = [c.kwargs["data_store_id"] for c in mock_new_retriever.call_args_list]
+    assert built_for == ["ds-a", "ds-b"]
+
+
+@patch("tenantfirstaid.langchain_tools.load_gcp_credentials")
+@patch("tenantfirstaid.langchain_tools._new_retriever")
+def test_retriever_pool_evicts_least_recently_used(mock_new_retriever, _mock_creds):
+    """Beyond max_size, the least recently used datastore is dropped."""
+    pool = RetrieverPool(max_size=2)
+    pool.acquire("ds-a")
+    pool.acquire("ds-b")
+    pool.acquire("ds-a")  # ds-b is now least recently used
+    pool.acquire("ds-c")
+    pool.acquire("ds-a")
+
+    assert len(pool) == 2
+    built_for = [c.kwargs["data_store_id"] for c in mock_new_retriever.call_args_list]
+    assert built_for == ["ds-a", "ds-b", "ds-c"]
+
+
+@patch("tenantfirstaid.langchain_tools.time.monotonic")
+@patch("tenantfirstaid.langchain_tools.load_gcp_credentials")
+@patch("tenantfirstaid.langchain_tools._new_retriever")
+def test_retriever_pool_evicts_idle_entries(
+    mock_new_retriever, _mock_creds, mock_monotonic
+):
+    """Entries unused for longer than idle_seconds are rebuilt on next acquire."""
+    pool = RetrieverPool(idle_seconds=60)
+    mock_monotonic.return_value = 1000.0
+    pool.acquire("ds-a")
+    mock_monotonic.return_value = 1030.0
+    pool.acquire("ds-a")
+    assert mock_new_retriever.call_count == 1
+
+    mock_monotonic.return_value = 1100.0
+    pool.acquire("ds-a")
+    assert mock_new_retriever.call_count == 2
+
+
+def test_retriever_pool_rejects_non_positive_size():
+    with pytest.raises(ValueError, match="max_size"):
+        RetrieverPool(max_size=0)
+
+
+# --- retrieval result cache ---
+
+
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+def test_retrieve_city_state_laws_serves_repeat_query_from_cache(mock_rag_class):
+    """A repeated (normalized) query with the same filter skips the search."""
+    mock_rag_class.return_value.search_passages.return_value = ["ORS 90.300 text"]
+    _func = getattr(retrieve_city_state_laws, "func")
+
+    first = _func(query="Security deposit interest", state=UsaState("or"))
+    second = _func(query="  security   DEPOSIT interest ", state=UsaState("or"))
+
+    assert first == second == "ORS 90.300 text"
+    mock_rag_class.return_value.search_passages.assert_called_once()
+
+
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+def test_retrieve_city_state_laws_cache_distinguishes_filter_and_params(
+    mock_rag_class,
+):
+    """City and extraction parameters are part of the cache key."""
+    mock_rag_class.return_value.search_passages.return_value = ["passage"]
+    _func = getattr(retrieve_city_state_laws, "func")
+
+    _func(query="notice", state=UsaState("or"))
+    _func(query="notice", state=UsaState("or"), city=OregonCity("portland"))
+    _func(query="notice", state=UsaState("or"), max_extractive_answer_count=3)
+
+    assert mock_rag_class.return_value.search_passages.call_count == 3
+
+
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+def test_retrieve_city_state_laws_widens_from_cached_page(mock_rag_class):
+    """A retry with more passages is served from the first search's page."""
+    page = [f"passage {i}" for i in range(8)]
+    mock_rag_class.return_value.search_passages.return_value = page
+    _func = getattr(retrieve_city_state_laws, "func")
+
+    first = _func(query="notice", state=UsaState("or"), max_documents=3)
+    wider = _func(query="notice", state=UsaState("or"), max_documents=7)
+
+    assert first == "\n".join(page[:3])
+    assert wider == "\n".join(page[:7])
+    mock_rag_class.return_value.search_passages.assert_called_once()
+    assert mock_rag_class.call_args.kwargs["max_documents"] == 8
+
+
+@patch("tenantfirstaid.langchain_tools.PROGRESSIVE_RETRIEVAL_ENABLED", False)
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+def test_retrieve_city_state_laws_without_progressive_retrieval(mock_rag_class):
+    mock_rag_class.return_value.search_passages.return_value = ["passage"]
+    _func = getattr(retrieve_city_state_laws, "func")
+
+    _func(query="notice", state=UsaState("or"), max_documents=3)
+    _func(query="notice", state=UsaState("or"), max_documents=7)
+
+    assert [c.kwargs["max_documents"] for c in mock_rag_class.call_args_list] == [
+        3,
+        7,
+    ]
+
+
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+def test_retrieve_city_state_laws_does_not_cache_empty_results(mock_rag_class):
+    mock_rag_class.return_value.search_passages.return_value = []
+    _func = getattr(retrieve_city_state_laws, "func")
+
+    _func(query="obscure law", state=UsaState("or"))
+    _func(query="obscure law", state=UsaState("or"))
+
+    assert mock_rag_class.return_value.search_passages.call_count == 2
+
+
+# --- multi-datastore fan-out ---
+
+_BOTH_DATASTORES = {
+    DatastoreKey.LAWS: "fake-laws-id",
+    DatastoreKey.OREGON_LAW_HELP: "fake-olh-id",
+}
+
+
+@pytest.fixture
+def _both_rag_tools_registered():
+    with patch(
+        "tenantfirstaid.langchain_tools.RAG_TOOL_REGISTRY",
+        [
+            (DatastoreKey.LAWS, retrieve_city_state_laws),
+            (DatastoreKey.OREGON_LAW_HELP, retrieve_oregon_law_help),
+        ],
+    ):
+        yield
+
+
+def _rag_builder_by_datastore(results):
+    """RagBuilder stand-in whose search_passages result depends on the datastore."""
+
+    def _build(*, data_store_id, **_kwargs):
+        outcome = results[data_store_id]
+        builder = MagicMock()
+        if isinstance(outcome, BaseException):
+            builder.search_passages.side_effect = outcome
+        else:
+            builder.search_passages.return_value = outcome
+        return builder
+
+    return _build
+
+
+def test_get_agent_rag_tools_single_datastore_is_unchanged():
+    with patch.dict(
+        "tenantfirstaid.langchain_tools.SINGLETON.VERTEX_AI_DATASTORES",
+        {DatastoreKey.LAWS: "fake-laws-id"},
+        clear=True,
+    ):
+        tools = get_agent_rag_tools()
+    assert [t.name for t in tools] == ["retrieve_city_state_laws"]
+
+
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+@pytest.mark.usefixtures("_both_rag_tools_registered")
+def test_fan_out_tool_merges_and_dedupes_passages(mock_rag_class):
+    """Both datastores are queried; duplicate passages appear once, in order."""
+    mock_rag_class.side_effect = _rag_builder_by_datastore(
+        {
+            "fake-laws-id": ["ORS 90.300 deposits", "ORS 90.427 notice"],
+            "fake-olh-id": ["ORS 90.427  notice", "How to get a deposit back"],
+        }
+    )
+    with patch.dict(
+        "tenantfirstaid.langchain_tools.SINGLETON.VERTEX_AI_DATASTORES",
+        _BOTH_DATASTORES,
+        clear=True,
+    ):
+        (fan_out,) = get_agent_rag_tools()
+        result = getattr(fan_out, "func")(
+            query="deposit", state=UsaState("or"), city=OregonCity("portland")
+        )
+
+    assert fan_out.name == FAN_OUT_TOOL_NAME
+    assert result.split("\n") == [
+        "ORS 90.300 deposits",
+        "ORS 90.427 notice",
+        "How to get a deposit back",
+    ]
+    # Each datastore gets its own filter: the laws corpus is filtered by
+    # location, the Oregon Law Help corpus is not filtered at all.
+    filters = {
+        c.kwargs["data_store_id"]: c.kwargs["filter"]
+        for c in mock_rag_class.call_args_list
+    }
+    assert "portland" in filters["fake-laws-id"]
+    assert filters["fake-olh-id"] is None
+
+
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+@pytest.mark.usefixtures("_both_rag_tools_registered")
+def test_fan_out_tool_skips_failed_datastore(mock_rag_class):
+    mock_rag_class.side_effect = _rag_builder_by_datastore(
+        {
+            "fake-laws-id": ConnectionError("reset"),
+            "fake-olh-id": ["How to get a deposit back"],
+        }
+    )
+    with patch.dict(
+        "tenantfirstaid.langchain_tools.SINGLETON.VERTEX_AI_DATASTORES",
+        _BOTH_DATASTORES,
+        clear=True,
+    ):
+        (fan_out,) = get_agent_rag_tools()
+        result = getattr(fan_out, "func")(query="deposit", state=UsaState("or"))
+
+    assert result == "How to get a deposit back"
+
+
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+@pytest.mark.usefixtures("_both_rag_tools_registered")
+def test_fan_out_tool_raises_when_every_datastore_fails(mock_rag_class):
+    mock_rag_class.side_effect = _rag_builder_by_datastore(
+        {
+            "fake-laws-id": ConnectionError("reset"),
+            "fake-olh-id": ConnectionError("reset"),
+        }
+    )
+    with patch.dict(
+        "tenantfirstaid.langchain_tools.SINGLETON.VERTEX_AI_DATASTORES",
+        _BOTH_DATASTORES,
+        clear=True,
+    ):
+        (fan_out,) = get_agent_rag_tools()
+        with pytest.raises(ConnectionError):
+            getattr(fan_out, "func")(query="deposit", state=UsaState("or"))
+
+
+@patch("tenantfirstaid.langchain_tools.RAG_FAN_OUT_TIMEOUT_SECONDS", 0.05)
+@patch("tenantfirstaid.langchain_tools.RagBuilder")
+@pytest.mark.usefixtures("_both_rag_tools_registered")
+def test_fan_out_tool_skips_slow_datastore(mock_rag_class):
+    release = threading.Event()
+
+    def _slow(*_args, **_kwargs):
+        release.wait(timeout=5)
+        return ["late passage"]
+
+    slow_builder = MagicMock()
+    slow_builder.search_passages.side_effect = _slow
+    fast_builder = MagicMock()
+    fast_builder.search_passages.return_value = ["fast passage"]
+    mock_rag_class.side_effect = lambda *, data_store_id, **_: (
+        slow_builder if data_store_id == "fake-laws-id" else fast_builder
+    )
+
+    try:
+        with patch.dict(
+            "tenantfirstaid.langchain_tools.SINGLETON.VERTEX_AI_DATASTORES",
+            _BOTH_DATASTORES,
+            clear=True,
+        ):
+            (fan_out,) = get_agent_rag_tools()
+            result = getattr(fan_out, "func")(query="deposit", state=UsaState("or"))
+    finally:
+        release.set()
+
+    assert result == "fast passage"
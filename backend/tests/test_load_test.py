@@ -0,0 +1,106 @@
+"""Tests for scripts.load_test."""
+
+import json
+import os
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from scripts.load_test import (
+    FakeConfig,
+    FakeStreamingChatModel,
+    InProcessServer,
+    LoadTestResult,
+    _PeakSampler,
+    make_fake_rag_builder,
+    process_stats,
+    run_load,
+)
+
+_FAST = FakeConfig(
+    first_token_delay=0.0, token_rate=10_000, reply_words=5, retrieval_delay=0.0
+)
+
+
+def test_fake_model_requests_retrieval_for_user_question():
+    model = FakeStreamingChatModel(config=_FAST)
+
+    reply = model.invoke([HumanMessage("Can my landlord raise rent?")])
+
+    assert isinstance(reply, AIMessage)
+    assert reply.tool_calls[0]["name"] == "retrieve_city_state_laws"
+    assert reply.tool_calls[0]["args"]["query"] == "Can my landlord raise rent?"
+
+
+def test_fake_model_streams_reply_after_tool_result():
+    model = FakeStreamingChatModel(config=_FAST)
+    history = [
+        HumanMessage("Q"),
+        AIMessage("", tool_calls=[{"name": "t", "args": {}, "id": "c1"}]),
+        ToolMessage("passages", tool_call_id="c1"),
+    ]
+
+    chunks = [c for c in model.stream(history) if c.text]
+
+    assert len(chunks) == 5
+    assert "".join(c.text for c in chunks) == "tenant tenant tenant tenant tenant"
+
+
+def test_fake_rag_builder_returns_max_documents_passages():
+    builder_cls = make_fake_rag_builder(_FAST)
+    builder = builder_cls(data_store_id="ds", name="t", max_documents=2)
+
+    assert len(builder.search_passages("deposit")) == 2
+
+
+def test_summary_reports_throughput_and_percentiles():
+    result = LoadTestResult(
+        concurrency=2,
+        requests=4,
+        errors=0,
+        duration=2.0,
+        ttfb=[0.1, 0.2, 0.3, 0.4],
+        latency=[1.0, 1.0, 1.0, 2.0],
+        peak_rss_bytes=64 * 2**20,
+        peak_threads=9,
+    )
+
+    summary = result.summary()
+
+    assert summary["requests_per_second"] == 2.0
+    assert summary["ttfb_ms"]["p50"] == 200.0
+    assert summary["latency_ms"]["p99"] == 2000.0
+    assert summary["peak_rss_mb"] == 64.0
+    json.dumps(summary)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs /proc")
+def test_process_stats_reads_current_process():
+    stats = process_stats(os.getpid())
+
+    assert stats is not None
+    rss, threads = stats
+    assert rss > 0 and threads >= 1
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs /proc")
+def test_peak_sampler_records_and_stops():
+    sampler = _PeakSampler(os.getpid(), interval=0.01)
+    sampler.start()
+    deadline = time.monotonic() + 5
+    while sampler.peak_rss is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sampler.stop()
+
+    assert not sampler.is_alive()
+    assert sampler.peak_rss is not None and sampler.peak_rss > 0
+
+
+def test_in_process_load_run_end_to_end():
+    with InProcessServer(_FAST, log_level="WARNING") as server:
+        result = run_load(server.base_url, concurrency=2, requests=4)
+
+    assert result.errors == 0
+    assert len(result.latency) == 4
+    assert all(t <= lat for t, lat in zip(result.ttfb, result.latency))
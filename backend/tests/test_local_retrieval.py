@@ -0,0 +1,230 @@
+"""Tests for the bundled BM25 index and its use by retrieve_city_state_laws."""
+
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from scripts.build_local_index import MAX_WORDS, chunk_text
+from tenantfirstaid.langchain_tools import (
+    retrieve_city_state_laws,
+    retrieve_city_state_laws_local,
+)
+from tenantfirstaid.local_retrieval import (
+    BM25Index,
+    Passage,
+    get_local_index,
+    reset_local_index,
+    tokenize,
+)
+from tenantfirstaid.retrieval_cache import RETRIEVAL_CACHE
+
+_PASSAGES = [
+    Passage(
+        "90.300 Security deposits. A landlord shall pay interest on deposits.",
+        "ORS090",
+        "or",
+    ),
+    Passage("90.394 Termination of tenancy for failure to pay rent.", "ORS090", "or"),
+    Passage(
+        "30.01.085 Relocation assistance for security deposits in Portland.",
+        "PCC30-01",
+        "or",
+        "portland",
+    ),
+    Passage(
+        "8.425 Rental housing security deposits in Eugene.",
+        "EHC8-425",
+        "or",
+        "eugene",
+    ),
+]
+
+_ARGS = {"query": "security deposit", "state": "or"}
+
+
+@pytest.fixture
+def small_index(tmp_path: Path):
+    """Serve a small saved index in place of the bundled one."""
+    path = tmp_path / "index.json.gz"
+    BM25Index.build(_PASSAGES).save(path)
+    reset_local_index()
+    with patch("tenantfirstaid.local_retrieval.LOCAL_INDEX_PATH", path):
+        yield
+    reset_local_index()
+
+
+@pytest.fixture
+def no_index(tmp_path: Path):
+    reset_local_index()
+    with patch(
+        "tenantfirstaid.local_retrieval.LOCAL_INDEX_PATH", tmp_path / "missing.gz"
+    ):
+        yield
+    reset_local_index()
+
+
+@pytest.fixture(autouse=True)
+def _empty_retrieval_cache():
+    RETRIEVAL_CACHE.clear()
+    yield
+    RETRIEVAL_CACHE.clear()
+
+
+def test_tokenize_keeps_section_numbers_and_folds_plurals():
+    assert tokenize("Notice under ORS 90.394 and PCC 30.01.085 for deposits") == [
+        "notice",
+        "under",
+        "ors",
+        "90.394",
+        "pcc",
+        "30.01.085",
+        "deposit",
+    ]
+
+
+def test_search_ranks_matching_passage_first():
+    index = BM25Index.build(_PASSAGES)
+    results = index.search("failure to pay rent 90.394", "or")
+    assert results[0].text.startswith("90.394")
+
+
+def test_search_applies_city_state_filter():
+    index = BM25Index.build(_PASSAGES)
+    sources = lambda city: {p.source for p in index.search("deposits", "or", city)}  # noqa: E731
+
+    assert sources(None) == {"ORS090"}
+    assert sources("portland") == {"ORS090", "PCC30-01"}
+    assert sources("Eugene") == {"ORS090", "EHC8-425"}
+    assert index.search("deposits", "wa") == []
+
+
+def test_search_limits_results():
+    index = BM25Index.build(_PASSAGES)
+    assert len(index.search("deposits", "or", "portland", k=1)) == 1
+
+
+def test_save_load_round_trip(tmp_path: Path):
+    path = tmp_path / "index.json.gz"
+    index = BM25Index.build(_PASSAGES)
+    index.save(path)
+    first = path.read_bytes()
+    index.save(path)
+    assert path.read_bytes() == first  # deterministic output
+
+    loaded = BM25Index.load(path)
+    assert loaded.passages == index.passages
+    assert loaded.search("interest", "or") == index.search("interest", "or")
+
+
+def test_load_rejects_other_versions():
+    data = BM25Index.build(_PASSAGES).to_dict()
+    data["version"] = 0
+    with pytest.raises(ValueError, match="build-local-index"):
+        BM25Index.from_dict(data)
+
+
+def test_missing_index_is_unavailable(no_index):
+    assert get_local_index() is None
+    assert retrieve_city_state_laws_local.invoke(_ARGS) == ""
+
+
+def test_bundled_index_finds_statute():
+    reset_local_index()
+    try:
+        index = get_local_index()
+        assert index is not None
+        top = index.search("landlord pay interest on security deposit", "or", k=3)
+        assert any(p.text.startswith("90.300") for p in top)
+    finally:
+        reset_local_index()
+
+
+def test_chunk_text_splits_at_sections_and_caps_length():
+    body = " ".join(["word"] * 70)
+    text = f"90.100 Definitions. {body}\n90.105 Short title.\n" + "x " * (
+        MAX_WORDS + 10
+    )
+    chunks = list(chunk_text(text))
+    assert chunks[0].startswith("90.100")
+    assert chunks[1].startswith("90.105")
+    assert all(len(c.split()) <= MAX_WORDS for c in chunks)
+
+
+def test_chunk_text_groups_short_sections():
+    chunks = list(chunk_text("90.100 Definitions.\n90.105 Short title.\n"))
+    assert chunks == ["90.100 Definitions.\n90.105 Short title."]
+
+
+class TestCityStateLawsLocalFallback:
+    @pytest.fixture(autouse=True)
+    def _fallback_mode(self):
+        with patch("tenantfirstaid.langchain_tools.LOCAL_RETRIEVAL_MODE", "fallback"):
+            yield
+
+    def test_uses_vertex_results_when_available(self, small_index):
+        with patch("tenantfirstaid.langchain_tools.RagBuilder") as builder:
+            builder.return_value.search_passages.return_value = ["remote passage"]
+            assert retrieve_city_state_laws.invoke(_ARGS) == "remote passage"
+
+    def test_falls_back_when_vertex_fails(self, small_index):
+        with patch("tenantfirstaid.langchain_tools.RagBuilder") as builder:
+            builder.return_value.search_passages.side_effect = (
+                google_exceptions.ServiceUnavailable("down")
+            )
+            result = retrieve_city_state_laws.invoke(_ARGS)
+            # Fallback answers are not cached, so Vertex AI Search is retried.
+            retrieve_city_state_laws.invoke(_ARGS)
+        assert result.startswith("90.300 Security deposits")
+        assert "Portland" not in result
+        assert builder.return_value.search_passages.call_count == 2
+
+    def test_falls_back_when_vertex_is_slow(self, small_index):
+        release = threading.Event()
+
+        def _slow(query: str) -> list[str]:
+            release.wait(5)
+            return ["late"]
+
+        with (
+            patch("tenantfirstaid.langchain_tools.RagBuilder") as builder,
+            patch(
+                "tenantfirstaid.langchain_tools.LOCAL_RETRIEVAL_FALLBACK_SECONDS", 0.01
+            ),
+        ):
+            builder.return_value.search_passages.side_effect = _slow
+            try:
+                result = retrieve_city_state_laws.invoke(_ARGS)
+            finally:
+                release.set()
+        assert result.startswith("90.300")
+
+    def test_raises_without_index(self, no_index):
+        with patch("tenantfirstaid.langchain_tools.RagBuilder") as builder:
+            builder.return_value.search_passages.side_effect = (
+                google_exceptions.ServiceUnavailable("down")
+            )
+            with pytest.raises(google_exceptions.ServiceUnavailable):
+                retrieve_city_state_laws.invoke(_ARGS)
+
+    def test_non_transient_error_is_not_hidden(self, small_index):
+        with patch("tenantfirstaid.langchain_tools.RagBuilder") as builder:
+            builder.return_value.search_passages.side_effect = (
+                google_exceptions.PermissionDenied("bad credentials")
+            )
+            with pytest.raises(google_exceptions.PermissionDenied):
+                retrieve_city_state_laws.invoke(_ARGS)
+
+    def test_primary_mode_skips_vertex(self, small_index):
+        with (
+            patch("tenantfirstaid.langchain_tools.LOCAL_RETRIEVAL_MODE", "primary"),
+            patch("tenantfirstaid.langchain_tools.RagBuilder") as builder,
+        ):
+            result = retrieve_city_state_laws.invoke(
+                {**_ARGS, "city": "portland", "max_documents": 2}
+            )
+        builder.assert_not_called()
+        assert result.count("\n") == 1
+        assert "Portland" in result
@@ -0,0 +1,142 @@
+"""Tests for per-stage latency metrics."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from tenantfirstaid.metrics import (
+    METRICS,
+    StageMetrics,
+    server_timing,
+    start_request_timings,
+    timed,
+    timed_fn,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_metrics():
+    METRICS.clear()
+    yield
+    METRICS.clear()
+
+
+@pytest.fixture
+def metrics_enabled():
+    with patch("tenantfirstaid.metrics.METRICS_ENABLED", True):
+        yield
+
+
+def test_snapshot_reports_quantiles():
+    metrics = StageMetrics(window=100)
+    for ms in range(1, 101):
+        metrics.observe("model", ms / 1000)
+
+    summary = metrics.snapshot()["model"]
+
+    assert summary["count"] == 100
+    assert summary["sum"] == pytest.approx(5.05)
+    assert summary["p50"] == pytest.approx(0.050)
+    assert summary["p95"] == pytest.approx(0.095)
+    assert summary["p99"] == pytest.approx(0.099)
+
+
+def test_quantiles_use_recent_window_only():
+    metrics = StageMetrics(window=2)
+    for seconds in (10.0, 1.0, 1.0):
+        metrics.observe("rag_search", seconds)
+
+    summary = metrics.snapshot()["rag_search"]
+
+    # count and sum cover every observation; quantiles the last `window`.
+    assert summary["count"] == 3
+    assert summary["sum"] == pytest.approx(12.0)
+    assert summary["p99"] == 1.0
+
+
+def test_render_prometheus():
+    metrics = StageMetrics()
+    metrics.observe("parse", 0.002)
+
+    text = metrics.render_prometheus()
+
+    assert "# TYPE tenantfirstaid_stage_duration_seconds summary" in text
+    assert (
+        'tenantfirstaid_stage_duration_seconds{stage="parse",quantile="0.5"} 0.002000'
+        in text
+    )
+    assert 'tenantfirstaid_stage_duration_seconds_count{stage="parse"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_rejects_non_positive_window():
+    with pytest.raises(ValueError, match="window"):
+        StageMetrics(window=0)
+
+
+def test_timers_are_no_ops_when_disabled():
+    @timed_fn("decorated")
+    def _work():
+        return 42
+
+    with patch("tenantfirstaid.metrics.METRICS_ENABLED", False):
+        assert start_request_timings() is None
+        with timed("block"):
+            pass
+        assert _work() == 42
+
+    assert METRICS.snapshot() == {}
+
+
+@pytest.mark.usefixtures("metrics_enabled")
+def test_timers_record_globally_and_per_request():
+    @timed_fn("decorated")
+    def _work():
+        return 42
+
+    timings = start_request_timings()
+    with timed("block"):
+        pass
+    assert _work() == 42
+    assert _work() == 42
+
+    assert timings is not None
+    assert set(timings) == {"block", "decorated"}
+    assert METRICS.snapshot()["decorated"]["count"] == 2
+
+
+@pytest.mark.usefixtures("metrics_enabled")
+def test_timer_records_when_block_raises():
+    with pytest.raises(RuntimeError):
+        with timed("failing"):
+            raise RuntimeError("boom")
+
+    assert METRICS.snapshot()["failing"]["count"] == 1
+
+
+@pytest.mark.usefixtures("metrics_enabled")
+def test_request_timings_are_isolated_per_thread():
+    timings = start_request_timings()
+    other: dict = {}
+
+    def _other_request():
+        other["timings"] = start_request_timings()
+        with timed("other"):
+            pass
+
+    thread = threading.Thread(target=_other_request)
+    thread.start()
+    thread.join()
+
+    assert timings == {}
+    assert set(other["timings"]) == {"other"}
+
+
+def test_server_timing_format():
+    assert server_timing(None) is None
+    assert server_timing({}) is None
+    assert (
+        server_timing({"parse": 0.0004, "model": 0.8123})
+        == "parse;dur=0.4, model;dur=812.3"
+    )
@@ -0,0 +1,72 @@
+"""Tests for exact ORS section lookup and the lookup_ors_section tool."""
+
+import pytest
+
+from tenantfirstaid.langchain_tools import lookup_ors_section
+from tenantfirstaid.ors_sections import (
+    MAX_RANGE_SECTIONS,
+    OrsSections,
+    get_ors_sections,
+    lookup_sections,
+    parse_citations,
+)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("ORS 90.394", [("90.394", None)]),
+        ("ORS 90.394(3)(a)", [("90.394", None)]),
+        ("90.155, 90.160", [("90.155", None), ("90.160", None)]),
+        ("ORS 90.453 to 90.459", [("90.453", "90.459")]),
+        ("90.394–90.396", [("90.394", "90.396")]),
+        ("ORS 90.394 - ORS 90.396", [("90.394", "90.396")]),
+        ("ORS 659A.421", [("659A.421", None)]),
+        ("no citation here", []),
+    ],
+)
+def test_parse_citations(text, expected):
+    assert parse_citations(text) == expected
+
+
+def test_range_follows_statute_order():
+    sections = OrsSections(
+        {"90.1000": "c", "90.100": "a", "90.105": "b", "91.100": "d"}
+    )
+    assert sections.range("90.100", "90.1000") == ["90.100", "90.105", "90.1000"]
+    assert sections.range("90.105", "90.100") == ["90.100", "90.105"]
+
+
+def test_lookup_exact_section():
+    [(number, text)] = lookup_sections("ORS 90.394(1)")
+    assert number == "90.394"
+    assert text is not None
+    assert text.startswith("Termination of tenancy for failure to pay rent.")
+
+
+def test_lookup_range_and_duplicates():
+    numbers = [n for n, _ in lookup_sections("ORS 90.394 to 90.396; 90.395")]
+    assert numbers == ["90.394", "90.395", "90.396"]
+
+
+def test_lookup_truncates_long_ranges():
+    assert len(get_ors_sections()) > MAX_RANGE_SECTIONS
+    assert len(lookup_sections("90.100-90.940")) == MAX_RANGE_SECTIONS
+
+
+def test_lookup_unknown_section():
+    assert lookup_sections("ORS 105.100") == [("105.100", None)]
+
+
+def test_tool_formats_sections():
+    result = lookup_ors_section.invoke({"citations": "ORS 90.155 and ORS 105.100"})
+    first, second = result.split("\n\n", 1)[0], result.rsplit("\n\n", 1)[1]
+    assert first.startswith("ORS 90.155 ")
+    assert second == "ORS 105.100: not found in the bundled statutes."
+
+
+def test_tool_without_citation():
+    assert (
+        lookup_ors_section.invoke({"citations": "security deposits"})
+        == "No ORS section numbers found in the request."
+    )
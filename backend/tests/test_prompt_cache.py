@@ -0,0 +1,119 @@
+"""Tests for provider-side prompt prefix caching (prompt_cache.py)."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import SystemMessage
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from tenantfirstaid.prompt_cache import PromptContextCache
+
+_PROMPT = SystemMessage("Base prompt.\nThe user is in Portland OR.\n")
+_TOOLS = [MagicMock(name="tool")]
+
+
+def _model(name: str = "gemini-test") -> MagicMock:
+    model = MagicMock(spec=ChatGoogleGenerativeAI)
+    model.model = name
+    return model
+
+
+def _cache(creator=None, **kwargs) -> PromptContextCache:
+    if creator is None:
+        names = iter(f"cachedContents/{i}" for i in range(100))
+        creator = MagicMock(side_effect=lambda *_: next(names))
+    return PromptContextCache(
+        ttl_seconds=kwargs.pop("ttl_seconds", 3600),
+        refresh_seconds=kwargs.pop("refresh_seconds", 300),
+        retry_seconds=kwargs.pop("retry_seconds", 600),
+        creator=creator,
+        **kwargs,
+    )
+
+
+def test_miss_sends_full_prompt_and_creates_in_background():
+    creator = MagicMock(return_value="cachedContents/abc")
+    cache = _cache(creator)
+    model = _model()
+
+    assert cache.lookup(model, _PROMPT, _TOOLS) is None
+    cache.join()
+    assert cache.lookup(model, _PROMPT, _TOOLS) == "cachedContents/abc"
+    creator.assert_called_once_with(model, _PROMPT, _TOOLS, 3600)
+
+
+def test_prefix_is_keyed_by_prompt_model_and_tools():
+    cache = _cache()
+    model = _model()
+    cache.lookup(model, _PROMPT, _TOOLS)
+    cache.lookup(model, SystemMessage("Base prompt.\nThe user is in OR.\n"), _TOOLS)
+    cache.lookup(_model("other-model"), _PROMPT, _TOOLS)
+    cache.lookup(model, _PROMPT, [])
+    cache.join()
+    assert len(cache) == 4
+
+
+def test_refreshes_before_expiry():
+    cache = _cache()
+    model = _model()
+    with patch("tenantfirstaid.prompt_cache.time.monotonic", return_value=1000.0):
+        cache.lookup(model, _PROMPT, _TOOLS)
+        cache.join()
+        first = cache.lookup(model, _PROMPT, _TOOLS)
+    assert first == "cachedContents/0"
+
+    # Inside the refresh margin: keep serving the old cache while replacing it.
+    with patch("tenantfirstaid.prompt_cache.time.monotonic", return_value=4400.0):
+        assert cache.lookup(model, _PROMPT, _TOOLS) == first
+        cache.join()
+        assert cache.lookup(model, _PROMPT, _TOOLS) == "cachedContents/1"
+
+
+def test_expired_cache_is_not_used():
+    cache = _cache()
+    model = _model()
+    with patch("tenantfirstaid.prompt_cache.time.monotonic", return_value=0.0):
+        cache.lookup(model, _PROMPT, _TOOLS)
+        cache.join()
+    with patch("tenantfirstaid.prompt_cache.time.monotonic", return_value=3600.0):
+        assert cache.lookup(model, _PROMPT, _TOOLS) is None
+
+
+def test_creation_failure_backs_off():
+    creator = MagicMock(side_effect=RuntimeError("too few tokens"))
+    cache = _cache(creator)
+    model = _model()
+    with patch("tenantfirstaid.prompt_cache.time.monotonic", return_value=0.0):
+        assert cache.lookup(model, _PROMPT, _TOOLS) is None
+        cache.join()
+        assert cache.lookup(model, _PROMPT, _TOOLS) is None
+        cache.join()
+    assert creator.call_count == 1
+
+    with patch("tenantfirstaid.prompt_cache.time.monotonic", return_value=601.0):
+        cache.lookup(model, _PROMPT, _TOOLS)
+        cache.join()
+    assert creator.call_count == 2
+
+
+def test_invalidate_stops_using_cache():
+    cache = _cache()
+    model = _model()
+    cache.lookup(model, _PROMPT, _TOOLS)
+    cache.join()
+    cache.invalidate("cachedContents/0")
+    assert cache.lookup(model, _PROMPT, _TOOLS) is None
+
+
+def test_evicts_least_recently_used_prefix():
+    cache = _cache(max_size=1)
+    model = _model()
+    cache.lookup(model, _PROMPT, _TOOLS)
+    cache.lookup(model, _PROMPT, [])
+    cache.join()
+    assert len(cache) == 1
+
+
+def test_rejects_refresh_longer_than_ttl():
+    with pytest.raises(ValueError):
+        PromptContextCache(ttl_seconds=60, refresh_seconds=60)
@@ -0,0 +1,113 @@
+"""Tests for the first-turn response cache (response_cache.py)."""
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import (
+    AIMessage,
+    ContentBlock,
+    HumanMessage,
+    SystemMessage,
+)
+
+from tenantfirstaid.location import OregonCity, UsaState
+from tenantfirstaid.response_cache import (
+    ResponseCache,
+    first_turn_query,
+    make_response_key,
+)
+
+_OR = UsaState.OREGON
+_PROMPT = SystemMessage("Base prompt.\nThe user is in OR.\n")
+_ANSWER: list[ContentBlock] = [{"type": "text", "text": "Usually not."}]
+
+
+def _key(query: str, city=None, prompt=_PROMPT, datastores=("laws",)):
+    return make_response_key(query, city, _OR, "gemini-test", prompt, datastores)
+
+
+def test_first_turn_query_accepts_only_a_lone_user_message():
+    assert first_turn_query([{"role": "user", "content": "Help"}]) == "Help"
+    assert first_turn_query([HumanMessage("Help")]) == "Help"
+    assert first_turn_query([]) is None
+    assert first_turn_query([AIMessage("Hi")]) is None
+    assert (
+        first_turn_query(
+            [{"role": "user", "content": "a"}, {"role": "ai", "content": "b"}]
+        )
+        is None
+    )
+
+
+def test_long_and_empty_queries_are_not_keyed():
+    assert _key("   ") is None
+    assert _key("word " * 41) is None
+    assert _key("word " * 40) is not None
+
+
+def test_exact_and_normalized_hits():
+    cache = ResponseCache()
+    assert cache.put(_key("Can my landlord keep my deposit?"), _ANSWER)
+    assert cache.get(_key("  can MY landlord keep my deposit?")) == _ANSWER
+    assert cache.hits == 1
+
+
+def test_only_the_same_words_in_order_hit():
+    cache = ResponseCache()
+    cache.put(_key("Can my landlord keep my security deposit?"), _ANSWER)
+    assert cache.get(_key("can my landlord keep my security deposit")) == _ANSWER
+    assert cache.get(_key("Can my landlord keep my deposit?")) is None
+    assert cache.get(_key("My landlord can keep my security deposit?")) is None
+    assert cache.misses == 2
+
+
+def test_negated_question_misses():
+    cache = ResponseCache()
+    cache.put(_key("Can my landlord sue me if I break my lease?"), _ANSWER)
+    assert cache.get(_key("Can my landlord sue me if I don't break my lease?")) is None
+
+
+def test_scope_separates_jurisdiction_prompt_and_datastores():
+    cache = ResponseCache()
+    q = "Can my landlord keep my deposit?"
+    cache.put(_key(q), _ANSWER)
+    assert cache.get(_key(q, city=OregonCity.PORTLAND)) is None
+    assert cache.get(_key(q, prompt=SystemMessage("Edited prompt."))) is None
+    assert cache.get(_key(q, datastores=("laws-2026",))) is None
+    assert cache.get(_key(q)) == _ANSWER
+
+
+def test_letters_and_empty_answers_are_not_stored():
+    cache = ResponseCache()
+    letter: ContentBlock = {
+        "type": "non_standard",
+        "value": {"type": "letter", "content": "Dear"},
+    }
+    assert not cache.put(_key("Write a letter"), [*_ANSWER, letter])
+    reasoning: ContentBlock = {"type": "reasoning", "reasoning": "hm"}
+    assert not cache.put(_key("Hello"), [reasoning])
+    assert len(cache) == 0
+
+
+def test_entries_expire():
+    cache = ResponseCache(ttl_seconds=60)
+    with patch("tenantfirstaid.response_cache.time.monotonic", return_value=0.0):
+        cache.put(_key("Can my landlord enter?"), _ANSWER)
+    with patch("tenantfirstaid.response_cache.time.monotonic", return_value=60.0):
+        assert cache.get(_key("Can my landlord enter?")) is None
+        assert cache.get(_key("Can my landlord enter")) is None
+
+
+def test_evicts_least_recently_used():
+    cache = ResponseCache(max_size=2)
+    cache.put(_key("first question"), _ANSWER)
+    cache.put(_key("second question"), _ANSWER)
+    cache.get(_key("first question"))
+    cache.put(_key("third question"), _ANSWER)
+    assert cache.get(_key("first question")) == _ANSWER
+    assert cache.get(_key("second question")) is None
+
+
+def test_rejects_empty_cache():
+    with pytest.raises(ValueError):
+        ResponseCache(max_size=0)
@@ -0,0 +1,85 @@
+"""Tests for the RAG retrieval result cache."""
+
+from unittest.mock import patch
+
+import pytest
+
+from tenantfirstaid.retrieval_cache import (
+    InMemoryRetrievalBackend,
+    RetrievalCache,
+    SqliteRetrievalBackend,
+    make_cache_key,
+    normalize_query,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryRetrievalBackend(max_size=2)
+    return SqliteRetrievalBackend(tmp_path / "cache.sqlite3", max_size=2)
+
+
+def test_normalize_query_collapses_case_and_whitespace():
+    assert normalize_query("  Security\tDeposit  INTEREST ") == (
+        "security deposit interest"
+    )
+
+
+def test_make_cache_key_depends_on_every_component():
+    base = make_cache_key("ds", "q", "f", {"max_documents": 5})
+    assert base == make_cache_key("ds", " Q ", "f", {"max_documents": 5})
+    assert base != make_cache_key("other-ds", "q", "f", {"max_documents": 5})
+    assert base != make_cache_key("ds", "q2", "f", {"max_documents": 5})
+    assert base != make_cache_key("ds", "q", "g", {"max_documents": 5})
+    assert base != make_cache_key("ds", "q", "f", {"max_documents": 6})
+
+
+def test_backend_round_trip_and_expiry(backend):
+    backend.put("k", "ds", "value", expires_at=100.0)
+    assert backend.get("k", now=50.0) == "value"
+    assert backend.get("k", now=100.0) is None
+    # Expired entries are removed on read.
+    assert backend.get("k", now=50.0) is None
+
+
+def test_backend_evicts_least_recently_used(backend):
+    with patch("tenantfirstaid.retrieval_cache.time.time", side_effect=[1.0, 2.0, 4.0]):
+        backend.put("a", "ds", "A", expires_at=1e12)
+        backend.put("b", "ds", "B", expires_at=1e12)
+        assert backend.get("a", now=3.0) == "A"  # "b" is now least recently used
+        backend.put("c", "ds", "C", expires_at=1e12)
+
+    assert len(backend) == 2
+    assert backend.get("b", now=5.0) is None
+    assert backend.get("a", now=5.0) == "A"
+    assert backend.get("c", now=5.0) == "C"
+
+
+def test_backend_invalidate_datastore(backend):
+    backend.put("a", "ds-1", "A", expires_at=1e12)
+    backend.put("b", "ds-2", "B", expires_at=1e12)
+
+    assert backend.invalidate_datastore("ds-1") == 1
+    assert backend.get("a", now=0.0) is None
+    assert backend.get("b", now=0.0) == "B"
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = tmp_path / "shared.sqlite3"
+    SqliteRetrievalBackend(path, max_size=10).put("k", "ds", "v", expires_at=1e12)
+    assert SqliteRetrievalBackend(path, max_size=10).get("k", now=0.0) == "v"
+
+
+def test_retrieval_cache_applies_ttl_and_counts():
+    cache = RetrievalCache(InMemoryRetrievalBackend(max_size=10), ttl_seconds=60)
+    with patch("tenantfirstaid.retrieval_cache.time.time", return_value=1000.0):
+        assert cache.get("k") is None
+        cache.put("k", "ds", "v")
+        assert cache.get("k") == "v"
+    with patch("tenantfirstaid.retrieval_cache.time.time", return_value=1061.0):
+        assert cache.get("k") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.clear()
+    assert (cache.hits, cache.misses) == (0, 0)
@@ -0,0 +1,97 @@
+"""Tests for server-side chat sessions."""
+
+from datetime import datetime, timezone
+
+import pytest
+from langgraph.checkpoint.base import BaseCheckpointSaver, empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+import tenantfirstaid.sessions as sessions
+from tenantfirstaid.sessions import ChatSessionStore
+
+
+def _put_checkpoint(saver: BaseCheckpointSaver, thread_id: str, epoch: float) -> None:
+    checkpoint = empty_checkpoint()
+    checkpoint["ts"] = datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+    saver.put(
+        {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}},
+        checkpoint,
+        {},
+        {},
+    )
+
+
+@pytest.fixture
+def store():
+    return ChatSessionStore(InMemorySaver(), ttl_seconds=60, sweep_seconds=3600)
+
+
+def test_new_token_is_valid_and_unique():
+    a, b = ChatSessionStore.new_token(), ChatSessionStore.new_token()
+    assert a != b
+    assert ChatSessionStore.is_valid_token(a)
+
+
+@pytest.mark.parametrize("token", [None, 42, "", "short", "x" * 43 + "!", "a b" * 20])
+def test_is_valid_token_rejects_malformed(token):
+    assert not ChatSessionStore.is_valid_token(token)
+
+
+def test_unknown_session_is_inactive(store):
+    assert not store.is_active(ChatSessionStore.new_token())
+
+
+def test_recent_session_is_active(store, mocker):
+    token = store.new_token()
+    _put_checkpoint(store.checkpointer, token, epoch=1000.0)
+    mocker.patch("tenantfirstaid.sessions.time.time", return_value=1030.0)
+    assert store.is_active(token)
+
+
+def test_expired_session_is_deleted(store, mocker):
+    token = store.new_token()
+    _put_checkpoint(store.checkpointer, token, epoch=1000.0)
+    mocker.patch("tenantfirstaid.sessions.time.time", return_value=1061.0)
+
+    assert not store.is_active(token)
+    config = {"configurable": {"thread_id": token}}
+    assert store.checkpointer.get_tuple(config) is None
+
+
+def test_sweep_evicts_only_expired_threads(store):
+    _put_checkpoint(store.checkpointer, "old", epoch=1000.0)
+    _put_checkpoint(store.checkpointer, "fresh", epoch=1000.0)
+    _put_checkpoint(store.checkpointer, "fresh", epoch=1050.0)
+
+    assert store.sweep(now=1080.0) == 1
+    remaining = {
+        c.config["configurable"]["thread_id"] for c in store.checkpointer.list(None)
+    }
+    assert remaining == {"fresh"}
+
+
+def test_maybe_sweep_is_rate_limited(mocker):
+    store = ChatSessionStore(InMemorySaver(), ttl_seconds=60, sweep_seconds=100)
+    sweep = mocker.patch.object(store, "sweep", return_value=0)
+    now = store._last_sweep
+
+    mocker.patch("tenantfirstaid.sessions.time.time", return_value=now + 50)
+    store.maybe_sweep()
+    sweep.assert_not_called()
+
+    mocker.patch("tenantfirstaid.sessions.time.time", return_value=now + 101)
+    store.maybe_sweep()
+    sweep.assert_called_once()
+
+
+def test_default_checkpointer_is_shared_between_processes(mocker, tmp_path):
+    """Checkpoints written through one worker's saver are seen by another's."""
+    mocker.patch.object(sessions, "CHAT_SESSION_DB_PATH", str(tmp_path / "s.db"))
+    writer = sessions._default_checkpointer()
+    reader = sessions._default_checkpointer()
+    assert isinstance(writer, SqliteSaver)
+
+    _put_checkpoint(writer, "t1", 1_000.0)
+
+    assert reader.get_tuple(sessions._thread_config("t1")) is not None
@@ -0,0 +1,95 @@
+"""Tests for scripts.split_sections."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from scripts.split_sections import split_sections, write_sections
+
+_ORS = """Chapter 90 -- Residential Landlord and Tenant
+
+90.100 Definitions. As used in this chapter:
+(1) "Dwelling unit" means a structure.
+90.105 Short title. This chapter shall be known as the "Residential Landlord and Tenant Act."
+90.240 [Formerly 91.740; renumbered 90.220 in 2005]
+      90.394 Termination of tenancy for failure to pay rent. The landlord may terminate
+90.100 to 90.465 apply to all tenancies.
+"""
+
+_CITY = """Chapter 30.01 Affordable Housing
+30.01.010 Policy.
+30.01.085 Portland Renter Additional Protections.
+30.01.010 Policy.
+The City of Portland has a policy.
+30.01.085 Portland Renter Additional Protections.
+A. In addition to the protections set forth in the Act.
+"""
+
+
+def test_splits_ors_sections_and_ignores_in_text_numbers():
+    preamble, sections = split_sections(_ORS)
+    assert preamble == "Chapter 90 -- Residential Landlord and Tenant"
+    assert [s.number for s in sections] == ["90.100", "90.105", "90.240", "90.394"]
+    assert sections[0].text.endswith('"Dwelling unit" means a structure.')
+    assert sections[3].text.endswith("90.100 to 90.465 apply to all tenancies.")
+    assert {s.chapter for s in sections} == {"90"}
+
+
+def test_table_of_contents_entries_are_dropped():
+    _, sections = split_sections(_CITY)
+    assert [s.number for s in sections] == ["30.01.010", "30.01.085"]
+    assert sections[0].text == "30.01.010 Policy.\nThe City of Portland has a policy."
+    assert sections[1].chapter == "30.01"
+
+
+@pytest.mark.parametrize(
+    "heading,number,chapter",
+    [
+        ("8.425\tRental Housing - Standards and Protections.", "8.425", "8"),
+        ("411-054-0005", "411-054-0005", "411-054"),
+        ("659A.421 Discrimination in selling, renting", "659A.421", "659A"),
+    ],
+)
+def test_heading_formats(heading, number, chapter):
+    _, [section] = split_sections(f"{heading}\nBody text.\n")
+    assert (section.number, section.chapter) == (number, chapter)
+
+
+def test_write_sections_emits_one_document_per_section(tmp_path: Path):
+    docs = tmp_path / "docs"
+    (docs / "portland").mkdir(parents=True)
+    (docs / "ORS090.txt").write_text(_ORS)
+    (docs / "portland" / "PCC30.01.txt").write_text(_CITY)
+    out = tmp_path / "sections"
+    (out / "stale").mkdir(parents=True)
+
+    assert write_sections(docs, out, "my-bucket") == 6
+
+    entries = {
+        e["id"]: e
+        for e in map(json.loads, (out / "metadata.jsonl").read_text().splitlines())
+    }
+    entry = entries["PCC30-01-30-01-085"]
+    assert entry["structData"] == {
+        "section": "30.01.085",
+        "chapter": "30.01",
+        "source": "PCC30.01",
+        "city": "portland",
+        "state": "or",
+    }
+    assert entry["content"]["uri"] == "gs://my-bucket/PCC30-01-30-01-085.txt"
+    assert entries["ORS090-90-394"]["structData"]["city"] is None
+    assert (out / "ORS090-90-105.txt").read_text().startswith("90.105 Short title.")
+    assert not (out / "stale").exists()
+
+
+def test_file_without_headings_is_kept_whole(tmp_path: Path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "NOTES.txt").write_text("Free-form notes without section numbers.\n")
+    out = tmp_path / "sections"
+    write_sections(docs, out, "b")
+    assert (out / "NOTES-preamble.txt").read_text() == (
+        "Free-form notes without section numbers.\n"
+    )
@@ -0,0 +1,60 @@
+"""Tests for the pre-encoded NDJSON stream writer (stream_encoding.py)."""
+
+from hypothesis import given
+from hypothesis import strategies as st
+from langchain_core.messages import ContentBlock
+
+from tenantfirstaid.schema import (
+    EndOfStreamChunk,
+    LetterChunk,
+    ReasoningChunk,
+    TextChunk,
+)
+from tenantfirstaid.stream_encoding import encode_block, encode_end_of_stream
+
+# Surrogates cannot be encoded as UTF-8 by either writer.
+_TEXT = st.text(alphabet=st.characters(blacklist_categories=("Cs",)))
+
+
+def _expected(model) -> bytes:
+    return (model.model_dump_json() + "\n").encode("utf-8")
+
+
+@given(_TEXT)
+def test_text_matches_schema_serialization(text):
+    assert encode_block({"type": "text", "text": text}) == _expected(
+        TextChunk(content=text)
+    )
+
+
+@given(_TEXT)
+def test_reasoning_and_letter_match_schema_serialization(text):
+    assert encode_block({"type": "reasoning", "reasoning": text}) == _expected(
+        ReasoningChunk(content=text)
+    )
+    letter: ContentBlock = {
+        "type": "non_standard",
+        "value": {"type": "letter", "content": text},
+    }
+    assert encode_block(letter) == _expected(LetterChunk(content=text))
+
+
+def test_escapes_control_characters_and_quotes():
+    text = 'He said "stop"\n\tORS 90.394 § \x01 \\   \U0001f3e0'
+    assert encode_block({"type": "text", "text": text}) == _expected(
+        TextChunk(content=text)
+    )
+
+
+def test_unrendered_blocks_are_dropped():
+    image: ContentBlock = {"type": "image", "url": "https://example.com/a.png"}
+    assert encode_block(image) is None
+    assert encode_block({"type": "non_standard", "value": {"type": "cite"}}) is None
+
+
+def test_end_of_stream_matches_schema_serialization():
+    assert encode_end_of_stream() == _expected(EndOfStreamChunk())
+    timing = "parse;dur=0.4, model;dur=812.3"
+    assert encode_end_of_stream(timing) == _expected(
+        EndOfStreamChunk(server_timing=timing)
+    )
@@ -4,20 +4,45 @@ import contextlib
 import io
 import json
 from pathlib import Path
+from typing import Any, cast
 from unittest.mock import MagicMock, patch
 
 import pytest
-from gcs_helpers import patch_singleton
+from gcs_helpers import FakeBlob, FakeBucket, FakeStorageClient, patch_singleton
 from google.api_core import exceptions as gcp_exceptions
+from google.cloud import storage
 
 from scripts.upload_to_gcs import (
+    RESUMABLE_CHUNK_SIZE,
+    RESUMABLE_THRESHOLD_BYTES,
     UploadError,
     create_bucket,
+    get_existing_bucket,
+    local_md5,
     plan_upload,
     upload_files,
 )
 
 
+class _FailingBlob(FakeBlob):
+    def upload_from_filename(self, filename: str, content_type=None) -> None:
+        raise gcp_exceptions.ServiceUnavailable("flaky")
+
+
+class _FlakyBucket(FakeBucket):
+    """FakeBucket whose uploads of bad.txt fail."""
+
+    def blob(self, name: str, chunk_size=None) -> FakeBlob:
+        if name == "bad.txt":
+            return _FailingBlob(name, self, chunk_size=chunk_size)
+        return super().blob(name, chunk_size)
+
+
+def _upload(bucket: FakeBucket, *args: Any, **kwargs: Any) -> int:
+    """Call upload_files with an in-memory bucket in place of storage.Bucket."""
+    return upload_files(cast(storage.Bucket, bucket), *args, **kwargs)
+
+
 @contextlib.contextmanager
 def _silence_stdout():
     """Suppress stdout so script print() output doesn't clutter the test report."""
@@ -207,6 +232,107 @@ class TestUploadFiles:
             str(metadata), content_type="application/jsonl"
         )
 
+    def test_large_files_use_resumable_upload(self, tmp_path: Path):
+        bucket = FakeBucket("b")
+        big = tmp_path / "ORS090.txt"
+        big.write_bytes(b"x" * (RESUMABLE_THRESHOLD_BYTES + 1))
+        small = tmp_path / "small.txt"
+        small.write_text("s")
+        metadata = tmp_path / "metadata.jsonl"
+        metadata.write_text("{}")
+
+        with _silence_stdout():
+            _upload(bucket, {"ORS090.txt": big, "small.txt": small}, metadata)
+
+        assert bucket.objects["ORS090.txt"].chunk_size == RESUMABLE_CHUNK_SIZE
+        assert bucket.objects["small.txt"].chunk_size is None
+
+    def test_metadata_uploaded_after_documents(self, tmp_path: Path):
+        bucket = FakeBucket("b")
+        names = {}
+        for name in ("a.txt", "b.txt", "c.txt"):
+            names[name] = tmp_path / name
+            names[name].write_text(name)
+        metadata = tmp_path / "metadata.jsonl"
+        metadata.write_text("{}")
+
+        with _silence_stdout():
+            assert _upload(bucket, names, metadata, workers=3) == 4
+
+        assert bucket.uploads[-1] == "metadata.jsonl"
+
+    def test_failed_upload_reported_after_others_finish(self, tmp_path: Path):
+        bucket = _FlakyBucket("b")
+        good = tmp_path / "good.txt"
+        good.write_text("g")
+        bad = tmp_path / "bad.txt"
+        bad.write_text("b")
+        metadata = tmp_path / "metadata.jsonl"
+        metadata.write_text("{}")
+
+        with (
+            _silence_stdout(),
+            contextlib.redirect_stderr(io.StringIO()),
+            pytest.raises(UploadError, match="bad.txt"),
+        ):
+            _upload(bucket, {"good.txt": good, "bad.txt": bad}, metadata)
+
+        assert set(bucket.objects) == {"good.txt"}
+
+
+class TestSync:
+    def _tree(self, tmp_path: Path) -> tuple[dict[str, Path], Path]:
+        names = {}
+        for name in ("ORS090.txt", "ORS105.txt", "PCC30.01.txt"):
+            path = tmp_path / name
+            path.write_text(f"text of {name}\n")
+            names[name] = path
+        metadata = tmp_path / "metadata.jsonl"
+        metadata.write_text("{}\n")
+        return names, metadata
+
+    def test_only_changed_files_are_uploaded(self, tmp_path: Path):
+        bucket = FakeBucket("b")
+        names, metadata = self._tree(tmp_path)
+        with _silence_stdout():
+            assert _upload(bucket, names, metadata, skip_unchanged=True) == 4
+            names["PCC30.01.txt"].write_text("amended ordinance\n")
+            bucket.uploads.clear()
+            assert _upload(bucket, names, metadata, skip_unchanged=True) == 1
+
+        assert bucket.uploads == ["PCC30.01.txt"]
+        assert bucket.objects["PCC30.01.txt"].data == b"amended ordinance\n"
+
+    def test_missing_objects_are_uploaded(self, tmp_path: Path):
+        bucket = FakeBucket("b")
+        names, metadata = self._tree(tmp_path)
+        with _silence_stdout():
+            _upload(bucket, names, metadata)
+            del bucket.objects["ORS105.txt"]
+            bucket.uploads.clear()
+            _upload(bucket, names, metadata, skip_unchanged=True)
+
+        assert bucket.uploads == ["ORS105.txt"]
+
+    def test_without_sync_everything_is_uploaded(self, tmp_path: Path):
+        bucket = FakeBucket("b")
+        names, metadata = self._tree(tmp_path)
+        with _silence_stdout():
+            _upload(bucket, names, metadata)
+            assert _upload(bucket, names, metadata) == 4
+
+    def test_local_md5_matches_gcs_format(self, tmp_path: Path):
+        bucket = FakeBucket("b")
+        path = tmp_path / "a.txt"
+        path.write_text("abc")
+        bucket.blob("a.txt").upload_from_filename(str(path))
+        assert local_md5(path) == bucket.objects["a.txt"].md5_hash
+
+    def test_get_existing_bucket_requires_bucket(self):
+        client = FakeStorageClient()
+        with pytest.raises(UploadError, match="Omit --sync"):
+            get_existing_bucket(cast(storage.Client, client), "absent")
+
 
 class TestMain:
     def test_dry_run_does_not_call_storage(self, tmp_path: Path):
@@ -281,3 +407,38 @@ class TestMain:
         )
         # Two uploads: the doc and metadata.jsonl.
         assert blob.upload_from_filename.call_count == 2
+
+    def test_sync_reuses_bucket_and_skips_unchanged(self, tmp_path: Path):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "ORS090.txt").write_text("doc")
+        (docs / "ORS105.txt").write_text("doc")
+        metadata = tmp_path / "metadata.jsonl"
+        _write_metadata(metadata, "live-bucket", ["ORS090.txt", "ORS105.txt"])
+        client = FakeStorageClient()
+        argv = [
+            "upload_to_gcs",
+            "--bucket",
+            "live-bucket",
+            "--metadata",
+            str(metadata),
+            "--documents-dir",
+            str(docs),
+        ]
+
+        from scripts.upload_to_gcs import main
+
+        with (
+            patch_singleton("scripts.upload_to_gcs.SINGLETON"),
+            patch("scripts.upload_to_gcs.storage.Client", return_value=client),
+            patch("scripts.upload_to_gcs.load_gcp_credentials"),
+            _silence_stdout(),
+        ):
+            with patch("sys.argv", argv):
+                main()
+            (docs / "ORS105.txt").write_text("amended doc")
+            client.buckets["live-bucket"].uploads.clear()
+            with patch("sys.argv", [*argv, "--sync", "--workers", "2"]):
+                main()
+
+        assert client.buckets["live-bucket"].uploads == ["ORS105.txt"]
@@ -0,0 +1,104 @@
+"""Tests for warm_start.py and the gunicorn_config.py hooks."""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import request
+
+from tenantfirstaid import graph, gunicorn_config
+from tenantfirstaid.langchain_chat_manager import AGENT_CACHE
+from tenantfirstaid.langchain_tools import RETRIEVER_POOL
+from tenantfirstaid.warm_start import (
+    PRELOADED_MODULES,
+    preload,
+    reset_after_fork,
+    rss_bytes,
+    warm_up,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_process_state():
+    AGENT_CACHE.clear()
+    RETRIEVER_POOL.clear()
+    yield
+    AGENT_CACHE.clear()
+    RETRIEVER_POOL.clear()
+    graph.reset_llm()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs /proc")
+def test_rss_bytes_reads_this_process():
+    rss = rss_bytes()
+    assert rss is not None and rss > 0
+
+
+def test_rss_bytes_of_missing_process_is_none():
+    assert rss_bytes(pid=2**31 - 1) is None
+
+
+def test_preload_imports_deferred_modules():
+    preload()
+
+    assert all(name in sys.modules for name in PRELOADED_MODULES)
+
+
+@patch("tenantfirstaid.langchain_chat_manager.create_graph")
+def test_reset_after_fork_drops_clients_and_graphs(mock_create_graph):
+    warm_up()
+    graph._llm = MagicMock()
+    assert len(AGENT_CACHE) == 1
+
+    reset_after_fork()
+
+    assert graph._llm is None
+    assert len(AGENT_CACHE) == 0
+    assert len(RETRIEVER_POOL) == 0
+
+
+@patch("tenantfirstaid.warm_start.RETRIEVER_POOL")
+@patch("tenantfirstaid.langchain_chat_manager.create_graph")
+def test_warm_up_compiles_default_agent_and_survives_failures(
+    mock_create_graph, mock_pool
+):
+    mock_pool.acquire.side_effect = ValueError("no credentials")
+
+    steps = warm_up()
+
+    mock_create_graph.assert_called_once()
+    assert len(AGENT_CACHE) == 1
+    assert steps["agent"] is not None
+    assert steps["retriever:laws"] is None
+    assert "request" not in steps
+
+
+@patch("tenantfirstaid.warm_start.WARM_START_REQUEST_ENABLED", True)
+@patch("tenantfirstaid.langchain_chat_manager.create_graph")
+def test_warm_up_sends_synthetic_request(_mock_create_graph, app):
+    seen = []
+
+    @app.post("/api/query")
+    def query():
+        seen.append(request.get_json())
+        return "ok"
+
+    with patch("tenantfirstaid.warm_start.RETRIEVER_POOL"):
+        steps = warm_up(app)
+
+    assert steps["request"] is not None
+    assert seen[0]["state"] == "or"
+    assert seen[0]["messages"][0]["role"] == "human"
+
+
+@patch("tenantfirstaid.warm_start.warm_up", return_value={"agent": 0.5})
+def test_post_worker_init_logs_cold_start_and_rss(mock_warm_up):
+    worker = MagicMock(pid=123)
+
+    gunicorn_config.post_worker_init(worker)
+
+    mock_warm_up.assert_called_once_with(worker.wsgi)
+    message, pid, _elapsed, steps, _rss = worker.log.info.call_args.args
+    assert "ready" in message and "RSS" in message
+    assert (pid, steps) == (123, "agent 0.50s")